@@ -1,21 +1,73 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_file, Response, g
 import os
 from werkzeug.utils import secure_filename
 import pandas as pd
+import plotly
+from plotly.offline import get_plotlyjs_version
+from plotly.utils import PlotlyJSONEncoder
 from utils.data_processor import DataProcessor
 from utils.visualizer import Visualizer
 from utils.analysis_engine import AnalysisEngine
+from utils.dataset_store import DatasetStore
+from utils.chunked_dataset import ChunkedDataset
+from utils.result_cache import ResultCache, dataset_fingerprint
+from utils.job_queue import JobQueue
+from utils.frame_cache import remember
+from utils.instrumentation import instrumentation
 import json
-import traceback
+import logging
+import threading
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Uploads are streamed to disk, so the cap only guards the disk
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 4 * 1024 * 1024 * 1024))
+app.config['OUT_OF_CORE_MIN_BYTES'] = int(os.environ.get('OUT_OF_CORE_MIN_BYTES', 64 * 1024 * 1024))  # larger files stay on disk
+app.config['MEMORY_BUDGET_BYTES'] = int(os.environ.get('MEMORY_BUDGET_BYTES', 512 * 1024 * 1024))  # per-chunk working memory
+app.config['DATASET_FOLDER'] = os.path.join('uploads', 'datasets')
+app.config['DATASET_CACHE_SIZE'] = 8  # parsed frames kept in memory
+app.config['DATASET_MAX_SEGMENTS'] = int(os.environ.get('DATASET_MAX_SEGMENTS', 32))  # appended batches kept as separate files before compacting
+app.config['QUANTILE_MODE'] = os.environ.get('QUANTILE_MODE', 'auto')  # 'exact', 'approximate' or 'auto' (sketches for out-of-core data)
+app.config['QUANTILE_ERROR'] = float(os.environ.get('QUANTILE_ERROR', 0.01))  # rank error bound of the quantile sketches
+app.config['CATEGORICAL_MODE'] = os.environ.get('CATEGORICAL_MODE', 'auto')  # 'exact', 'approximate' or 'auto' (sketches for out-of-core data)
+app.config['ANALYSIS_EXECUTOR'] = os.environ.get('ANALYSIS_EXECUTOR', 'process')  # 'process' or 'serial'
+app.config['ANALYSIS_MAX_WORKERS'] = None  # defaults to the CPU count
+app.config['TREND_RESAMPLE'] = None  # None, 'D', 'W' or 'M' buckets on the detected date column
+app.config['ANALYSIS_ASYNC'] = os.environ.get('ANALYSIS_ASYNC', '1') == '1'  # run analyses as background jobs
+app.config['ANALYSIS_JOB_WORKERS'] = 2  # concurrent background jobs
+app.config['JOB_DATABASE'] = 'data_analysis.db'  # persistent job table lives next to the app data
+app.config['JOB_MAX_AGE'] = 24 * 60 * 60  # finished jobs are purged after a day
+app.config['RESULT_CACHE_MAX_BYTES'] = 64 * 1024 * 1024  # in-memory analysis results
+app.config['RESULT_CACHE_FOLDER'] = os.environ.get('RESULT_CACHE_FOLDER')  # optional on-disk tier
+app.config['CHART_OUTPUT_FORMAT'] = 'figure'  # 'figure' (Plotly JSON spec) or 'html'
+app.config['CHART_MAX_POINTS'] = 5000  # line/scatter charts are decimated above this
+app.config['CHART_CACHE_MAX_BYTES'] = int(os.environ.get('CHART_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # rendered charts
+app.config['PLOTLY_JS_SOURCE'] = os.environ.get('PLOTLY_JS_SOURCE', 'cdn')  # 'cdn' or 'local' (offline)
+app.config['PLOTLY_JS_MAX_AGE'] = 365 * 24 * 60 * 60  # versioned URL, safe to cache for a year
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')  # DEBUG adds per-step detail
+app.config['INSTRUMENTATION_ENABLED'] = os.environ.get('INSTRUMENTATION_ENABLED', '1') == '1'  # spans and /metrics
+app.config['INSTRUMENTATION_SAMPLE_RATE'] = float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 1.0))  # share of requests measured
+
+logging.basicConfig(level=app.config['LOG_LEVEL'], format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
+
+instrumentation.configure(enabled=app.config['INSTRUMENTATION_ENABLED'],
+                          sample_rate=app.config['INSTRUMENTATION_SAMPLE_RATE'])
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Parsed datasets live server-side; the session only carries the dataset id
+dataset_store = DatasetStore(app.config['DATASET_FOLDER'], max_cached=app.config['DATASET_CACHE_SIZE'],
+                             memory_budget=app.config['MEMORY_BUDGET_BYTES'],
+                             quantile_mode=app.config['QUANTILE_MODE'], quantile_error=app.config['QUANTILE_ERROR'],
+                             max_segments=app.config['DATASET_MAX_SEGMENTS'])
+
+# Analysis results keyed by dataset content hash, shared by every request
+result_cache = ResultCache(max_bytes=app.config['RESULT_CACHE_MAX_BYTES'], disk_dir=app.config['RESULT_CACHE_FOLDER'])
+chart_cache = ResultCache(max_bytes=app.config['CHART_CACHE_MAX_BYTES'])
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'json'}
 
@@ -24,13 +76,80 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def get_session_data():
+    """Resolve the session's dataset id to the stored DataFrame"""
+    dataset_id = session.get('dataset_id')
+    if not dataset_id:
+        return None
+    return dataset_store.load(dataset_id)
+
+
 def clear_session_data():
     """Clear previous analysis data from session"""
-    keys_to_clear = ['data', 'filename', 'analysis_results', 'numerical_cols', 'categorical_cols']
+    if 'dataset_id' in session:
+        # Jobs still reading the dataset keep it until they finish
+        dataset_id = session['dataset_id']
+        get_job_queue().when_idle(dataset_id, lambda: dataset_store.delete(dataset_id))
+
+    keys_to_clear = ['dataset_id', 'filename', 'analysis_results', 'numerical_cols', 'categorical_cols',
+                     'memory_usage_before']
     for key in keys_to_clear:
         session.pop(key, None)
 
 
+@app.before_request
+def start_request_span():
+    g.request_span = instrumentation.start('http_request', endpoint=request.endpoint or 'unmatched',
+                                           method=request.method)
+
+
+@app.after_request
+def finish_request_span(response):
+    request_span = g.pop('request_span', None)
+    if request_span is not None:
+        request_span.finish(status=response.status_code)
+    return response
+
+
+@app.teardown_request
+def close_request_span(error):
+    # Only reached with a span left when the request failed before a response existed
+    request_span = g.pop('request_span', None)
+    if request_span is not None:
+        request_span.finish(error=error is not None, status=500)
+
+
+@app.route('/metrics')
+def metrics():
+    """Span latency and memory histograms in the Prometheus text format"""
+    return Response(instrumentation.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.context_processor
+def inject_plotly_js_url():
+    """Point templates at the plotly.js bundle matching the installed plotly package"""
+    version = get_plotlyjs_version()
+    if app.config['PLOTLY_JS_SOURCE'] == 'local':
+        plotly_js_url = url_for('plotly_js', version=version)
+    else:
+        plotly_js_url = f'https://cdn.plot.ly/plotly-{version}.min.js'
+    return {'plotly_js_url': plotly_js_url}
+
+
+@app.route('/vendor/plotly-<version>.min.js')
+def plotly_js(version):
+    """Serve the plotly.js bundle shipped with the plotly package for offline use"""
+    if version != get_plotlyjs_version():
+        return Response('plotly.js sürümü bulunamadı', status=404)
+
+    bundle_path = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+    response = send_file(bundle_path, mimetype='application/javascript',
+                         max_age=app.config['PLOTLY_JS_MAX_AGE'], conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route('/')
 def index():
     # Clear session when returning to home page
@@ -62,42 +181,37 @@ def upload_file():
 
             # Process the uploaded file
             try:
-                print(f"=== PROCESSING FILE: {filename} ===")
-                processor = DataProcessor()
-                data = processor.load_data(filepath)
-
-                print(f"✅ Data loaded successfully!")
-                print(f"📊 Shape: {data.shape}")
-                print(f"📋 Columns: {list(data.columns)}")
-                print(f"🔢 Data types: {data.dtypes.to_dict()}")
+                logger.info("Processing uploaded file: %s", filename)
+                processor = DataProcessor(memory_budget=app.config['MEMORY_BUDGET_BYTES'])
+                if os.path.getsize(filepath) >= app.config['OUT_OF_CORE_MIN_BYTES']:
+                    # Large files are converted once to a memory-mapped Arrow file and read lazily
+                    dataset_id = dataset_store.save_chunked(lambda path: processor.convert_to_arrow(filepath, path))
+                    data = dataset_store.load(dataset_id)
+                else:
+                    data = processor.load_data(filepath)
+                    # Keep the parsed frame server-side, only its id goes into the session
+                    dataset_id = dataset_store.save(data)
 
                 # Get column information
                 numerical_cols = list(data.select_dtypes(include=['number']).columns)
-                categorical_cols = list(data.select_dtypes(include=['object']).columns)
-
-                print(f"🔢 Numerical columns: {numerical_cols}")
-                print(f"📝 Categorical columns: {categorical_cols}")
-
-                # Store data in session with proper encoding
-                data_json = data.to_json(orient='records', force_ascii=False, date_format='iso')
+                categorical_cols = list(data.select_dtypes(include=['object', 'category']).columns)
 
                 # Store everything in session
-                session['data'] = data_json
+                session['dataset_id'] = dataset_id
                 session['filename'] = filename
                 session['data_source'] = 'file'
                 session['numerical_cols'] = numerical_cols
                 session['categorical_cols'] = categorical_cols
+                session['memory_usage_before'] = (processor.compaction_report['memory_before']
+                                                  if processor.compaction_report else None)
 
-                print(f"💾 Session data stored:")
-                print(f"   - Data length: {len(data_json)}")
-                print(f"   - Numerical cols: {len(numerical_cols)}")
-                print(f"   - Categorical cols: {len(categorical_cols)}")
-                print(f"   - Session keys: {list(session.keys())}")
+                logger.info("Stored dataset %s: %s, %d numerical and %d categorical columns", dataset_id,
+                            data.shape, len(numerical_cols), len(categorical_cols))
 
                 # Clean up uploaded file
                 try:
                     os.remove(filepath)
-                    print(f"🗑️ Cleaned up uploaded file: {filepath}")
+                    logger.debug("Cleaned up uploaded file: %s", filepath)
                 except:
                     pass
 
@@ -105,9 +219,7 @@ def upload_file():
                 return redirect(url_for('select_analysis'))
 
             except Exception as e:
-                print(f"❌ FILE PROCESSING ERROR:")
-                print(f"   Error: {str(e)}")
-                traceback.print_exc()
+                logger.exception("File processing error: %s", e)
                 flash(f'Dosya işlenirken hata oluştu: {str(e)}')
                 return redirect(request.url)
         else:
@@ -119,13 +231,9 @@ def upload_file():
 
 @app.route('/select_analysis')
 def select_analysis():
-    print(f"=== SELECT ANALYSIS ROUTE ===")
-    print(f"Session keys: {list(session.keys())}")
-    print(f"Has data: {'data' in session}")
-    print(f"Has columns: {'numerical_cols' in session and 'categorical_cols' in session}")
-
-    if 'data' not in session:
-        print("❌ No data in session - redirecting to upload")
+    data = get_session_data()
+    if data is None:
+        logger.info("No data in session, redirecting to upload")
         flash('Önce veri yüklemeniz gerekiyor')
         return redirect(url_for('upload_file'))
 
@@ -135,20 +243,14 @@ def select_analysis():
         available_analyses = analysis_engine.get_available_analyses()
 
         # Get data info for preview
-        data_json = session['data']
         numerical_cols = session.get('numerical_cols', [])
         categorical_cols = session.get('categorical_cols', [])
 
-        print(f"📊 Loading data from session - Length: {len(data_json)}")
-
-        data = pd.DataFrame(json.loads(data_json))
-        print(f"✅ Data loaded successfully: {data.shape}")
-
         # If columns not in session, recalculate
         if not numerical_cols and not categorical_cols:
-            print("🔄 Recalculating column types...")
+            logger.debug("Recalculating column types")
             numerical_cols = list(data.select_dtypes(include=['number']).columns)
-            categorical_cols = list(data.select_dtypes(include=['object']).columns)
+            categorical_cols = list(data.select_dtypes(include=['object', 'category']).columns)
             session['numerical_cols'] = numerical_cols
             session['categorical_cols'] = categorical_cols
 
@@ -159,24 +261,81 @@ def select_analysis():
             'categorical_cols': categorical_cols
         }
 
-        print(f"📋 Data info: {data_info}")
-
         return render_template('select_analysis.html',
                                available_analyses=available_analyses,
                                data_info=data_info,
                                filename=session.get('filename', 'Bilinmeyen'))
 
     except Exception as e:
-        print(f"❌ SELECT ANALYSIS ERROR:")
-        print(f"   Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Select analysis error: %s", e)
         flash(f'Veri yüklenirken hata oluştu: {str(e)}')
         return redirect(url_for('upload_file'))
 
 
+def run_analysis_job(job, progress):
+    """Job queue entry point: analyze a stored dataset and return what the results page needs"""
+    data = dataset_store.load(job['dataset_id'])
+    if data is None:
+        raise ValueError('Veri bulunamadı. Lütfen önce veri yükleyin.')
+
+    logger.info("Running analysis job %s on %s: %s", job['job_id'], data.shape, job['analyses'])
+
+    # Perform basic analysis
+    processor = DataProcessor(result_cache=result_cache)
+    basic_analysis = processor.analyze_data(data, memory_usage_before=job['params'].get('memory_usage_before'),
+                                            statistics=dataset_store.statistics(job['dataset_id']))
+
+    # Perform selected analyses
+    analysis_engine = AnalysisEngine(executor=app.config['ANALYSIS_EXECUTOR'],
+                                     max_workers=app.config['ANALYSIS_MAX_WORKERS'],
+                                     result_cache=result_cache,
+                                     trend_resample=app.config['TREND_RESAMPLE'],
+                                     categorical_mode=app.config['CATEGORICAL_MODE'])
+    detailed_analyses = analysis_engine.perform_analysis(data, job['analyses'], progress=progress)
+
+    return {'basic_analysis': basic_analysis, 'detailed_analyses': detailed_analyses}
+
+
+# Analyses run in the background; jobs and their results persist in the app database
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """The job queue, created on first use
+
+    Creating it re-queues interrupted jobs, which must only happen in the process that
+    serves requests (not, e.g., in the debug reloader's parent).
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(app.config['JOB_DATABASE'], run_analysis_job,
+                                  max_workers=app.config['ANALYSIS_JOB_WORKERS'], max_age=app.config['JOB_MAX_AGE'])
+        return _job_queue
+
+
+def render_analysis_results(data, dataset_id, selected_analyses, basic_analysis, detailed_analyses):
+    """Render the results page for a finished set of analyses"""
+    # Get column information
+    numerical_cols = session.get('numerical_cols', list(data.select_dtypes(include=['number']).columns))
+    categorical_cols = session.get('categorical_cols', list(data.select_dtypes(include=['object', 'category']).columns))
+
+    return render_template('analysis_results.html',
+                           basic_analysis=basic_analysis,
+                           detailed_analyses=detailed_analyses,
+                           filename=session.get('filename', 'Bilinmeyen'),
+                           data_preview=data.head(10).to_html(classes='table table-striped'),
+                           dataset_id=dataset_id,
+                           selected_analyses=selected_analyses,
+                           numerical_cols=numerical_cols,
+                           categorical_cols=categorical_cols)
+
+
 @app.route('/perform_analysis', methods=['POST'])
 def perform_analysis():
-    if 'data' not in session:
+    data = get_session_data()
+    if data is None:
         flash('Önce veri yüklemeniz gerekiyor')
         return redirect(url_for('upload_file'))
 
@@ -188,88 +347,221 @@ def perform_analysis():
             flash('En az bir analiz türü seçmelisiniz')
             return redirect(url_for('select_analysis'))
 
-        # Load data
-        data = pd.DataFrame(json.loads(session['data']))
-        print(f"=== PERFORMING ANALYSIS ===")
-        print(f"📊 Data shape: {data.shape}")
-        print(f"🔍 Selected analyses: {selected_analyses}")
+        job = {
+            'dataset_id': session['dataset_id'],
+            'analyses': selected_analyses,
+            'params': {'memory_usage_before': session.get('memory_usage_before')}
+        }
 
-        # Perform basic analysis
-        processor = DataProcessor()
-        basic_analysis = processor.analyze_data(data)
+        if not app.config['ANALYSIS_ASYNC']:
+            result = run_analysis_job(dict(job, job_id='sync'), progress=None)
+            return render_analysis_results(data, session['dataset_id'], selected_analyses,
+                                           result['basic_analysis'], result['detailed_analyses'])
 
-        # Perform selected analyses
-        analysis_engine = AnalysisEngine()
-        detailed_analyses = analysis_engine.perform_analysis(data, selected_analyses)
+        # Queue the work; the request returns at once and the browser polls the job
+        job_id = get_job_queue().submit(job['dataset_id'], job['analyses'], params=job['params'])
+        logger.info("Analysis job queued: %s", job_id)
 
-        # Convert DataFrame to JSON for client-side storage
-        data_json = data.to_json(orient='records', force_ascii=False)
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({
+                'job_id': job_id,
+                'status_url': url_for('job_status', job_id=job_id),
+                'result_url': url_for('job_result', job_id=job_id)
+            }), 202
+        return redirect(url_for('analysis_job', job_id=job_id))
 
-        # Get column information
-        numerical_cols = session.get('numerical_cols', list(data.select_dtypes(include=['number']).columns))
-        categorical_cols = session.get('categorical_cols', list(data.select_dtypes(include=['object']).columns))
+    except Exception as e:
+        logger.exception("Analysis error: %s", e)
+        flash(f'Analiz gerçekleştirilirken hata oluştu: {str(e)}')
+        return redirect(url_for('select_analysis'))
 
-        print(f"📋 Columns for template:")
-        print(f"   - Numerical: {numerical_cols}")
-        print(f"   - Categorical: {categorical_cols}")
 
-        return render_template('analysis_results.html',
-                               basic_analysis=basic_analysis,
-                               detailed_analyses=detailed_analyses,
-                               filename=session.get('filename', 'Bilinmeyen'),
-                               data_preview=data.head(10).to_html(classes='table table-striped'),
-                               data_json=data_json,
-                               selected_analyses=selected_analyses,
-                               numerical_cols=numerical_cols,
-                               categorical_cols=categorical_cols)
+@app.route('/analysis/<job_id>')
+def analysis_job(job_id):
+    """Progress page while a job runs, the results page once it is done"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        flash('Analiz işi bulunamadı')
+        return redirect(url_for('select_analysis'))
 
-    except Exception as e:
-        print(f"❌ ANALYSIS ERROR:")
-        print(f"   Error: {str(e)}")
-        traceback.print_exc()
-        flash(f'Analiz gerçekleştirilirken hata oluştu: {str(e)}')
+    if job['status'] == 'failed':
+        flash(f'Analiz gerçekleştirilirken hata oluştu: {job["error"]}')
         return redirect(url_for('select_analysis'))
 
+    if job['status'] != 'done':
+        return render_template('analysis_progress.html',
+                               job=job,
+                               analysis_names=AnalysisEngine().get_available_analyses(),
+                               filename=session.get('filename', 'Bilinmeyen'))
+
+    data = dataset_store.load(job['dataset_id'])
+    if data is None:
+        flash('Önce veri yüklemeniz gerekiyor')
+        return redirect(url_for('upload_file'))
+
+    result = get_job_queue().get_result(job_id)
+    return render_analysis_results(data, job['dataset_id'], job['analyses'],
+                                   result['basic_analysis'], result['detailed_analyses'])
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Job status with per-analysis progress"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Analiz işi bulunamadı'}), 404
+
+    completed = sum(state in ('done', 'error') for state in job['progress'].values())
+    return jsonify({
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'completed': completed,
+        'total': len(job['progress']),
+        'error': job['error'],
+        'result_url': url_for('job_result', job_id=job_id) if job['status'] == 'done' else None
+    })
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """Results of a finished job as JSON"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Analiz işi bulunamadı'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error'], 'status': job['status']}), 500
+    if job['status'] != 'done':
+        return jsonify({'status': job['status']}), 202
+
+    try:
+        payload = json.dumps(get_job_queue().get_result(job_id), cls=PlotlyJSONEncoder, separators=(',', ':'))
+    except Exception as e:
+        logger.exception("Job result error: %s", e)
+        return jsonify({'error': f'Analiz sonuçları okunamadı: {str(e)}', 'status': job['status']}), 500
+    return Response(payload, mimetype='application/json')
+
+
+@app.route('/datasets/<dataset_id>/append', methods=['POST'])
+def append_rows(dataset_id):
+    """Append rows to a stored dataset, updating its statistics with the new rows only"""
+    if not dataset_store.exists(dataset_id):
+        return jsonify({'error': 'Veri bulunamadı'}), 404
+
+    try:
+        if 'file' in request.files:
+            file = request.files['file']
+            if not file.filename or not allowed_file(file.filename):
+                return jsonify({'error': 'Geçersiz dosya formatı. CSV, Excel veya JSON dosyası yükleyin.'}), 400
+            filepath = os.path.join(app.config['UPLOAD_FOLDER'], f'append_{dataset_id}_{secure_filename(file.filename)}')
+            file.save(filepath)
+            try:
+                # Dtypes follow the stored dataset, so skip compaction here
+                batch = DataProcessor().load_data(filepath, compact=False)
+            finally:
+                os.remove(filepath)
+        else:
+            payload = request.get_json(silent=True)
+            rows = payload.get('rows') if isinstance(payload, dict) else payload
+            if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+                return jsonify({'error': 'Eklenecek satırlar bir JSON nesne listesi olmalı'}), 400
+            batch = pd.DataFrame(rows)
+
+        if batch is None or batch.empty:
+            return jsonify({'error': 'Eklenecek satır bulunamadı'}), 400
+
+        data, statistics = dataset_store.append(dataset_id, batch)
+        logger.info("Appended %d rows to %s, now %d rows", len(batch), dataset_id, len(data))
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.exception("Append error: %s", e)
+        return jsonify({'error': f'Satırlar eklenirken hata oluştu: {str(e)}'}), 500
+
+    payload = json.dumps({
+        'dataset_id': dataset_id,
+        'rows_added': len(batch),
+        'total_rows': len(data),
+        'statistics': statistics.summary().to_dict(),
+        'missing_values': statistics.missing_values().to_dict()
+    }, cls=PlotlyJSONEncoder, separators=(',', ':'))
+    return Response(payload, mimetype='application/json')
+
 
 @app.route('/visualize', methods=['POST'])
 def visualize():
     try:
-        # Get data and chart type from POST request
+        # The browser sends a dataset reference, the rows stay server-side
         request_data = request.get_json()
         chart_type = request_data.get('chart_type')
-        data_json = request_data.get('data')
+        dataset_id = request_data.get('dataset_id') or session.get('dataset_id')
+        columns = request_data.get('columns')
         analysis_context = request_data.get('analysis_context', {})
         selected_columns = request_data.get('selected_columns', {})
 
-        print(f"=== VISUALIZATION REQUEST ===")
-        print(f"📊 Chart type: {chart_type}")
-        print(f"📋 Data records: {len(data_json) if data_json else 0}")
-        print(f"🔍 Analysis context: {analysis_context}")
-        print(f"📝 Selected columns: {selected_columns}")
+        logger.debug("Visualization request: %s chart on %s, columns %s, selected %s", chart_type, dataset_id,
+                     columns, selected_columns)
 
-        if not data_json:
+        data = dataset_store.load(dataset_id) if dataset_id else None
+        if data is None:
             return jsonify({'error': 'Veri bulunamadı. Lütfen önce veri yükleyin.'}), 400
 
         if not chart_type:
             return jsonify({'error': 'Grafik türü belirtilmedi.'}), 400
 
-        # Convert JSON back to DataFrame
-        data = pd.DataFrame(data_json)
-        print(f"✅ DataFrame created: {data.shape}")
-        print(f"📋 Columns: {list(data.columns)}")
+        # Only hand the chart builder the columns it asked for
+        if columns:
+            missing_columns = [col for col in columns if col not in data.columns]
+            if missing_columns:
+                return jsonify({'error': f'Bilinmeyen sütunlar: {", ".join(missing_columns)}'}), 400
+            columns = list(dict.fromkeys(columns))
 
-        # Create visualizer and generate chart
-        visualizer = Visualizer()
-        chart_html = visualizer.create_chart(chart_type, data, analysis_context, selected_columns)
-
-        print(f"✅ Chart HTML generated: {len(chart_html)} characters")
+        output_format = request_data.get('output_format', app.config['CHART_OUTPUT_FORMAT'])
+        if output_format not in Visualizer.OUTPUT_FORMATS:
+            return jsonify({'error': f'Desteklenmeyen çıktı formatı: {output_format}'}), 400
 
-        return jsonify({'chart_html': chart_html})
+        # Create visualizer and generate chart
+        include_plotlyjs = False if app.config['PLOTLY_JS_SOURCE'] == 'local' else 'cdn'
+        visualizer = Visualizer(output_format=output_format, include_plotlyjs=include_plotlyjs,
+                                max_points=app.config['CHART_MAX_POINTS'], cache=chart_cache)
+
+        # The chart's cache key doubles as its ETag, so a client holding it skips loading and rendering
+        fingerprint = dataset_fingerprint(data)
+        etag = visualizer.chart_cache_key(fingerprint, chart_type, analysis_context, selected_columns,
+                                          columns or list(data.columns))
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            if isinstance(data, ChunkedDataset):
+                # Page in only the projected columns, sampled down to the memory budget
+                data = data.read(columns, max_rows=data.chunk_rows(columns))
+            elif columns:
+                data = data[columns]
+                # Column-level caches (e.g. outlier flags) then key on the stored dataset
+                remember(data, 'source_fingerprint', fingerprint)
+
+            chart = visualizer.create_chart(chart_type, data, analysis_context, selected_columns,
+                                            fingerprint=fingerprint)
+
+            # Warnings and errors always come back as an HTML alert
+            if isinstance(chart, dict):
+                chart['downsample'] = visualizer.downsample_info
+                payload = json.dumps(chart, cls=PlotlyJSONEncoder, separators=(',', ':'))
+                response = Response(payload, mimetype='application/json')
+            else:
+                response = jsonify({'chart_html': chart, 'downsample': visualizer.downsample_info})
+            # Failed renders are not cached and get no ETag, so the next request retries them
+            etag = visualizer.cache_key
+
+        if etag:
+            response.set_etag(etag)
+        # Revalidate every time: the same request body names a new chart once the dataset changes
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
 
     except Exception as e:
-        print(f"❌ VISUALIZATION ERROR:")
-        print(f"   Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Visualization error: %s", e)
         return jsonify({'error': f'Grafik oluşturulurken hata: {str(e)}'}), 500
 
 
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the ingest -> analyze -> visualize pipeline
+
+Generates sales-style CSV files for every rows x columns combination, then times
+DataProcessor.load_data, analyze_data, each AnalysisEngine analysis and each
+Visualizer chart separately, recording the peak memory of every stage. Results are
+written as JSON so scaling curves and regressions can be compared across runs.
+
+Two memory figures are kept per stage: the growth of resident memory over the stage
+(includes native Arrow buffers, but the allocator may reuse memory freed by earlier
+stages) and the peak of Python and numpy allocations from an extra tracemalloc run.
+
+    python scripts/benchmark.py --rows 10000 100000 --columns 5 50 --output bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analysis_engine import AnalysisEngine  # noqa: E402
+from utils.data_processor import DataProcessor  # noqa: E402
+from utils.visualizer import Visualizer  # noqa: E402
+from sample_data_generator import write_sales_data  # noqa: E402
+
+DEFAULT_ROWS = [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+DEFAULT_COLUMNS = [5, 50, 500]
+
+ANALYSES = ['descriptive', 'correlation', 'distribution', 'outlier', 'clustering', 'pca', 'trend', 'comparison']
+CHARTS = {
+    'histogram': '_create_histogram',
+    'scatter': '_create_scatter_plot',
+    'line': '_create_line_plot',
+    'bar': '_create_bar_chart',
+    'pie': '_create_pie_chart',
+    'box': '_create_box_plot',
+    'heatmap': '_create_heatmap',
+    'correlation': '_create_correlation_matrix'
+}
+
+
+class PeakMemory:
+    """Peak resident memory of this process while the block runs, sampled from /proc"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_bytes = None
+        self.peak_bytes = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start_bytes = self.peak_bytes = _rss_bytes()
+        if self.start_bytes is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak_bytes = max(self.peak_bytes, _rss_bytes())
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, _rss_bytes())
+
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _max_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def run_stage(name, function, repeat=1, verbose=False, trace=True):
+    """Time function repeat times, then optionally once more under tracemalloc"""
+    record = {'stage': name}
+    timings = []
+    result = None
+    for run in range(repeat):
+        try:
+            with _quiet(verbose), PeakMemory() as memory:
+                started = time.perf_counter()
+                result = function()
+                timings.append(time.perf_counter() - started)
+        except Exception as e:
+            record['error'] = str(e)
+            break
+        if run == 0 and memory.start_bytes is not None:
+            record['peak_memory_bytes'] = memory.peak_bytes - memory.start_bytes
+            record['rss_bytes'] = memory.peak_bytes
+
+    if trace and 'error' not in record:
+        # A separate run, since tracing slows allocation-heavy code down
+        tracemalloc.start()
+        try:
+            with _quiet(verbose):
+                baseline = tracemalloc.get_traced_memory()[0]
+                function()
+                record['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1] - baseline
+        except Exception as e:
+            record['error'] = str(e)
+        finally:
+            tracemalloc.stop()
+
+    if isinstance(result, dict) and 'error' in result:
+        record['error'] = str(result['error'])
+    if timings:
+        record['seconds'] = min(timings)
+        record['runs'] = timings
+    record['max_rss_bytes'] = _max_rss_bytes()
+    return record, result
+
+
+def _quiet(verbose):
+    # The pipeline logs every step; printing would be timed along with the work
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def benchmark_dataset(n_rows, n_columns, workdir, repeat=1, verbose=False, trace=True):
+    """All stages for one generated dataset"""
+    path = os.path.join(workdir, f'sales_{n_rows}x{n_columns}.csv')
+    started = time.perf_counter()
+    csv_bytes = write_sales_data(path, n_rows, 'csv', n_columns=n_columns)
+    entry = {'rows': n_rows, 'columns': n_columns, 'csv_bytes': csv_bytes,
+             'generate_seconds': time.perf_counter() - started, 'stages': []}
+
+    try:
+        record, data = run_stage('load_data', lambda: DataProcessor().load_data(path), repeat, verbose, trace)
+        entry['stages'].append(record)
+        if data is None:
+            return entry
+        entry['memory_usage_bytes'] = int(data.memory_usage(deep=True).sum())
+
+        # Every stage gets a fresh frame object, so no stage reuses values memoized by an earlier one
+        record, _ = run_stage('analyze_data', lambda: DataProcessor().analyze_data(data.copy(deep=False)),
+                              repeat, verbose, trace)
+        entry['stages'].append(record)
+
+        engine = AnalysisEngine(executor='serial')
+        for analysis_type in ANALYSES:
+            method = getattr(engine, f'_perform_{analysis_type}_analysis')
+            record, _ = run_stage(f'analysis.{analysis_type}', lambda: method(data.copy(deep=False)), repeat, verbose,
+                                  trace)
+            entry['stages'].append(record)
+
+        visualizer = Visualizer(output_format='figure')
+        for chart_type, method_name in CHARTS.items():
+            method = getattr(visualizer, method_name)
+            record, _ = run_stage(f'chart.{chart_type}', lambda: method(data.copy(deep=False)), repeat, verbose, trace)
+            entry['stages'].append(record)
+    finally:
+        os.remove(path)
+
+    return entry
+
+
+def environment_info():
+    """Versions and machine details stored with every run"""
+    import plotly
+    import pyarrow
+    import scipy
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': {
+            'numpy': np.__version__, 'pandas': pd.__version__, 'pyarrow': pyarrow.__version__,
+            'scipy': scipy.__version__, 'scikit-learn': sklearn.__version__, 'plotly': plotly.__version__
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ingest -> analyze -> visualize pipeline')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--columns', type=int, nargs='+', default=DEFAULT_COLUMNS)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per stage; the fastest is reported')
+    parser.add_argument('--max-cells', type=int, default=10 ** 8,
+                        help='skip datasets with more rows x columns than this')
+    parser.add_argument('--workdir', default=None, help='where generated CSV files are written')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--no-trace', action='store_true', help='skip the extra tracemalloc run per stage')
+    parser.add_argument('--verbose', action='store_true', help='keep the pipeline\'s own log output')
+    args = parser.parse_args()
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'config': {'rows': args.rows, 'columns': args.columns, 'repeat': args.repeat, 'max_cells': args.max_cells,
+                   'trace': not args.no_trace},
+        'results': []
+    }
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        for n_rows in args.rows:
+            for n_columns in args.columns:
+                if n_rows * n_columns > args.max_cells:
+                    print(f"⏭️ {n_rows} x {n_columns}: skipped (over --max-cells)")
+                    report['results'].append({'rows': n_rows, 'columns': n_columns, 'skipped': 'max_cells'})
+                    continue
+
+                print(f"⏱️ {n_rows} x {n_columns}...")
+                entry = benchmark_dataset(n_rows, n_columns, workdir, args.repeat, args.verbose, not args.no_trace)
+                report['results'].append(entry)
+                for record in entry['stages']:
+                    status = f"❌ {record['error']}" if 'error' in record else ''
+                    memory = ' '.join(f"{record[key] / 2 ** 20:8.1f} MB" if key in record else '       - MB'
+                                      for key in ('peak_memory_bytes', 'traced_peak_bytes'))
+                    print(f"   {record['stage']:<24} {record.get('seconds', float('nan')):9.3f} s {memory} {status}")
+
+                # Written after every dataset, so a long run that is interrupted keeps its results
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📄 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
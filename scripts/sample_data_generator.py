@@ -7,38 +7,163 @@ import pandas as pd
 import numpy as np
 import json
 import os
+import argparse
+import time
 from datetime import datetime, timedelta
 
-def generate_sales_data():
-    """Generate sample sales data"""
-    np.random.seed(42)
-    
-    # Generate date range
-    start_date = datetime(2023, 1, 1)
-    end_date = datetime(2024, 12, 31)
-    date_range = pd.date_range(start_date, end_date, freq='D')
-    
-    # Sample data
-    products = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Tablet', 'Phone']
-    regions = ['İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya']
-    sales_reps = ['Ali Yılmaz', 'Ayşe Demir', 'Mehmet Kaya', 'Fatma Özkan', 'Can Arslan']
-    
-    data = []
-    for _ in range(1000):
-        record = {
-            'tarih': pd.to_datetime(np.random.choice(date_range)).strftime('%Y-%m-%d'),
-            'ürün': np.random.choice(products),
-            'bölge': np.random.choice(regions),
-            'satış_temsilcisi': np.random.choice(sales_reps),
-            'miktar': np.random.randint(1, 20),
-            'birim_fiyat': np.random.uniform(50, 2000),
-            'indirim_oranı': np.random.uniform(0, 0.3)
-        }
-        record['toplam_satış'] = record['miktar'] * record['birim_fiyat'] * (1 - record['indirim_oranı'])
-        data.append(record)
-    
-    df = pd.DataFrame(data)
-    return df
+SALES_FORMATS = ('csv', 'jsonl', 'xlsx', 'parquet')
+SALES_COLUMNS = ['tarih', 'ürün', 'miktar', 'birim_fiyat', 'toplam_satış', 'bölge', 'satış_temsilcisi',
+                 'indirim_oranı']
+
+PRODUCTS = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Tablet', 'Phone']
+REGIONS = ['İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya']
+SALES_REPS = ['Ali Yılmaz', 'Ayşe Demir', 'Mehmet Kaya', 'Fatma Özkan', 'Can Arslan']
+
+# One string per day, indexed instead of formatting a date for every row
+DATES = pd.date_range('2023-01-01', '2024-12-31', freq='D').strftime('%Y-%m-%d').to_numpy(dtype=object)
+
+XLSX_MAX_ROWS = 1048575  # one sheet, below the header row
+JSONL_SLICE_ROWS = 50000
+
+
+def generate_sales_data(n_rows=1000, n_columns=len(SALES_COLUMNS), cardinality=None, null_rate=0.0, skew=0.0,
+                        seed=42):
+    """Generate sample sales data as one frame; see iter_sales_chunks for the parameters"""
+    return next(iter_sales_chunks(n_rows, n_columns, cardinality, null_rate, skew, seed, chunk_rows=n_rows))
+
+
+def iter_sales_chunks(n_rows, n_columns=len(SALES_COLUMNS), cardinality=None, null_rate=0.0, skew=0.0, seed=42,
+                      chunk_rows=500000):
+    """Yield n_rows of sales data as frames of at most chunk_rows rows
+
+    Columns past the eight sales columns are numeric metrics loosely tied to the sales
+    total. cardinality sets the number of distinct products, regions and sales reps
+    (default: the built-in lists; extra values get numbered names), skew is the Zipf
+    exponent of their frequencies (0 is uniform) and null_rate the share of missing
+    cells in every column. Output is reproducible for a given seed and chunk_rows.
+    """
+    if n_rows < 1:
+        raise ValueError(f"Geçersiz satır sayısı: {n_rows}")
+    if n_columns < 1:
+        raise ValueError(f"Geçersiz sütun sayısı: {n_columns}")
+    if not 0.0 <= null_rate < 1.0:
+        raise ValueError(f"Geçersiz boş değer oranı: {null_rate}")
+    if skew < 0:
+        raise ValueError(f"Geçersiz çarpıklık: {skew}")
+    if cardinality is not None and cardinality < 1:
+        raise ValueError(f"Geçersiz kardinalite: {cardinality}")
+
+    rng = np.random.default_rng(seed)
+    vocabularies = {
+        'ürün': _vocabulary(PRODUCTS, 'Ürün', cardinality),
+        'bölge': _vocabulary(REGIONS, 'Bölge', cardinality),
+        'satış_temsilcisi': _vocabulary(SALES_REPS, 'Temsilci', cardinality)
+    }
+    probabilities = {name: _zipf_probabilities(len(values), skew) for name, values in vocabularies.items()}
+    names = SALES_COLUMNS[:n_columns]
+    weights = rng.uniform(-1, 1, max(n_columns - len(names), 0))
+
+    for start in range(0, n_rows, chunk_rows):
+        size = min(chunk_rows, n_rows - start)
+        quantity = rng.integers(1, 20, size)
+        unit_price = rng.uniform(50, 2000, size)
+        discount = rng.uniform(0, 0.3, size)
+        total = quantity * unit_price * (1 - discount)
+
+        columns = {}
+        for name in names:
+            if name in vocabularies:
+                codes = rng.choice(len(vocabularies[name]), size, p=probabilities[name])
+                columns[name] = pd.Categorical.from_codes(codes, categories=vocabularies[name])
+            elif name == 'tarih':
+                columns[name] = DATES[rng.integers(0, len(DATES), size)]
+            else:
+                columns[name] = {'miktar': pd.array(quantity, dtype='Int64'), 'birim_fiyat': unit_price,
+                                 'toplam_satış': total, 'indirim_oranı': discount}[name]
+        for i, weight in enumerate(weights, start=len(names)):
+            columns[f'metrik_{i}'] = weight * total / 1000 + rng.normal(size=size)
+
+        chunk = pd.DataFrame(columns)
+        if null_rate > 0:
+            for name in chunk.columns:
+                missing = rng.random(size) < null_rate
+                if missing.any():
+                    chunk[name] = chunk[name].mask(missing)
+        yield chunk
+
+
+def write_sales_data(path, n_rows, file_format=None, chunk_rows=500000, **options):
+    """Stream generated sales data to a CSV, JSON Lines, XLSX or Parquet file
+
+    Only one chunk is in memory at a time. The format defaults to the file
+    extension; options are passed on to iter_sales_chunks. Returns the file size.
+    """
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.').lower()
+    if file_format not in SALES_FORMATS:
+        raise ValueError(f"Desteklenmeyen dosya formatı: {file_format}")
+    if file_format == 'xlsx' and n_rows > XLSX_MAX_ROWS:
+        raise ValueError(f"XLSX bir sayfada en fazla {XLSX_MAX_ROWS} satır alır")
+
+    chunks = iter_sales_chunks(n_rows, chunk_rows=chunk_rows, **options)
+    if file_format in ('csv', 'parquet'):
+        _write_arrow(path, chunks, file_format)
+    elif file_format == 'xlsx':
+        _write_xlsx(path, chunks)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                # to_json holds several copies of its output; smaller slices keep that bounded
+                for start in range(0, len(chunk), JSONL_SLICE_ROWS):
+                    chunk.iloc[start:start + JSONL_SLICE_ROWS].to_json(f, orient='records', lines=True,
+                                                                       force_ascii=False)
+    return os.path.getsize(path)
+
+
+def _write_arrow(path, chunks, file_format):
+    # Arrow's writers are native code; pandas' to_csv is several times slower
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = (pq.ParquetWriter(path, schema) if file_format == 'parquet'
+                          else pa_csv.CSVWriter(path, schema))
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx(path, chunks):
+    from openpyxl import Workbook
+
+    # Write-only mode streams rows to disk instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            sheet.append(list(chunk.columns))
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def _vocabulary(names, label, cardinality):
+    if cardinality is None:
+        return list(names)
+    return list(names[:cardinality]) + [f'{label} {i + 1}' for i in range(len(names), cardinality)]
+
+
+def _zipf_probabilities(n_values, skew):
+    weights = 1.0 / np.arange(1, n_values + 1) ** skew
+    return weights / weights.sum()
+
 
 def generate_employee_data():
     """Generate sample employee data"""
@@ -70,6 +195,7 @@ def generate_employee_data():
     df = pd.DataFrame(data)
     return df
 
+
 def generate_customer_data():
     """Generate sample customer data"""
     np.random.seed(456)
@@ -96,6 +222,7 @@ def generate_customer_data():
     df = pd.DataFrame(data)
     return df
 
+
 def save_sample_datasets():
     """Save all sample datasets to files"""
     # Create sample_data directory if it doesn't exist
@@ -126,5 +253,32 @@ def save_sample_datasets():
     print("  - employee_data.csv, employee_data.xlsx")
     print("  - customer_data.csv, customer_data.json")
 
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate sample datasets; with --rows, stream one large sales file')
+    parser.add_argument('--rows', type=int, help='rows of sales data to write to --output')
+    parser.add_argument('--output', default='sample_data/sales_large.csv',
+                        help='file to write; the extension picks the format unless --format is given')
+    parser.add_argument('--format', choices=SALES_FORMATS)
+    parser.add_argument('--columns', type=int, default=len(SALES_COLUMNS))
+    parser.add_argument('--cardinality', type=int, default=None, help='distinct values per categorical column')
+    parser.add_argument('--null-rate', type=float, default=0.0)
+    parser.add_argument('--skew', type=float, default=0.0, help='Zipf exponent of categorical frequencies')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=500000)
+    args = parser.parse_args()
+
+    if args.rows is None:
+        save_sample_datasets()
+        return
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    started = time.perf_counter()
+    size = write_sales_data(args.output, args.rows, args.format, args.chunk_rows, n_columns=args.columns,
+                            cardinality=args.cardinality, null_rate=args.null_rate, skew=args.skew, seed=args.seed)
+    print(f"{args.rows} rows written to {args.output} ({size / 2 ** 20:.1f} MB) "
+          f"in {time.perf_counter() - started:.1f} s")
+
+
 if __name__ == '__main__':
-    save_sample_datasets()
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Streaming CSV to Arrow conversion: encoding fallback and type widening across blocks
+"""
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.data_processor import DataProcessor
+
+# Enough rows to span several 1 MB Arrow read blocks
+BLOCK_ROWS = 150000
+
+
+def _read_arrow(path):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _write_rows(path, header, rows):
+    with open(path, 'wb') as f:
+        f.write(header + b'\n' + b''.join(row + b'\n' for row in rows))
+
+
+def test_bad_byte_past_sniffed_sample(tmp_path):
+    path, dest = str(tmp_path / 'veri.csv'), str(tmp_path / 'veri.arrow')
+    _write_rows(path, b'a,b', [b'%d,x%d' % (i, i) for i in range(20000)] + [b'1,caf\xe9'])
+
+    DataProcessor(sniff_bytes=4096).convert_to_arrow(path, dest)
+    table = _read_arrow(dest)
+
+    assert table.schema.field('b').type == pa.string()
+    assert table['b'][0].as_py() == 'x0'
+    assert table['b'][-1].as_py() == 'café'
+    assert table.num_rows == len(pd.read_csv(path, encoding='latin-1'))
+
+
+def test_bad_byte_in_a_later_block(tmp_path):
+    path, dest = str(tmp_path / 'veri.csv'), str(tmp_path / 'veri.arrow')
+    rows = [b'%d,%d' % (i, i) for i in range(BLOCK_ROWS)]
+    rows[-1] = b'1,\xfcr\xfcn'  # forces the numeric column to text and is not UTF-8
+    _write_rows(path, b'a,b', rows)
+
+    DataProcessor(sniff_bytes=4096).convert_to_arrow(path, dest)
+    table = _read_arrow(dest)
+
+    assert table.schema.field('b').type == pa.string()
+    assert table['b'][0].as_py() == '0'
+    assert table['b'][-1].as_py() == 'ürün'
+
+
+def test_types_widened_when_a_later_block_disagrees(tmp_path):
+    path, dest = str(tmp_path / 'veri.csv'), str(tmp_path / 'veri.arrow')
+    rows = [b'%d,%d,%d' % (i, i, i) for i in range(BLOCK_ROWS)]
+    rows[-1] = b'1,2.5,yok'
+    _write_rows(path, b'a,b,c', rows)
+
+    DataProcessor().convert_to_arrow(path, dest)
+    table = _read_arrow(dest)
+
+    assert table.schema.field('a').type == pa.int64()
+    assert table.schema.field('b').type == pa.float64()
+    assert table.schema.field('c').type == pa.string()
+    assert table.num_rows == BLOCK_ROWS
+    assert table['b'][-1].as_py() == 2.5 and table['c'][-1].as_py() == 'yok'
+    assert table['c'][0].as_py() == '0'
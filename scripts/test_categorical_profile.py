@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Distinct-count and heavy-hitter sketches against exact counts
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.categorical_profile import compute_categorical_profile
+from utils.sketches import HyperLogLog, MisraGries
+
+
+def _hashes(values):
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+@pytest.mark.parametrize('distinct', [1, 10, 1000, 100000])
+def test_hyperloglog_close_to_exact_distinct_count(distinct):
+    sketch = HyperLogLog(precision=14)
+    sketch.update_hashes(_hashes([f'değer-{i}' for i in range(distinct)]))
+
+    # Three standard errors of the estimator
+    assert abs(sketch.count() - distinct) <= max(3 * 1.04 / np.sqrt(2 ** 14) * distinct, 1)
+
+
+def test_hyperloglog_merge_ignores_duplicates():
+    first = HyperLogLog(12).update_hashes(_hashes(range(0, 6000)))
+    second = HyperLogLog(12).update_hashes(_hashes(range(3000, 9000)))
+    whole = HyperLogLog(12).update_hashes(_hashes(range(0, 9000)))
+
+    assert first.merge(second).count() == whole.count()
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=4)
+
+
+def test_misra_gries_counts_are_bounded_lower_bounds():
+    rng = np.random.default_rng(5)
+    values = pd.Series(rng.zipf(1.5, 20000) % 500)
+    exact = values.value_counts()
+
+    summary = MisraGries(capacity=20)
+    for start in range(0, len(values), 1000):
+        summary.update_counts(values.iloc[start:start + 1000].value_counts(sort=False))
+
+    assert summary.total == len(values)
+    assert summary.error <= summary.total / (summary.capacity + 1)
+    assert len(summary.counters) <= summary.capacity
+    undercount = exact[summary.counters.index] - summary.counters
+    assert (undercount >= 0).all() and (undercount <= summary.error).all()
+    # Anything more frequent than the error bound is guaranteed to be kept
+    assert set(exact[exact > summary.error].index) <= set(summary.counters.index)
+
+
+def test_misra_gries_merge_is_exact_below_capacity():
+    first = MisraGries(10).update_counts(pd.Series({'a': 3, 'b': 1}))
+    second = MisraGries(10).update_counts(pd.Series({'b': 2, 'c': 5}))
+    merged = first.merge(second)
+
+    assert merged.error == 0
+    assert merged.top().to_dict() == {'c': 5, 'a': 3, 'b': 3}
+
+
+def test_profile_matches_value_counts():
+    rng = np.random.default_rng(8)
+    data = pd.DataFrame({
+        'şehir': rng.choice(['İstanbul', 'Ankara', 'İzmir', 'Bursa'], 2500),
+        'kod': pd.Categorical(rng.choice(['A', 'B', 'C'], 2500), categories=['A', 'B', 'C', 'D'])
+    })
+    data.loc[::7, 'şehir'] = None
+
+    profile = compute_categorical_profile(data, ['şehir', 'kod'], chunk_rows=400)
+
+    for col in ('şehir', 'kod'):
+        exact = data[col].value_counts()
+        exact = exact[exact > 0]  # unused categories are not reported
+        assert profile[col]['count'] == data[col].notna().sum()
+        assert profile[col]['unique_count'] == data[col].nunique()
+        assert profile[col]['count_error'] == 0
+        assert profile[col]['top'].to_dict() == exact.to_dict()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Rendered-chart caching: hits, keys that follow the output, and failed renders
+"""
+
+import numpy as np
+import pandas as pd
+
+import utils.visualizer as visualizer_module
+from utils.result_cache import ResultCache
+from utils.visualizer import Visualizer
+
+
+def _sample_frame():
+    rng = np.random.default_rng(31)
+    return pd.DataFrame({
+        'yaş': rng.integers(18, 65, 200),
+        'maaş': rng.normal(8000, 1500, 200),
+        'departman': rng.choice(['IT', 'Satış'], 200)
+    })
+
+
+def test_chart_served_from_cache():
+    data = _sample_frame()
+    cache = ResultCache()
+    visualizer = Visualizer(cache=cache)
+
+    first = visualizer.create_chart('bar', data)
+    key = visualizer.cache_key
+    assert key is not None and cache.get(key)[0] == first
+
+    second = Visualizer(cache=cache).create_chart('bar', data)
+    assert second == first
+
+
+def test_cache_key_follows_data_and_options():
+    data = _sample_frame()
+    visualizer = Visualizer(cache=ResultCache())
+    visualizer.create_chart('histogram', data)
+    key = visualizer.cache_key
+
+    assert visualizer.chart_cache_key('f', 'histogram') == visualizer.chart_cache_key('f', 'histogram')
+    visualizer.create_chart('histogram', data.assign(yaş=data['yaş'] + 1))
+    assert visualizer.cache_key != key
+    other = Visualizer(max_points=100, cache=ResultCache())
+    other.create_chart('histogram', data)
+    assert other.cache_key != key
+
+
+def test_failed_render_not_cached(monkeypatch):
+    data = _sample_frame()
+    cache = ResultCache()
+
+    def fail(*args, **kwargs):
+        raise MemoryError('bellek yetersiz')
+
+    monkeypatch.setattr(visualizer_module.px, 'bar', fail)
+    failed = Visualizer(cache=cache).create_chart('bar', data)
+    assert 'alert-danger' in failed and 'bellek yetersiz' in failed
+
+    visualizer = Visualizer(cache=cache)
+    visualizer.create_chart('bar', data)
+    assert visualizer.cache_key is None
+    monkeypatch.undo()
+
+    recovered = visualizer.create_chart('bar', data)
+    assert 'alert-danger' not in recovered
+    assert cache.get(visualizer.cache_key)[0] == recovered
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Sampled MiniBatchKMeans clustering: serial sweep in workers, same result as threaded
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import utils.analysis_engine as analysis_engine
+from utils.analysis_engine import AnalysisEngine
+
+
+def _blobs(n=6000):
+    rng = np.random.default_rng(101)
+    centres = np.array([[0, 0], [8, 8], [0, 8]])
+    labels = rng.integers(0, 3, n)
+    values = centres[labels] + rng.normal(size=(n, 2))
+    return pd.DataFrame(values, columns=['x', 'y'])
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError('thread pool started')
+
+
+def test_single_worker_sweeps_serially(monkeypatch):
+    data = _blobs()
+    threaded = AnalysisEngine(max_workers=4, clustering_sample_size=1000)._perform_clustering_analysis(data)
+
+    monkeypatch.setattr(analysis_engine, 'ThreadPoolExecutor', _fail)
+    serial = AnalysisEngine(max_workers=1, clustering_sample_size=1000)._perform_clustering_analysis(data)
+
+    assert serial['method'] == 'minibatch'
+    assert serial == threaded
+    assert sum(stats['size'] for stats in serial['cluster_stats'].values()) == len(data)
+
+
+def test_worker_entry_point_sweeps_serially(monkeypatch):
+    data = _blobs()
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = sink.getvalue()
+
+    monkeypatch.setattr(analysis_engine, 'ThreadPoolExecutor', _fail)
+    shm = shared_memory.SharedMemory(create=True, size=payload.size)
+    try:
+        shm.buf[:payload.size] = payload.to_pybytes()
+        # Called in this process, so a thread pool started by the worker's engine would show
+        result, _, _, _ = analysis_engine._run_shared_analysis(
+            shm.name, 'clustering', {'clustering_sample_size': 1000})
+    finally:
+        shm.close()
+        shm.unlink()
+
+    assert result['method'] == 'minibatch'
+    assert result == AnalysisEngine(max_workers=1, clustering_sample_size=1000)._perform_clustering_analysis(data)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Grouped one-way ANOVA against scipy and the comparison group cap
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from utils.analysis_engine import AnalysisEngine
+
+
+def _sample_frame(n=600):
+    rng = np.random.default_rng(41)
+    data = pd.DataFrame({
+        'departman': rng.choice(['IT', 'Satış', 'İK'], n),
+        'kimlik': [f'K{i}' for i in range(n)],
+        'maaş': rng.normal(1e5, 20.0, n),
+        'deneyim': rng.integers(0, 20, n).astype(float)
+    })
+    data.loc[data['departman'] == 'IT', 'maaş'] += 5.0
+    data.loc[::17, 'deneyim'] = np.nan
+    return data
+
+
+def test_grouped_anova_matches_f_oneway():
+    data = _sample_frame()
+    results = AnalysisEngine()._grouped_anova(data, 'departman', pd.Index(['maaş', 'deneyim']))
+
+    for col in ('maaş', 'deneyim'):
+        groups = [values.dropna() for _, values in data.groupby('departman')[col]]
+        expected = stats.f_oneway(*groups)
+        assert np.isclose(results[col]['f_statistic'], expected.statistic, rtol=1e-9)
+        assert np.isclose(results[col]['p_value'], expected.pvalue, rtol=1e-7)
+        assert results[col]['group_count'] == 3
+        means = data.groupby('departman')[col].mean()
+        for name, mean in results[col]['group_means'].items():
+            assert np.isclose(mean, means[name], rtol=1e-12)
+
+
+def test_high_cardinality_columns_skipped():
+    data = _sample_frame()
+    result = AnalysisEngine(comparison_max_groups=50)._perform_comparison_analysis(data)
+
+    assert result['skipped_columns'] == ['kimlik']
+    assert set(result['comparison_results']) == {'departman_vs_maaş', 'departman_vs_deneyim'}
+
+    capped = AnalysisEngine(comparison_max_groups=2)._perform_comparison_analysis(data)
+    assert capped['skipped_columns'] == ['departman', 'kimlik']
+    assert capped['comparison_results'] == {}
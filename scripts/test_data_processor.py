@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Chunked, compacted CSV loading against a plain pandas read
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import DataProcessor
+
+
+def _write_csv(path, n=1000, sep=','):
+    rng = np.random.default_rng(51)
+    data = pd.DataFrame({
+        'yaş': rng.integers(18, 65, n),
+        'maaş': rng.normal(8000, 1500, n).round(2),
+        'şehir': rng.choice(['İstanbul', 'Ankara', 'İzmir'], n),
+        'not': [f'açıklama {i}' for i in range(n)]
+    })
+    # Only the later chunks see these values
+    data['seviye'] = np.where(np.arange(n) < n // 2, 'A', np.arange(n).astype(str))
+    data.to_csv(path, index=False, sep=sep)
+    return data
+
+
+def test_chunked_load_matches_read_csv(tmp_path):
+    path = str(tmp_path / 'veri.csv')
+    _write_csv(path, sep=';')
+    expected = pd.read_csv(path, sep=';')
+
+    loaded = DataProcessor(chunk_size=128).load_data(path)
+
+    assert list(loaded.columns) == list(expected.columns)
+    for col in expected.columns:
+        actual = loaded[col].astype(object) if isinstance(loaded[col].dtype, pd.CategoricalDtype) else loaded[col]
+        np.testing.assert_array_equal(actual.to_numpy(), expected[col].to_numpy())
+
+
+def test_chunked_compaction_report(tmp_path):
+    path = str(tmp_path / 'veri.csv')
+    _write_csv(path)
+
+    processor = DataProcessor(chunk_size=128)
+    loaded = processor.load_data(path)
+    report = processor.compaction_report
+
+    assert report['memory_after'] == int(loaded.memory_usage(deep=True).sum())
+    assert report['memory_after'] < report['memory_before']
+    assert str(loaded['şehir'].dtype) == 'category'
+    # Categorical in the first chunks and numeric in the later ones: text overall
+    assert loaded['seviye'].dtype == object
+    assert loaded['seviye'].map(type).eq(str).all()
+    assert 'seviye' not in report['converted_columns']
+    assert report['converted_columns']['yaş'] == f"int64 -> {loaded['yaş'].dtype}"
+
+
+
+def test_mixed_column_with_blanks_keeps_its_text(tmp_path):
+    path = str(tmp_path / 'veri.csv')
+    # Text in the first chunk; numbers and blanks, parsed as floats, in the later ones
+    codes = ['A'] * 128 + ['', '1', '2', '007'] * 64
+    pd.DataFrame({'id': range(len(codes)), 'kod': codes}).to_csv(path, index=False)
+    expected = pd.read_csv(path)
+
+    for compact in (True, False):
+        loaded = DataProcessor(chunk_size=128).load_data(path, compact=compact)
+        kod = loaded['kod'].astype(object)
+        assert kod.isna().tolist() == expected['kod'].isna().tolist()
+        assert kod.dropna().tolist() == expected['kod'].dropna().tolist()
+        assert kod.iloc[128:132].tolist()[1:] == ['1', '2', '007']
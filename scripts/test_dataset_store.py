@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Appending rows to stored datasets, in memory and out of core
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.dataset_store import DatasetStore
+
+
+def _sample_table(n=100):
+    rng = np.random.default_rng(81)
+    start = datetime.date(2024, 1, 1)
+    return pa.table({
+        'tarih': pa.array([start + datetime.timedelta(days=i) for i in range(n)], pa.date32()),
+        'satış': pa.array(rng.normal(100, 10, n)),
+        'adet': pa.array(rng.integers(1, 10, n)),
+        'bölge': pa.array(rng.choice(['Kuzey', 'Güney'], n))
+    })
+
+
+def _save_chunked(store, table):
+    def write(path):
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return store.save_chunked(write)
+
+
+def test_chunked_append_of_partial_rows(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    table = _sample_table()
+    dataset_id = _save_chunked(store, table)
+
+    batch = pd.DataFrame([{'satış': 120.5, 'bölge': 'Kuzey'}, {'satış': 80.0, 'adet': 3}])
+    data, statistics = store.append(dataset_id, batch)
+
+    assert isinstance(data, ChunkedDataset) and len(data) == 102
+    assert data.schema == table.schema
+    appended = data.read().tail(2)
+    assert appended['tarih'].isna().all()
+    assert appended['satış'].tolist() == [120.5, 80.0]
+    assert appended['adet'].isna().tolist() == [True, False]
+    assert appended['bölge'].tolist() == ['Kuzey', None]
+    assert statistics.rows == 102
+    assert statistics.missing_values()['tarih'] == 2
+
+
+def test_chunked_append_rejects_values_of_the_wrong_type(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    dataset_id = _save_chunked(store, _sample_table())
+
+    with pytest.raises(ValueError, match='tarih'):
+        store.append(dataset_id, pd.DataFrame([{'tarih': 'dün', 'satış': 1.0}]))
+    with pytest.raises(ValueError, match='Bilinmeyen'):
+        store.append(dataset_id, pd.DataFrame([{'fiyat': 1.0}]))
+
+
+def _sample_frame(n=100):
+    frame = _sample_table(n).to_pandas()
+    frame['bölge'] = frame['bölge'].astype('category')
+    return frame
+
+
+def _batch(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'satış': rng.normal(100, 10, n),
+        'adet': rng.integers(1, 10, n),
+        'bölge': rng.choice(['Kuzey', 'Güney', 'Batı'], n)
+    })
+
+
+def test_frame_append_writes_segments_without_rewriting(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    dataset_id = store.save(_sample_frame())
+    base = tmp_path / f'{dataset_id}.feather'
+    base_written = base.stat().st_mtime_ns
+
+    expected = _sample_frame()
+    for seed in range(3):
+        batch = _batch(10, seed)
+        data, statistics = store.append(dataset_id, batch)
+        expected = pd.concat([expected, batch], ignore_index=True)
+
+    assert base.stat().st_mtime_ns == base_written
+    assert len(list(tmp_path.glob(f'{dataset_id}.100.*.feather'))) == 3
+    assert len(data) == 130 and statistics.rows == 130
+    assert set(data['bölge'].cat.categories) == {'Kuzey', 'Güney', 'Batı'}
+
+    # A fresh store reads the base file and its segments back
+    reloaded = DatasetStore(str(tmp_path)).load(dataset_id)
+    columns = ['satış', 'adet', 'bölge']
+    pd.testing.assert_frame_equal(reloaded[columns].astype({'bölge': object}), data[columns].astype({'bölge': object}))
+    assert reloaded['tarih'].isna().sum() == data['tarih'].isna().sum() == 30
+    np.testing.assert_allclose(reloaded['satış'], expected['satış'])
+    assert reloaded['adet'].tolist() == expected['adet'].tolist()
+
+
+def test_frame_segments_compacted_once_they_outgrow_the_base(tmp_path):
+    store = DatasetStore(str(tmp_path), max_segments=4)
+    dataset_id = store.save(_sample_frame())
+
+    for seed in range(4):
+        store.append(dataset_id, _batch(10, seed))
+    # The fifth segment would exceed max_segments: everything is folded into the base
+    data, _ = store.append(dataset_id, _batch(10, 4))
+    assert not list(tmp_path.glob(f'{dataset_id}.*.*.feather'))
+    assert len(pd.read_feather(tmp_path / f'{dataset_id}.feather')) == 150
+
+    # Then a batch larger than the base is compacted right away
+    data, _ = store.append(dataset_id, _batch(200, 5))
+    assert not list(tmp_path.glob(f'{dataset_id}.*.*.feather'))
+    assert len(DatasetStore(str(tmp_path)).load(dataset_id)) == len(data) == 350
+
+
+def test_stale_segments_ignored_after_compaction(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    dataset_id = store.save(_sample_frame())
+    store.append(dataset_id, _batch(10, 0))
+    # A segment left behind by a crash between compaction and cleanup
+    stale = tmp_path / f'{dataset_id}.100.0.feather'
+    stale_bytes = stale.read_bytes()
+    store.append(dataset_id, _batch(200, 1))
+    stale.write_bytes(stale_bytes)
+
+    assert len(DatasetStore(str(tmp_path)).load(dataset_id)) == 310
+    store.delete(dataset_id)
+    assert not list(tmp_path.glob(f'{dataset_id}*'))
+
+
+def test_frame_append_of_partial_rows(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    dataset_id = store.save(_sample_frame())
+
+    data, statistics = store.append(dataset_id, pd.DataFrame([{'satış': 1.5}, {'adet': 2, 'bölge': 'Güney'}]))
+
+    assert len(data) == 102
+    assert data['tarih'].tail(2).isna().all()
+    assert statistics.missing_values().to_dict() == data.isnull().sum().to_dict()
+    reloaded = DatasetStore(str(tmp_path)).load(dataset_id)
+    assert reloaded['bölge'].tail(2).tolist()[1] == 'Güney'
+    assert np.isnan(reloaded['adet'].iloc[-2]) and reloaded['adet'].iloc[-1] == 2
+
+
+def test_chunked_appends_match_a_fresh_pass(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    dataset_id = _save_chunked(store, _sample_table())
+
+    for seed in range(3):
+        batch = _batch(20, seed)
+        batch['tarih'] = pd.Timestamp('2025-01-01')
+        data, statistics = store.append(dataset_id, batch)
+
+    assert len(data.schema) == 4 and len(list(tmp_path.glob(f'{dataset_id}.*.arrow'))) == 3
+    frame = data.read()
+    assert len(frame) == 160 and frame['tarih'].notna().all()
+    summary = statistics.summary()
+    for stat in ('count', 'mean', 'std', 'min', 'max'):
+        np.testing.assert_allclose(summary.loc[stat], frame[['satış', 'adet']].describe().loc[stat], rtol=1e-12)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Histograms and normality tests against numpy and scipy reference implementations
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from utils.distribution import _dagostino_pearson, compute_histograms, compute_normality_tests
+
+
+def _sample_frame(n):
+    rng = np.random.default_rng(11)
+    data = pd.DataFrame({
+        'normal': rng.normal(50, 5, n),
+        'çarpık': rng.exponential(3.0, n),
+        'sabit': np.full(n, 4.0),
+        'etiket': rng.choice(['x', 'y'], n)
+    })
+    data.loc[::13, 'normal'] = np.nan
+    return data
+
+
+def test_histograms_match_numpy_across_chunks():
+    data = _sample_frame(1000)
+    result = compute_histograms(data, bins=20, chunk_rows=128)
+
+    assert list(result['columns']) == ['normal', 'çarpık', 'sabit']
+    for i, col in enumerate(result['columns']):
+        counts, edges = np.histogram(data[col].dropna(), bins=20)
+        np.testing.assert_array_equal(result['counts'][i], counts)
+        np.testing.assert_allclose(result['edges'][i], edges, rtol=1e-12)
+
+
+def test_dagostino_pearson_matches_normaltest():
+    rng = np.random.default_rng(12)
+    samples = [rng.normal(size=8000), rng.exponential(size=6000), rng.uniform(size=5001)]
+    skewness = np.array([stats.skew(sample) for sample in samples])
+    kurtosis = np.array([stats.kurtosis(sample) for sample in samples])
+    n = np.array([len(sample) for sample in samples], dtype=np.float64)
+
+    statistic, p_value = _dagostino_pearson(skewness, kurtosis, n)
+
+    for i, sample in enumerate(samples):
+        expected = stats.normaltest(sample)
+        assert np.isclose(statistic[i], expected.statistic, rtol=1e-9)
+        assert np.isclose(p_value[i], expected.pvalue, rtol=1e-6, atol=1e-300)
+
+
+def test_normality_tests_pick_test_by_column_length():
+    data = _sample_frame(3000)
+    results = compute_normality_tests(data, shapiro_max_n=2800)
+
+    # 'normal' keeps 2769 values after the NaNs, the others all 3000
+    assert results['test'].to_dict() == {'normal': 'shapiro', 'çarpık': 'dagostino', 'sabit': 'dagostino'}
+    expected = stats.shapiro(data['normal'].dropna())
+    assert np.isclose(results.loc['normal', 'statistic'], expected.statistic)
+    expected = stats.normaltest(data['çarpık'])
+    assert np.isclose(results.loc['çarpık', 'statistic'], expected.statistic, rtol=1e-9)
+    assert results['n'].tolist() == [data[col].notna().sum() for col in ('normal', 'çarpık', 'sabit')]
+
+    small = compute_normality_tests(data.head(400).drop(columns='sabit'))
+    assert (small['test'] == 'shapiro').all()
+    expected = stats.shapiro(data['normal'].head(400).dropna())
+    assert np.isclose(small.loc['normal', 'statistic'], expected.statistic)
+    assert np.isclose(small.loc['normal', 'p_value'], expected.pvalue)
+
+
+def test_unknown_large_sample_test_rejected():
+    with pytest.raises(ValueError):
+        compute_normality_tests(_sample_frame(10), large_sample_test='ks')
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Line and scatter downsampling against a reference LTTB implementation
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.visualizer import Visualizer
+
+
+def _reference_lttb(x, y, threshold):
+    """Plain-loop Largest-Triangle-Three-Buckets over the same bucket edges"""
+    n = len(x)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = [0]
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+        a = selected[-1]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(21)
+    x = np.arange(2000, dtype=float)
+    y = np.cumsum(rng.normal(size=2000))
+
+    indices = Visualizer()._lttb_indices(x, y, 150)
+
+    assert len(indices) == 150
+    assert indices[0] == 0 and indices[-1] == 1999
+    assert (np.diff(indices) > 0).all()
+    np.testing.assert_array_equal(indices, _reference_lttb(x, y, 150))
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1000)
+    y[537] = 100.0
+
+    indices = Visualizer()._lttb_indices(np.arange(1000, dtype=float), y, 20)
+
+    assert 537 in indices
+    assert len(Visualizer()._lttb_indices(np.arange(10.0), np.arange(10.0), 50)) == 10
+
+
+def test_line_downsampling_within_budget():
+    data = pd.DataFrame({'x': np.arange(3000), 'y': np.sin(np.arange(3000) / 50.0)})
+    data.loc[100, 'y'] = np.nan
+    visualizer = Visualizer(max_points=500)
+
+    sampled = visualizer._downsample_line(data, 'x', 'y')
+
+    assert len(sampled) == 500 and sampled['y'].notna().all()
+    assert visualizer.downsample_info == {'downsampled': True, 'method': 'lttb',
+                                          'original_points': 3000, 'rendered_points': 500}
+
+
+def test_scatter_downsampling_keeps_extremes():
+    rng = np.random.default_rng(22)
+    data = pd.DataFrame({'x': rng.normal(size=10000), 'y': rng.normal(size=10000)})
+    visualizer = Visualizer(max_points=300)
+
+    sampled = visualizer._downsample_scatter(data, 'x', 'y')
+
+    assert 300 <= len(sampled) <= 304
+    for col in ('x', 'y'):
+        assert sampled[col].min() == data[col].min()
+        assert sampled[col].max() == data[col].max()
+    # Seeded, so the same rows are drawn every time
+    pd.testing.assert_frame_equal(sampled, Visualizer(max_points=300)._downsample_scatter(data, 'x', 'y'))
+
+    small = data.head(100)
+    assert visualizer._downsample_scatter(small, 'x', 'y') is small
+    assert not visualizer.downsample_info['downsampled']
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Background analysis jobs persisted in a temporary SQLite database
+"""
+
+import sqlite3
+import threading
+import time
+
+from utils.job_queue import JobQueue
+
+
+def _wait_for(queue, job_id, statuses=('done', 'failed'), timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+
+def test_job_runs_and_reports_progress(tmp_path):
+    def runner(job, progress):
+        for analysis_type in job['analyses']:
+            progress(analysis_type, 'done')
+        return {'analyses': job['analyses'], 'params': job['params']}
+
+    queue = JobQueue(str(tmp_path / 'jobs.db'), runner)
+    job_id = queue.submit('veri', ['basic_stats', 'correlation'], {'bins': 10})
+    job = _wait_for(queue, job_id)
+
+    assert job['status'] == 'done'
+    assert job['progress'] == {'basic_stats': 'done', 'correlation': 'done'}
+    assert queue.get_result(job_id) == {'analyses': ['basic_stats', 'correlation'], 'params': {'bins': 10}}
+    assert queue.get('bilinmeyen') is None
+
+
+def test_failed_job_keeps_error(tmp_path):
+    def runner(job, progress):
+        raise ValueError('bozuk veri')
+
+    queue = JobQueue(str(tmp_path / 'jobs.db'), runner)
+    job = _wait_for(queue, queue.submit('veri', ['outlier']))
+
+    assert job['status'] == 'failed'
+    assert job['error'] == 'bozuk veri'
+    assert queue.get_result(job['job_id']) is None
+
+
+def test_when_idle_waits_for_running_jobs(tmp_path):
+    release = threading.Event()
+    calls = []
+
+    def runner(job, progress):
+        release.wait(10)
+        return None
+
+    queue = JobQueue(str(tmp_path / 'jobs.db'), runner)
+    job_id = queue.submit('veri', ['basic_stats'])
+    _wait_for(queue, job_id, statuses=('running',))
+
+    assert queue.has_active_jobs('veri') and not queue.has_active_jobs('diğer')
+    queue.when_idle('veri', lambda: calls.append('veri'))
+    queue.when_idle('diğer', lambda: calls.append('diğer'))
+    assert calls == ['diğer']
+
+    release.set()
+    _wait_for(queue, job_id)
+    deadline = time.time() + 10
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert calls == ['diğer', 'veri']
+    assert not queue.has_active_jobs('veri')
+
+
+def test_interrupted_jobs_recovered(tmp_path):
+    db_path = str(tmp_path / 'jobs.db')
+    JobQueue(db_path, lambda job, progress: None)
+    now = time.time()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO analysis_jobs (id, dataset_id, analyses, params, status, progress, created_at, updated_at) "
+            "VALUES ('yarim', 'veri', '[\"basic_stats\"]', '{}', 'running', '{\"basic_stats\": \"running\"}', ?, ?)",
+            (now, now)
+        )
+    conn.close()
+
+    queue = JobQueue(db_path, lambda job, progress: 'sonuç')
+    job = _wait_for(queue, 'yarim')
+
+    assert job['status'] == 'done'
+    assert queue.get_result('yarim') == 'sonuç'
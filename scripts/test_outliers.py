@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Outlier flags against direct IQR, z-score and MAD computations, and the column cache
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import utils.outliers as outliers
+from utils.frame_cache import remember
+from utils.outliers import (IQR_FACTOR, MAD_THRESHOLD, Z_THRESHOLD, compute_outlier_report,
+                            export_outlier_columns, get_outlier_report, import_outlier_columns)
+
+
+def _sample_frame(n=400):
+    rng = np.random.default_rng(61)
+    data = pd.DataFrame({
+        'maaş': np.r_[rng.normal(8000, 500, n - 4), [20000, 15000, -3000, 1]],
+        'yaş': rng.integers(18, 65, n).astype(float),
+        'departman': rng.choice(['IT', 'Satış'], n)
+    })
+    data.loc[::9, 'yaş'] = np.nan
+    return data
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError('column recomputed')
+
+
+def test_flags_match_direct_computation():
+    data = _sample_frame()
+    report = compute_outlier_report(data)
+
+    for i, col in enumerate(report['columns']):
+        values = data[col].to_numpy()
+        valid = ~np.isnan(values)
+        q1, q3 = np.nanquantile(values, [0.25, 0.75])
+        iqr = q3 - q1
+        expected_iqr = (values < q1 - IQR_FACTOR * iqr) | (values > q3 + IQR_FACTOR * iqr)
+        expected_z = np.zeros(len(values), dtype=bool)
+        expected_z[valid] = np.abs(stats.zscore(values[valid])) > Z_THRESHOLD
+        median = np.nanmedian(values)
+        mad = np.nanmedian(np.abs(values - median))
+        with np.errstate(invalid='ignore'):
+            expected_mad = 0.6745 * np.abs(values - median) / mad > MAD_THRESHOLD
+
+        np.testing.assert_array_equal(report['flags']['iqr'][:, i], expected_iqr)
+        np.testing.assert_array_equal(report['flags']['zscore'][:, i], expected_z)
+        np.testing.assert_array_equal(report['flags']['mad'][:, i], expected_mad)
+        assert report['valid_counts'][i] == valid.sum()
+        assert np.isclose(report['bounds'].loc['mad', col], mad)
+
+
+def test_projection_reuses_cached_columns(monkeypatch):
+    data = _sample_frame()
+    remember(data, 'source_fingerprint', 'kaynak')
+    full = get_outlier_report(data)
+
+    projection = data[['yaş']]
+    remember(projection, 'source_fingerprint', 'kaynak')
+    monkeypatch.setattr(outliers, 'compute_outlier_report', _fail)
+    report = get_outlier_report(projection)
+
+    np.testing.assert_array_equal(report['flags']['iqr'][:, 0], full['flags']['iqr'][:, 1])
+    pd.testing.assert_series_equal(report['bounds']['yaş'], full['bounds']['yaş'])
+
+
+def test_exported_columns_import_into_empty_cache(monkeypatch):
+    data = _sample_frame()
+    remember(data, 'source_fingerprint', 'aktarılan')
+    expected = get_outlier_report(data)
+    exported = export_outlier_columns(data)
+    assert len(exported) == 2
+
+    # A fresh process: empty column cache, new frame object with the same fingerprint
+    monkeypatch.setattr(outliers, '_column_cache', OrderedDict())
+    monkeypatch.setattr(outliers, '_column_cache_size', 0)
+    import_outlier_columns(exported)
+    copy = data.copy()
+    remember(copy, 'source_fingerprint', 'aktarılan')
+    monkeypatch.setattr(outliers, 'compute_outlier_report', _fail)
+
+    report = get_outlier_report(copy)
+    for method in ('iqr', 'zscore', 'mad'):
+        np.testing.assert_array_equal(report['flags'][method], expected['flags'][method])
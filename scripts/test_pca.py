@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Truncated PCA solvers against exact PCA, with and without 90% variance reached
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+from utils.analysis_engine import AnalysisEngine
+
+
+def _low_rank_frame(n_rows, n_cols, rank=3, seed=71):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_rows, rank)) @ rng.normal(size=(rank, n_cols))
+    values += 0.01 * rng.normal(size=(n_rows, n_cols))
+    return pd.DataFrame(values, columns=[f'x{i}' for i in range(n_cols)])
+
+
+def _flat_frame(n_rows, n_cols, seed=72):
+    # Independent columns: every component explains about the same share
+    values = np.random.default_rng(seed).normal(size=(n_rows, n_cols))
+    return pd.DataFrame(values, columns=[f'x{i}' for i in range(n_cols)])
+
+
+def _exact_ratios(data):
+    return PCA().fit(StandardScaler().fit_transform(data)).explained_variance_ratio_
+
+
+def test_randomized_matches_exact_when_90_percent_reached():
+    data = _low_rank_frame(150, 120)
+    result = AnalysisEngine(pca_max_components=10)._perform_pca_analysis(data)
+
+    assert result['method'] == 'randomized'
+    assert result['n_components'] == 10
+    np.testing.assert_allclose(result['explained_variance'], _exact_ratios(data)[:5], rtol=1e-6, atol=1e-9)
+    assert result['n_components_90'] == 3
+
+
+def test_randomized_stays_bounded_on_flat_spectrum():
+    data = _flat_frame(150, 120)
+    result = AnalysisEngine(pca_max_components=10)._perform_pca_analysis(data)
+
+    assert result['method'] == 'randomized'
+    assert result['n_components'] == 10
+    assert result['cumulative_variance'][-1] < 0.9
+    assert result['n_components_90'] is None
+
+
+def test_incremental_matches_exact_when_90_percent_reached():
+    data = _low_rank_frame(3000, 8)
+    result = AnalysisEngine(pca_incremental_min_rows=1000, pca_batch_size=700,
+                            pca_max_components=5)._perform_pca_analysis(data)
+
+    assert result['method'] == 'incremental'
+    assert result['n_components'] == 5
+    np.testing.assert_allclose(result['explained_variance'], _exact_ratios(data)[:5], rtol=1e-3, atol=1e-6)
+    assert result['n_components_90'] == 3
+
+
+def test_incremental_reports_none_on_flat_spectrum():
+    data = _flat_frame(3000, 30)
+    result = AnalysisEngine(pca_incremental_min_rows=1000, pca_batch_size=700,
+                            pca_max_components=5)._perform_pca_analysis(data)
+
+    assert result['method'] == 'incremental'
+    assert result['n_components'] == 5
+    assert result['n_components_90'] is None
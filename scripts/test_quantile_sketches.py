@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+KLL quantile sketches against exact numpy quantiles
+"""
+
+import numpy as np
+import pytest
+
+from utils.sketches import KLLSketch, QuantileSketches, kll_size_for_error
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def _rank_error(sorted_values, estimates, qs):
+    """Largest gap between the normalized rank of each estimate and its quantile"""
+    n = len(sorted_values)
+    low = np.searchsorted(sorted_values, estimates, side='left') / n
+    high = np.searchsorted(sorted_values, estimates, side='right') / n
+    return np.max(np.maximum(low - qs, qs - high).clip(min=0))
+
+
+def test_exact_before_first_compaction():
+    values = np.random.default_rng(1).normal(size=150)
+    sketch = KLLSketch(k=200).update(values[:80]).update(values[80:])
+
+    np.testing.assert_array_equal(sketch.quantiles(QS), np.quantile(values, QS))
+
+
+def test_rank_error_within_bound():
+    error = 0.01
+    values = np.random.default_rng(2).lognormal(size=50000)
+    sketch = KLLSketch(kll_size_for_error(error))
+    for start in range(0, len(values), 4096):
+        sketch.update(values[start:start + 4096])
+
+    assert sketch.count == len(values)
+    assert _rank_error(np.sort(values), sketch.quantiles(QS), QS) <= error
+    assert sketch.quantiles([0.0, 1.0]).tolist() == [values.min(), values.max()]
+
+
+def test_merged_rank_error_within_bound():
+    error = 0.02
+    values = np.random.default_rng(3).uniform(size=30000)
+    k = kll_size_for_error(error)
+    merged = KLLSketch(k, seed=0)
+    for i, start in enumerate(range(0, len(values), 7000)):
+        merged.merge(KLLSketch(k, seed=i + 1).update(values[start:start + 7000]))
+
+    assert merged.count == len(values)
+    assert _rank_error(np.sort(values), merged.quantiles(QS), QS) <= error
+
+
+def test_quantile_sketches_skip_nan_per_column():
+    values = np.column_stack([np.arange(100.0), np.r_[np.full(50, np.nan), np.arange(50.0)]])
+    sketches = QuantileSketches(['a', 'b'], error=0.01).update(values)
+
+    quartiles = sketches.quantiles([0.25, 0.5, 0.75])
+    np.testing.assert_array_equal(quartiles[:, 0], np.quantile(values[:, 0], [0.25, 0.5, 0.75]))
+    np.testing.assert_array_equal(quartiles[:, 1], np.quantile(np.arange(50.0), [0.25, 0.5, 0.75]))
+    assert np.isnan(KLLSketch().quantiles([0.5])).all()
+
+
+def test_invalid_error_rejected():
+    with pytest.raises(ValueError):
+        kll_size_for_error(0)
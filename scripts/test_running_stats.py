@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Running moments and co-moments against exact numpy/pandas computations
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from utils.running_stats import DatasetStatistics, RunningComoments, RunningMoments
+
+
+def _sample_values():
+    rng = np.random.default_rng(7)
+    values = np.column_stack([
+        rng.normal(1e6, 3.0, 500),  # large offset, small spread
+        rng.exponential(2.0, 500),
+        rng.integers(0, 10, 500).astype(float)
+    ])
+    values[rng.random(values.shape) < 0.1] = np.nan
+    return values
+
+
+def test_moments_match_exact_statistics_across_chunks():
+    values = _sample_values()
+    moments = RunningMoments(values.shape[1])
+    for start in range(0, len(values), 37):
+        moments.update(values[start:start + 37])
+    summary = moments.summary()
+
+    for i in range(values.shape[1]):
+        column = values[:, i][~np.isnan(values[:, i])]
+        assert summary['count'][i] == len(column)
+        assert summary['null_count'][i] == len(values) - len(column)
+        assert np.isclose(summary['mean'][i], np.mean(column), rtol=1e-12)
+        assert np.isclose(summary['std'][i], np.std(column, ddof=1), rtol=1e-9)
+        assert np.isclose(summary['skewness'][i], stats.skew(column), rtol=1e-7)
+        assert np.isclose(summary['kurtosis'][i], stats.kurtosis(column), rtol=1e-7)
+        assert summary['min'][i] == column.min()
+        assert summary['max'][i] == column.max()
+
+
+def test_moments_merge_equals_single_pass():
+    values = _sample_values()
+    whole = RunningMoments(values.shape[1]).update(values)
+    merged = RunningMoments(values.shape[1]).update(values[:123]).merge(
+        RunningMoments(values.shape[1]).update(values[123:]))
+
+    assert merged.rows == whole.rows
+    np.testing.assert_allclose(merged.mean, whole.mean, rtol=1e-12)
+    np.testing.assert_allclose(merged.m2, whole.m2, rtol=1e-9)
+    column = values[:, 1][~np.isnan(values[:, 1])]
+    assert np.isclose(merged.m2[1] / merged.count[1], np.var(column), rtol=1e-12)
+
+
+def test_moments_of_empty_and_constant_columns():
+    values = np.array([[np.nan, 5.0], [np.nan, 5.0], [np.nan, 5.0]])
+    summary = RunningMoments(2).update(values).summary()
+
+    assert summary['count'].tolist() == [0, 3]
+    assert np.isnan(summary['mean'][0]) and np.isnan(summary['std'][0])
+    assert summary['std'][1] == 0.0
+    assert np.isnan(summary['skewness'][1]) and np.isnan(summary['kurtosis'][1])
+
+
+def test_comoments_match_pairwise_complete_correlation():
+    values = _sample_values()
+    values[:, 2] = values[:, 1] * 0.5 + np.nan_to_num(values[:, 2])
+    comoments = RunningComoments(values.shape[1])
+    for start in range(0, len(values), 64):
+        comoments.update(values[start:start + 64])
+
+    expected = pd.DataFrame(values).corr().to_numpy()
+    np.testing.assert_allclose(comoments.correlation(), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_comoments_merge_with_different_shifts():
+    # Each accumulator is shifted by its own first batch's means
+    values = _sample_values()
+    merged = RunningComoments(values.shape[1]).update(values[:200]).merge(
+        RunningComoments(values.shape[1]).update(values[200:]))
+
+    expected = pd.DataFrame(values).corr().to_numpy()
+    np.testing.assert_allclose(merged.correlation(), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_dataset_statistics_summary():
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame({
+        'a': rng.normal(size=300),
+        'b': rng.uniform(size=300),
+        'etiket': rng.choice(['x', 'y'], 300)
+    })
+    data.loc[::10, 'a'] = np.nan
+    statistics = DatasetStatistics(data.columns, ['a', 'b'], quantile_error=0.005)
+    for start in range(0, len(data), 100):
+        statistics.update(data.iloc[start:start + 100])
+
+    assert statistics.matches(data)
+    assert statistics.missing_values().to_dict() == data.isnull().sum().to_dict()
+    summary = statistics.summary()
+    describe = data[['a', 'b']].describe()
+    for stat in ('count', 'mean', 'std', 'min', 'max'):
+        np.testing.assert_allclose(summary.loc[stat], describe.loc[stat], rtol=1e-12)
+    # 300 values stay below the sketch size (k = 500), so the quartiles are exact
+    for stat in ('25%', '50%', '75%'):
+        np.testing.assert_allclose(summary.loc[stat], describe.loc[stat], rtol=1e-12)
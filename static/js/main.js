@@ -1,6 +1,16 @@
 // Main JavaScript file for the data analysis platform
 
-let analysisData = null
+// Server-side dataset reference; rows never leave the server
+let datasetId = null
+
+// Columns each chart type reads from selected_columns
+const CHART_COLUMN_ROLES = {
+  histogram: ["x_column"],
+  scatter: ["x_column", "y_column"],
+  line: ["y_column"],
+  bar: ["x_column"],
+  pie: ["x_column"],
+}
 
 document.addEventListener("DOMContentLoaded", () => {
   // Initialize tooltips
@@ -149,35 +159,22 @@ function loadChart(chartType) {
         </div>
     `
 
-  // Check if we have analysis data
-  if (!analysisData || analysisData.length === 0) {
+  // Check if we have a dataset reference
+  if (!datasetId) {
     container.innerHTML = `
             <div class="alert alert-danger">
                 <i class="fas fa-exclamation-triangle me-2"></i>
                 Veri bulunamadı. Lütfen önce veri yükleyin.
-                <br><small>Debug: analysisData = ${analysisData ? analysisData.length + " records" : "null"}</small>
             </div>
         `
     return
   }
 
-  // Send data to server for visualization
-  fetch("/visualize", {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-    },
-    body: JSON.stringify({
-      chart_type: chartType,
-      data: analysisData,
-    }),
+  // Ask the server to chart the stored dataset
+  fetchChart({
+    chart_type: chartType,
+    dataset_id: datasetId,
   })
-    .then((response) => {
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`)
-      }
-      return response.json()
-    })
     .then((data) => {
       if (data.error) {
         container.innerHTML = `
@@ -187,7 +184,7 @@ function loadChart(chartType) {
                     </div>
                 `
       } else {
-        container.innerHTML = data.chart_html
+        renderChartResponse(container, data)
       }
     })
     .catch((error) => {
@@ -197,7 +194,7 @@ function loadChart(chartType) {
                     <i class="fas fa-exclamation-triangle me-2"></i>
                     Grafik yüklenirken hata oluştu: ${error.message}
                     <br><small>Chart type: ${chartType}</small>
-                    <br><small>Data length: ${analysisData ? analysisData.length : "null"}</small>
+                    <br><small>Dataset: ${datasetId}</small>
                 </div>
             `
     })
@@ -258,39 +255,105 @@ function setTheme(theme) {
   localStorage.setItem("theme", theme)
 }
 
-// Store analysis data with better error handling
-function storeAnalysisData(data) {
-  try {
-    console.log("Storing analysis data...")
-    console.log("Raw data type:", typeof data)
-    console.log("Raw data sample:", data ? data.substring(0, 200) : "null")
-
-    if (!data || data === "None" || data === "null" || data.trim() === "") {
-      console.error("No valid data to store")
-      analysisData = null
-      return
-    }
+// Rendered charts by request body, revalidated with the ETag the server sent
+const chartResponses = new Map()
+const CHART_RESPONSE_LIMIT = 20
+
+// POST a chart request to /visualize; a 304 reuses the response stored for the same request
+function fetchChart(request) {
+  const body = JSON.stringify(request)
+  const cached = chartResponses.get(body)
+  const headers = { "Content-Type": "application/json" }
+  if (cached) {
+    headers["If-None-Match"] = cached.etag
+  }
 
-    if (typeof data === "string") {
-      analysisData = JSON.parse(data)
-    } else if (Array.isArray(data)) {
-      analysisData = data
-    } else {
-      analysisData = [data]
+  return fetch("/visualize", { method: "POST", headers, body }).then((response) => {
+    if (response.status === 304 && cached) {
+      // Re-insert so the least recently used response is dropped first
+      chartResponses.delete(body)
+      chartResponses.set(body, cached)
+      return JSON.parse(cached.text)
+    }
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
     }
+    return response.text().then((text) => {
+      const etag = response.headers.get("ETag")
+      if (etag) {
+        chartResponses.delete(body)
+        chartResponses.set(body, { etag, text })
+        if (chartResponses.size > CHART_RESPONSE_LIMIT) {
+          chartResponses.delete(chartResponses.keys().next().value)
+        }
+      }
+      // Parsed per use, as Plotly keeps and mutates the objects it draws
+      return JSON.parse(text)
+    })
+  })
+}
+
+// Draw a /visualize response: a Plotly figure spec or a ready HTML fragment
+function renderChartResponse(container, data) {
+  if (!data.figure) {
+    container.innerHTML = data.chart_html
+    return
+  }
+
+  if (typeof Plotly === "undefined") {
+    container.innerHTML = `
+            <div class="alert alert-danger">
+                <i class="fas fa-exclamation-triangle me-2"></i>
+                Plotly kütüphanesi yüklenemedi. Lütfen sayfayı yenileyin.
+            </div>
+        `
+    return
+  }
+
+  container.innerHTML = ""
+  const chartDiv = document.createElement("div")
+  chartDiv.className = "chart-figure"
+  container.appendChild(chartDiv)
+
+  Plotly.react(chartDiv, data.figure.data, data.figure.layout, data.config)
+}
 
-    console.log("Analysis data stored successfully:", analysisData.length, "records")
-    console.log("Sample data:", analysisData.slice(0, 2))
+// Remember the dataset the page was rendered for
+function storeDatasetId(id) {
+  if (!id || id === "None" || id === "null") {
+    console.error("No valid dataset id to store")
+    datasetId = null
+    return
+  }
+
+  datasetId = id
+  console.log("Dataset id stored:", datasetId)
+}
 
-    // Validate data structure
-    if (analysisData.length > 0 && typeof analysisData[0] === "object") {
-      console.log("Data columns:", Object.keys(analysisData[0]))
+function getDatasetId() {
+  return datasetId
+}
+
+// Column projection for /visualize; null lets the server pick columns itself
+function buildColumnProjection(chartType, selectedColumns) {
+  const roles = CHART_COLUMN_ROLES[chartType]
+  if (!roles || !selectedColumns) {
+    return null
+  }
+
+  const columns = []
+  for (const role of roles) {
+    if (!selectedColumns[role]) {
+      return null
     }
-  } catch (error) {
-    console.error("Error storing analysis data:", error)
-    console.error("Data received:", data)
-    analysisData = null
+    columns.push(selectedColumns[role])
   }
+
+  if (chartType === "scatter" && selectedColumns.color_column) {
+    columns.push(selectedColumns.color_column)
+  }
+
+  return columns
 }
 
 function loadAnalysisChart(chartType, analysisType) {
@@ -319,14 +382,13 @@ function loadAnalysisChart(chartType, analysisType) {
         </div>
     `
 
-  // Check if we have analysis data
-  if (!analysisData || analysisData.length === 0) {
-    console.error("No analysis data available")
+  // Check if we have a dataset reference
+  if (!datasetId) {
+    console.error("No dataset id available")
     container.innerHTML = `
             <div class="alert alert-danger">
                 <i class="fas fa-exclamation-triangle me-2"></i>
                 Veri bulunamadı. Lütfen sayfayı yenileyin.
-                <br><small>Debug: analysisData = ${analysisData ? analysisData.length + " records" : "null"}</small>
             </div>
         `
     return
@@ -334,28 +396,15 @@ function loadAnalysisChart(chartType, analysisType) {
 
   console.log("Sending visualization request...")
 
-  // Send data to server for visualization with analysis context
-  fetch("/visualize", {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
+  // Ask the server to chart the stored dataset with analysis context
+  fetchChart({
+    chart_type: chartType,
+    dataset_id: datasetId,
+    analysis_context: {
+      analysis_type: analysisType,
+      title: `${analysisType} - ${chartType}`,
     },
-    body: JSON.stringify({
-      chart_type: chartType,
-      data: analysisData,
-      analysis_context: {
-        analysis_type: analysisType,
-        title: `${analysisType} - ${chartType}`,
-      },
-    }),
   })
-    .then((response) => {
-      console.log("Response status:", response.status)
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`)
-      }
-      return response.json()
-    })
     .then((data) => {
       console.log("Visualization response received")
       if (data.error) {
@@ -368,7 +417,7 @@ function loadAnalysisChart(chartType, analysisType) {
             `
       } else {
         console.log("Chart loaded successfully")
-        container.innerHTML = data.chart_html
+        renderChartResponse(container, data)
       }
     })
     .catch((error) => {
@@ -379,7 +428,7 @@ function loadAnalysisChart(chartType, analysisType) {
                 Grafik yüklenirken hata oluştu: ${error.message}
                 <br><small>Chart type: ${chartType}</small>
                 <br><small>Analysis type: ${analysisType}</small>
-                <br><small>Data length: ${analysisData ? analysisData.length : "null"}</small>
+                <br><small>Dataset: ${datasetId}</small>
             </div>
         `
     })
@@ -390,5 +439,8 @@ window.loadChart = loadChart
 window.showAlert = showAlert
 window.toggleTheme = toggleTheme
 window.setTheme = setTheme
-window.storeAnalysisData = storeAnalysisData
+window.renderChartResponse = renderChartResponse
+window.storeDatasetId = storeDatasetId
+window.getDatasetId = getDatasetId
+window.buildColumnProjection = buildColumnProjection
 window.loadAnalysisChart = loadAnalysisChart
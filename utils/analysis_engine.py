@@ -1,16 +1,145 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
 from scipy import stats
 from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from utils.chunked_dataset import ChunkedDataset
+from utils.categorical_profile import CATEGORICAL_MODES, get_categorical_profile
+from utils.column_profile import get_column_profile, get_quantile_sketches
+from utils.correlation import CORRELATION_METHODS, get_correlation_matrix, top_correlation_pairs
+from utils.distribution import LARGE_SAMPLE_TESTS, default_bin_count, get_histograms, get_normality_tests
+from utils.outliers import (MULTIVARIATE_METHODS, export_outlier_columns, get_multivariate_outliers,
+                            get_outlier_report, import_outlier_columns)
+from utils.result_cache import dataset_fingerprint, make_cache_key
+from utils.frame_cache import frame_memo, recall, remember
+from utils.instrumentation import instrumentation, resident_memory_bytes, span
+from utils.trend import RESAMPLE_FREQUENCIES, compute_trends, detect_time_column
 import warnings
 
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+# Process pool shared by all engines; created on first parallel run
+_process_pool = None
+_process_pool_workers = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(max_workers):
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            # spawn: forking a threaded web server is not safe
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+            _process_pool_workers = max_workers
+        return _process_pool
+
+
+def _discard_process_pool(pool):
+    """Forget a broken pool (e.g. after a worker was killed) so the next run starts a fresh one"""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+            _process_pool_workers = None
+    pool.shutdown(wait=False)
+
+
+def _run_shared_analysis(shm_name, analysis_type, settings, memo=None):
+    """Worker entry point: map the shared Arrow stream and run a single analysis
+
+    memo holds values the parent derived for its frame (e.g. quantile sketches) so the
+    worker's results agree with a serial run. Returns the result with the worker's wall
+    time and resident memory growth, which the parent records as the analysis span, and
+    the outlier column cache entries the analysis produced.
+    """
+    started, memory_before = time.perf_counter(), resident_memory_bytes()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Arrow reads straight from the shared segment; split_blocks avoids a consolidating copy
+        table = pa.ipc.open_stream(pa.py_buffer(shm.buf)).read_all()
+        data = table.to_pandas(split_blocks=True)
+        del table
+        for name, value in (memo or {}).items():
+            remember(data, name, value)
+        # The pool already runs one analysis per process; nested thread pools would oversubscribe
+        result = AnalysisEngine(max_workers=1, **settings)._run_analysis(data, analysis_type)
+        exported = []
+        if analysis_type == 'outlier' and 'source_fingerprint' in (memo or {}):
+            # Per-column outlier flags go back so the parent's charts can reuse them
+            exported = export_outlier_columns(data)
+        memory_after = resident_memory_bytes()
+        del data
+        memory_bytes = memory_after - memory_before if memory_before is not None and memory_after is not None else None
+        return result, time.perf_counter() - started, memory_bytes, exported
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A lingering view keeps the mapping alive until the worker recycles it
+            pass
+
 
 class AnalysisEngine:
-    def __init__(self):
+    # 'serial' runs analyses one by one, 'process' fans them out to a process pool
+    EXECUTORS = ('serial', 'process')
+    # Analyses that stream over every chunk of an out-of-core dataset; the rest use a sample
+    CHUNKED_ANALYSES = ('descriptive', 'correlation')
+
+    def __init__(self, executor='serial', max_workers=None, parallel_min_rows=50000,
+                 clustering_sample_size=20000, clustering_batch_size=10000, result_cache=None,
+                 correlation_method='pearson', outlier_method='mahalanobis', outlier_sample_size=10000,
+                 trend_time_column=None, trend_resample=None, pca_max_components=20,
+                 pca_randomized_min_columns=100, pca_incremental_min_rows=500000, pca_batch_size=50000,
+                 shapiro_max_n=5000, normality_large_sample_test='dagostino', categorical_mode='auto',
+                 distinct_precision=14, heavy_hitters_capacity=1000, comparison_max_groups=50):
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Desteklenmeyen yürütücü: {executor}")
+        if correlation_method not in CORRELATION_METHODS:
+            raise ValueError(f"Desteklenmeyen korelasyon yöntemi: {correlation_method}")
+        if outlier_method not in MULTIVARIATE_METHODS:
+            raise ValueError(f"Desteklenmeyen aykırı değer yöntemi: {outlier_method}")
+        if trend_resample is not None and trend_resample not in RESAMPLE_FREQUENCIES:
+            raise ValueError(f"Desteklenmeyen yeniden örnekleme sıklığı: {trend_resample}")
+        if normality_large_sample_test not in LARGE_SAMPLE_TESTS:
+            raise ValueError(f"Desteklenmeyen normallik testi: {normality_large_sample_test}")
+        if categorical_mode not in CATEGORICAL_MODES:
+            raise ValueError(f"Desteklenmeyen kategorik profil modu: {categorical_mode}")
+
+        self.executor = executor
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.parallel_min_rows = parallel_min_rows  # smaller frames are not worth the IPC
+        self.clustering_sample_size = clustering_sample_size  # above this, MiniBatchKMeans on a sample
+        self.clustering_batch_size = clustering_batch_size  # rows per batch for the final fit and labels
+        self.result_cache = result_cache  # optional ResultCache shared across requests
+        self.correlation_method = correlation_method
+        self.outlier_method = outlier_method  # multivariate mode: 'mahalanobis' or 'isolation_forest'
+        self.outlier_sample_size = outlier_sample_size  # rows used to fit the multivariate model
+        self.trend_time_column = trend_time_column  # None detects a date column automatically
+        self.trend_resample = trend_resample  # optional 'D', 'W' or 'M' buckets before the fit
+        self.pca_max_components = pca_max_components  # components computed by the truncated solvers
+        self.pca_randomized_min_columns = pca_randomized_min_columns  # from this width, randomized SVD
+        self.pca_incremental_min_rows = pca_incremental_min_rows  # from this length, IncrementalPCA over chunks
+        self.pca_batch_size = pca_batch_size  # rows per IncrementalPCA chunk
+        self.shapiro_max_n = shapiro_max_n  # longer columns use the large-sample normality test
+        self.normality_large_sample_test = normality_large_sample_test  # 'dagostino' or seeded 'shapiro'
+        self.categorical_mode = categorical_mode  # 'exact', 'approximate' or 'auto' (sketches out-of-core)
+        self.distinct_precision = distinct_precision  # HyperLogLog registers: 2^precision
+        self.heavy_hitters_capacity = heavy_hitters_capacity  # Misra-Gries counters per column
+        self.comparison_max_groups = comparison_max_groups  # categorical columns with more groups are not compared
         self.available_analyses = {
             'descriptive': 'Tanımlayıcı İstatistikler',
             'correlation': 'Korelasyon Analizi',
@@ -25,27 +154,189 @@ class AnalysisEngine:
     def get_available_analyses(self):
         return self.available_analyses
 
-    def perform_analysis(self, data, analysis_types):
-        """Seçilen analiz türlerini gerçekleştir"""
+    def perform_analysis(self, data, analysis_types, progress=None):
+        """Seçilen analiz türlerini gerçekleştir
+
+        progress(analysis_type, state) is called as each analysis starts ('running') and
+        finishes ('done' or 'error').
+        """
+        analysis_types = [a for a in analysis_types if a in self.available_analyses]
         results = {}
+        report = progress or (lambda analysis_type, state: None)
+
+        # Önbellekte olan analizleri tekrar hesaplama
+        cache_keys = {}
+        if self.result_cache is not None:
+            fingerprint = dataset_fingerprint(data)
+            # Sketched and exact quartiles give different results for the same data
+            sketches = get_quantile_sketches(data)
+            quantile_error = sketches.error if sketches is not None else None
+            for analysis_type in analysis_types:
+                params = dict(self._analysis_params(analysis_type), quantile_error=quantile_error)
+                cache_keys[analysis_type] = make_cache_key(fingerprint, 'analysis', analysis_type, params)
+                cached = self.result_cache.get(cache_keys[analysis_type])
+                if cached is not None:
+                    results[analysis_type] = cached
+                    report(analysis_type, 'done')
+
+        pending = [a for a in analysis_types if a not in results]
+        computed = None
+
+        # Out-of-core datasets stay memory-mapped in this process instead of being copied to workers
+        if (self.executor == 'process' and len(pending) > 1 and len(data) >= self.parallel_min_rows
+                and not isinstance(data, ChunkedDataset)):
+            try:
+                computed = self._perform_analysis_parallel(data, pending, report)
+            except Exception as e:
+                # Frames Arrow cannot represent (mixed-type objects) still run serially
+                logger.warning("Paralel analiz başlatılamadı, seri çalıştırılıyor: %s", e)
+
+        if computed is None:
+            computed = {}
+            for analysis_type in pending:
+                report(analysis_type, 'running')
+                with span('analysis', analysis=analysis_type):
+                    computed[analysis_type] = self._run_analysis(data, analysis_type)
+                report(analysis_type, 'error' if 'error' in computed[analysis_type] else 'done')
+
+        for analysis_type, result in computed.items():
+            # Failures may be transient (e.g. a crashed worker), so only successes are cached
+            if analysis_type in cache_keys and 'error' not in result:
+                self.result_cache.set(cache_keys[analysis_type], result)
+            results[analysis_type] = result
+
+        # Seçim sırasını koru
+        return {analysis_type: results[analysis_type] for analysis_type in analysis_types}
+
+    def _analysis_params(self, analysis_type):
+        """Engine settings that change the result of an analysis, part of its cache key"""
+        if analysis_type == 'clustering':
+            return {'sample_size': self.clustering_sample_size, 'batch_size': self.clustering_batch_size}
+        if analysis_type == 'correlation':
+            return {'method': self.correlation_method}
+        if analysis_type == 'descriptive':
+            return {'categorical_mode': self.categorical_mode, 'distinct_precision': self.distinct_precision,
+                    'heavy_hitters_capacity': self.heavy_hitters_capacity}
+        if analysis_type == 'outlier':
+            return {'method': self.outlier_method, 'sample_size': self.outlier_sample_size}
+        if analysis_type == 'distribution':
+            return {'shapiro_max_n': self.shapiro_max_n, 'large_sample_test': self.normality_large_sample_test}
+        if analysis_type == 'pca':
+            return {'max_components': self.pca_max_components,
+                    'randomized_min_columns': self.pca_randomized_min_columns,
+                    'incremental_min_rows': self.pca_incremental_min_rows,
+                    'batch_size': self.pca_batch_size}
+        if analysis_type == 'trend':
+            return {'time_column': self.trend_time_column, 'resample': self.trend_resample}
+        if analysis_type == 'comparison':
+            return {'max_groups': self.comparison_max_groups}
+        return {}
+
+    def _run_analysis(self, data, analysis_type):
+        """Tek bir analizi çalıştır, hatayı sonuca yaz"""
+        try:
+            method_name = f'_perform_{analysis_type}_analysis'
+            if not hasattr(self, method_name):
+                return {'error': f'Analiz metodu bulunamadı: {analysis_type}'}
+
+            if isinstance(data, ChunkedDataset) and analysis_type not in self.CHUNKED_ANALYSES:
+                # Bellek bütçesine sığan, tohumlu bir örneklem üzerinde çalış
+                sample = frame_memo(data, 'analysis_sample', lambda dataset: dataset.sample(dataset.chunk_rows()))
+                result = getattr(self, method_name)(sample)
+                if 'error' not in result:
+                    result['sampled_rows'] = len(sample)
+                return result
+
+            return getattr(self, method_name)(data)
+        except Exception as e:
+            return {'error': str(e)}
+
+    def _perform_analysis_parallel(self, data, analysis_types, report):
+        """Analizleri süreç havuzunda eşzamanlı çalıştır; veri paylaşımlı bellekten okunur"""
+        table = pa.Table.from_pandas(data, preserve_index=False)
+
+        # Size the segment first, then write the Arrow stream directly into it
+        mock_sink = pa.MockOutputStream()
+        with pa.ipc.new_stream(mock_sink, table.schema) as writer:
+            writer.write_table(table)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(mock_sink.size(), 1))
+        try:
+            shared_sink = pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf))
+            with pa.ipc.new_stream(shared_sink, table.schema) as writer:
+                writer.write_table(table)
+            shared_sink.close()
+            # Release every Arrow view of the segment so it can be closed later
+            del writer, shared_sink, table
+
+            pool = _get_process_pool(min(self.max_workers, len(analysis_types)))
+            # Workers build their own engine with the same result-affecting settings
+            settings = {
+                'clustering_sample_size': self.clustering_sample_size,
+                'clustering_batch_size': self.clustering_batch_size,
+                'correlation_method': self.correlation_method,
+                'outlier_method': self.outlier_method,
+                'outlier_sample_size': self.outlier_sample_size,
+                'trend_time_column': self.trend_time_column,
+                'trend_resample': self.trend_resample,
+                'pca_max_components': self.pca_max_components,
+                'pca_randomized_min_columns': self.pca_randomized_min_columns,
+                'pca_incremental_min_rows': self.pca_incremental_min_rows,
+                'pca_batch_size': self.pca_batch_size,
+                'shapiro_max_n': self.shapiro_max_n,
+                'normality_large_sample_test': self.normality_large_sample_test,
+                'categorical_mode': self.categorical_mode,
+                'distinct_precision': self.distinct_precision,
+                'heavy_hitters_capacity': self.heavy_hitters_capacity,
+                'comparison_max_groups': self.comparison_max_groups
+            }
+            sketches = get_quantile_sketches(data)
+            memo = {'quantile_sketches': sketches} if sketches is not None else {}
+            if 'outlier' in analysis_types:
+                # Lets the worker key its outlier columns like this process does
+                memo['source_fingerprint'] = recall(data, 'source_fingerprint') or dataset_fingerprint(data)
+            try:
+                futures = {
+                    pool.submit(_run_shared_analysis, shm.name, analysis_type, settings, memo): analysis_type
+                    for analysis_type in analysis_types
+                }
+            except BrokenProcessPool:
+                # Broke after its last run; a fresh pool takes this one
+                _discard_process_pool(pool)
+                pool = _get_process_pool(min(self.max_workers, len(analysis_types)))
+                futures = {
+                    pool.submit(_run_shared_analysis, shm.name, analysis_type, settings, memo): analysis_type
+                    for analysis_type in analysis_types
+                }
+            for analysis_type in analysis_types:
+                report(analysis_type, 'running')
 
-        for analysis_type in analysis_types:
-            if analysis_type in self.available_analyses:
+            results = {}
+            for future in as_completed(futures):
+                analysis_type = futures[future]
                 try:
-                    method_name = f'_perform_{analysis_type}_analysis'
-                    if hasattr(self, method_name):
-                        results[analysis_type] = getattr(self, method_name)(data)
-                    else:
-                        results[analysis_type] = {'error': f'Analiz metodu bulunamadı: {analysis_type}'}
+                    results[analysis_type], seconds, memory_bytes, exported = future.result()
+                    import_outlier_columns(exported)
+                    if instrumentation.should_sample():
+                        instrumentation.observe('analysis', seconds, memory_bytes, analysis=analysis_type)
+                except BrokenProcessPool as e:
+                    # A killed worker breaks the whole pool; later runs must not reuse it
+                    _discard_process_pool(pool)
+                    results[analysis_type] = {'error': str(e)}
                 except Exception as e:
+                    # A crashed worker only fails its own analysis
                     results[analysis_type] = {'error': str(e)}
+                report(analysis_type, 'error' if 'error' in results[analysis_type] else 'done')
 
-        return results
+            return results
+        finally:
+            shm.unlink()
+            shm.close()
 
     def _perform_descriptive_analysis(self, data):
         """Tanımlayıcı istatistikler"""
         numerical_cols = data.select_dtypes(include=[np.number]).columns
-        categorical_cols = data.select_dtypes(include=['object']).columns
+        categorical_cols = data.select_dtypes(include=['object', 'category']).columns
 
         result = {
             'type': 'descriptive',
@@ -55,32 +346,69 @@ class AnalysisEngine:
             'visualizations': ['histogram', 'box', 'bar']
         }
 
-        # Sayısal değişkenler için
+        # Sayısal değişkenler için (ortak sütun profilinden)
         if len(numerical_cols) > 0:
+            profile = get_column_profile(data)
             for col in numerical_cols:
+                col_profile = profile[col]
                 result['numerical_summary'][col] = {
-                    'mean': float(data[col].mean()),
-                    'median': float(data[col].median()),
-                    'std': float(data[col].std()),
-                    'min': float(data[col].min()),
-                    'max': float(data[col].max()),
-                    'skewness': float(stats.skew(data[col].dropna())),
-                    'kurtosis': float(stats.kurtosis(data[col].dropna()))
+                    'mean': float(col_profile['mean']),
+                    'median': float(col_profile['50%']),
+                    'std': float(col_profile['std']),
+                    'min': float(col_profile['min']),
+                    'max': float(col_profile['max']),
+                    'skewness': float(col_profile['skewness']),
+                    'kurtosis': float(col_profile['kurtosis'])
                 }
 
         # Kategorik değişkenler için
-        if len(categorical_cols) > 0:
-            for col in categorical_cols:
-                value_counts = data[col].value_counts()
+        if len(categorical_cols) > 0 and self._uses_categorical_sketches(data):
+            # Tek akışlı geçiş: HyperLogLog ile tekil sayısı, Misra-Gries ile en sık değerler
+            profile = get_categorical_profile(data, categorical_cols, self.distinct_precision,
+                                              self.heavy_hitters_capacity)
+            for col, col_profile in profile.items():
+                if col_profile['count'] == 0:
+                    continue
+                # Hiçbir değer hata payını aşmıyorsa (ör. ID sütunları) en sık değer bilinemez
+                top = col_profile['top']
                 result['categorical_summary'][col] = {
-                    'unique_count': int(data[col].nunique()),
+                    'unique_count': col_profile['unique_count'],
+                    'most_frequent': str(top.index[0]) if not top.empty else None,
+                    'most_frequent_count': int(top.iloc[0]) if not top.empty else 0,
+                    'distribution': top.head(10).rename(index=str).to_dict(),
+                    'approximate': True,
+                    'count_error': int(col_profile['count_error'])
+                }
+        elif len(categorical_cols) > 0:
+            for col, value_counts in self._categorical_value_counts(data, categorical_cols).items():
+                if value_counts.empty:
+                    continue
+                result['categorical_summary'][col] = {
+                    'unique_count': int((value_counts > 0).sum()),
                     'most_frequent': str(value_counts.index[0]),
                     'most_frequent_count': int(value_counts.iloc[0]),
-                    'distribution': value_counts.head(10).to_dict()
+                    'distribution': value_counts.head(10).rename(index=str).to_dict()
                 }
 
         return result
 
+    def _uses_categorical_sketches(self, data):
+        """Kategorik profil için taslak (sketch) kullanılıp kullanılmayacağı"""
+        return self.categorical_mode == 'approximate' or (
+            self.categorical_mode == 'auto' and isinstance(data, ChunkedDataset))
+
+    def _categorical_value_counts(self, data, categorical_cols):
+        """Value counts per categorical column, summed chunk by chunk for out-of-core datasets"""
+        if not isinstance(data, ChunkedDataset):
+            return {col: data[col].value_counts() for col in categorical_cols}
+
+        counts = {col: pd.Series(dtype=np.int64) for col in categorical_cols}
+        for chunk in data.iter_chunks(categorical_cols):
+            for col in categorical_cols:
+                counts[col] = counts[col].add(chunk[col].value_counts(), fill_value=0)
+        return {col: value_counts.astype(np.int64).sort_values(ascending=False, kind='stable')
+                for col, value_counts in counts.items()}
+
     def _perform_correlation_analysis(self, data):
         """Korelasyon analizi"""
         numerical_cols = data.select_dtypes(include=[np.number]).columns
@@ -88,24 +416,15 @@ class AnalysisEngine:
         if len(numerical_cols) < 2:
             return {'error': 'Korelasyon analizi için en az 2 sayısal sütun gerekli'}
 
-        correlation_matrix = data[numerical_cols].corr()
-
-        # En yüksek korelasyonları bul
-        high_correlations = []
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(i + 1, len(correlation_matrix.columns)):
-                corr_value = correlation_matrix.iloc[i, j]
-                if abs(corr_value) > 0.5:  # Yüksek korelasyon eşiği
-                    high_correlations.append({
-                        'var1': correlation_matrix.columns[i],
-                        'var2': correlation_matrix.columns[j],
-                        'correlation': float(corr_value),
-                        'strength': 'Güçlü' if abs(corr_value) > 0.7 else 'Orta'
-                    })
+        correlation_matrix = get_correlation_matrix(data, method=self.correlation_method)
+
+        # En yüksek korelasyonları bul (üst üçgen, |r| > 0.5)
+        high_correlations = top_correlation_pairs(correlation_matrix, threshold=0.5, strong_threshold=0.7)
 
         return {
             'type': 'correlation',
             'title': 'Korelasyon Analizi',
+            'method': self.correlation_method,
             'correlation_matrix': correlation_matrix.to_dict(),
             'high_correlations': high_correlations,
             'visualizations': ['heatmap', 'scatter']
@@ -118,20 +437,28 @@ class AnalysisEngine:
         if len(numerical_cols) == 0:
             return {'error': 'Dağılım analizi için sayısal veri gerekli'}
 
-        distribution_tests = {}
-
-        for col in numerical_cols:
-            col_data = data[col].dropna()
+        profile = get_column_profile(data)
+        # Testler ve histogramlar tüm sütunlar için toplu hesaplanır ve tekrarlanabilir
+        tests = get_normality_tests(data, shapiro_max_n=self.shapiro_max_n,
+                                    large_sample_test=self.normality_large_sample_test)
+        histograms = get_histograms(data, default_bin_count(len(data)))
 
-            # Normallik testi
-            shapiro_stat, shapiro_p = stats.shapiro(col_data.sample(min(5000, len(col_data))))
+        distribution_tests = {}
+        for i, col in enumerate(numerical_cols):
+            test = tests.loc[col]
 
             distribution_tests[col] = {
-                'shapiro_stat': float(shapiro_stat),
-                'shapiro_p': float(shapiro_p),
-                'is_normal': shapiro_p > 0.05,
-                'skewness': float(stats.skew(col_data)),
-                'kurtosis': float(stats.kurtosis(col_data))
+                'test': test['test'],
+                'statistic': float(test['statistic']),
+                'p_value': float(test['p_value']),
+                'is_normal': bool(test['p_value'] > 0.05),
+                'skewness': float(profile[col]['skewness']),
+                'kurtosis': float(profile[col]['kurtosis']),
+                'histogram': {
+                    'counts': histograms['counts'][i].tolist(),
+                    'edges': histograms['edges'][i].tolist(),
+                    'density': histograms['density'][i].tolist()
+                }
             }
 
         return {
@@ -148,37 +475,41 @@ class AnalysisEngine:
         if len(numerical_cols) == 0:
             return {'error': 'Aykırı değer analizi için sayısal veri gerekli'}
 
-        outlier_results = {}
-
-        for col in numerical_cols:
-            col_data = data[col].dropna()
-
-            # IQR yöntemi
-            Q1 = col_data.quantile(0.25)
-            Q3 = col_data.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-
-            outliers = col_data[(col_data < lower_bound) | (col_data > upper_bound)]
-
-            # Z-score yöntemi
-            z_scores = np.abs(stats.zscore(col_data))
-            z_outliers = col_data[z_scores > 3]
+        # IQR, Z-score ve MAD bayrakları tüm sütunlar için tek matris geçişinde (grafiklerle ortak)
+        report = get_outlier_report(data)
+        counts = {method: flags.sum(axis=0) for method, flags in report['flags'].items()}
+        valid_counts = report['valid_counts']
 
+        outlier_results = {}
+        for i, col in enumerate(report['columns']):
+            n_valid = max(int(valid_counts[i]), 1)
             outlier_results[col] = {
-                'iqr_outliers': len(outliers),
-                'iqr_percentage': float(len(outliers) / len(col_data) * 100),
-                'z_outliers': len(z_outliers),
-                'z_percentage': float(len(z_outliers) / len(col_data) * 100),
-                'lower_bound': float(lower_bound),
-                'upper_bound': float(upper_bound)
+                'iqr_outliers': int(counts['iqr'][i]),
+                'iqr_percentage': float(counts['iqr'][i] / n_valid * 100),
+                'z_outliers': int(counts['zscore'][i]),
+                'z_percentage': float(counts['zscore'][i] / n_valid * 100),
+                'mad_outliers': int(counts['mad'][i]),
+                'mad_percentage': float(counts['mad'][i] / n_valid * 100),
+                'lower_bound': float(report['bounds'].at['lower_bound', col]),
+                'upper_bound': float(report['bounds'].at['upper_bound', col])
+            }
+
+        # Çok değişkenli aykırı değerler (örneklem üzerinde eğitilir)
+        multivariate = None
+        if len(numerical_cols) >= 2:
+            row_flags = get_multivariate_outliers(data, method=self.outlier_method,
+                                                  sample_size=self.outlier_sample_size)
+            multivariate = {
+                'method': self.outlier_method,
+                'outliers': int(row_flags.sum()),
+                'percentage': float(row_flags.sum() / len(data) * 100)
             }
 
         return {
             'type': 'outlier',
             'title': 'Aykırı Değer Analizi',
             'outlier_results': outlier_results,
+            'multivariate': multivariate,
             'visualizations': ['box', 'scatter']
         }
 
@@ -190,40 +521,44 @@ class AnalysisEngine:
             return {'error': 'Kümeleme analizi için en az 2 sayısal sütun gerekli'}
 
         # Veriyi standartlaştır
+        values = data[numerical_cols].fillna(0).to_numpy(dtype=np.float64)
         scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(data[numerical_cols].fillna(0))
-
-        # Optimal küme sayısını bul (elbow method)
-        inertias = []
         k_range = range(2, min(11, len(data) // 10 + 2))
 
-        for k in k_range:
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            kmeans.fit(scaled_data)
-            inertias.append(kmeans.inertia_)
+        if len(values) > self.clustering_sample_size:
+            scaler.fit(values)
+            optimal_k, inertias, clusters = self._minibatch_clustering(values, scaler, k_range)
+            method = 'minibatch'
+        else:
+            scaled_data = scaler.fit_transform(values)
 
-        # En iyi k değerini seç (basit elbow detection)
-        optimal_k = 3  # Default
-        if len(inertias) > 2:
-            diffs = np.diff(inertias)
-            optimal_k = k_range[np.argmax(diffs[:-1] - diffs[1:]) + 1]
+            # Optimal küme sayısını bul (elbow method)
+            inertias = []
+            for k in k_range:
+                kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+                kmeans.fit(scaled_data)
+                inertias.append(kmeans.inertia_)
 
-        # Final clustering
-        kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init=10)
-        clusters = kmeans.fit_predict(scaled_data)
+            optimal_k = self._select_elbow_k(k_range, inertias)
+
+            # Final clustering
+            kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init=10)
+            clusters = kmeans.fit_predict(scaled_data)
+            method = 'kmeans'
 
         # Küme istatistikleri
+        cluster_sizes = np.bincount(clusters, minlength=optimal_k)
         cluster_stats = {}
         for i in range(optimal_k):
-            cluster_data = data[clusters == i]
             cluster_stats[f'Küme {i + 1}'] = {
-                'size': len(cluster_data),
-                'percentage': float(len(cluster_data) / len(data) * 100)
+                'size': int(cluster_sizes[i]),
+                'percentage': float(cluster_sizes[i] / len(data) * 100)
             }
 
         return {
             'type': 'clustering',
             'title': 'Kümeleme Analizi',
+            'method': method,
             'optimal_k': optimal_k,
             'cluster_stats': cluster_stats,
             'inertias': [float(x) for x in inertias],
@@ -231,6 +566,54 @@ class AnalysisEngine:
             'visualizations': ['scatter', 'bar']
         }
 
+    def _select_elbow_k(self, k_range, inertias):
+        """En iyi k değerini seç (basit elbow detection)"""
+        optimal_k = 3  # Default
+        if len(inertias) > 2:
+            diffs = np.diff(inertias)
+            optimal_k = k_range[np.argmax(diffs[:-1] - diffs[1:]) + 1]
+        return optimal_k
+
+    def _minibatch_clustering(self, values, scaler, k_range):
+        """Büyük veri için kümeleme: örneklem üzerinde k taraması, toplu etiketleme"""
+        n_rows = len(values)
+        rng = np.random.default_rng(42)
+
+        # Systematic sample: one row from each of sample_size equal row intervals, at a random offset
+        edges = np.linspace(0, n_rows, self.clustering_sample_size + 1).astype(np.int64)
+        sample_idx = edges[:-1] + (rng.random(self.clustering_sample_size) * np.diff(edges)).astype(np.int64)
+        sample = scaler.transform(values[sample_idx])
+
+        def fit_k(k):
+            model = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3,
+                                    batch_size=min(2048, len(sample)))
+            model.fit(sample)
+            return model.inertia_, model.cluster_centers_
+
+        if self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(k_range))) as pool:
+                sweep = list(pool.map(fit_k, k_range))
+        else:
+            # Inside a process-pool worker the sweep stays on this CPU
+            sweep = [fit_k(k) for k in k_range]
+
+        inertias = [inertia for inertia, _ in sweep]
+        optimal_k = self._select_elbow_k(k_range, inertias)
+
+        # Warm start from the sweep's centroids, then one streaming pass over all rows
+        final_model = MiniBatchKMeans(n_clusters=optimal_k, init=sweep[k_range.index(optimal_k)][1],
+                                      n_init=1, random_state=42, batch_size=self.clustering_batch_size)
+        batches = range(0, n_rows, self.clustering_batch_size)
+        for start in batches:
+            final_model.partial_fit(scaler.transform(values[start:start + self.clustering_batch_size]))
+
+        clusters = np.empty(n_rows, dtype=np.int64)
+        for start in batches:
+            stop = start + self.clustering_batch_size
+            clusters[start:stop] = final_model.predict(scaler.transform(values[start:stop]))
+
+        return optimal_k, inertias, clusters
+
     def _perform_pca_analysis(self, data):
         """Temel bileşen analizi"""
         numerical_cols = data.select_dtypes(include=[np.number]).columns
@@ -238,17 +621,29 @@ class AnalysisEngine:
         if len(numerical_cols) < 3:
             return {'error': 'PCA analizi için en az 3 sayısal sütun gerekli'}
 
-        # Veriyi standartlaştır
-        scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(data[numerical_cols].fillna(0))
-
-        # PCA uygula
-        pca = PCA()
-        pca_result = pca.fit_transform(scaled_data)
-
-        # Açıklanan varyans
+        # Yöntem veri şekline göre seçilir; yalnızca raporlanan bileşenler hesaplanır
+        n_rows, n_cols = len(data), len(numerical_cols)
+        if n_rows >= self.pca_incremental_min_rows:
+            method = 'incremental'
+            pca = self._incremental_pca(data, numerical_cols, min(n_cols, self.pca_max_components))
+        else:
+            # Veriyi standartlaştır
+            scaler = StandardScaler()
+            scaled_data = scaler.fit_transform(data[numerical_cols].fillna(0))
+
+            # Tall data is solved cheaply through the covariance matrix; wide data needs a truncated SVD
+            if n_cols >= self.pca_randomized_min_columns and n_rows < 10 * n_cols:
+                method = 'randomized'
+                pca = self._randomized_pca(scaled_data, min(n_rows, n_cols))
+            else:
+                method = 'full'
+                pca = PCA()
+                pca.fit(scaled_data)
+
+        # Açıklanan varyans (oranlar toplam varyansa göre, kesik çözümlerde de)
         explained_variance = pca.explained_variance_ratio_
         cumulative_variance = np.cumsum(explained_variance)
+        reached_90 = cumulative_variance >= 0.9
 
         # Bileşen yükleri
         components = pca.components_
@@ -256,9 +651,12 @@ class AnalysisEngine:
         return {
             'type': 'pca',
             'title': 'Temel Bileşen Analizi',
+            'method': method,
+            'n_components': int(len(explained_variance)),
             'explained_variance': [float(x) for x in explained_variance[:5]],
             'cumulative_variance': [float(x) for x in cumulative_variance[:5]],
-            'n_components_90': int(np.argmax(cumulative_variance >= 0.9) + 1),
+            # %90'a hesaplanan bileşenlerle ulaşılamadıysa None
+            'n_components_90': int(np.argmax(reached_90) + 1) if reached_90.any() else None,
             'feature_importance': {
                 col: float(abs(components[0][i]))
                 for i, col in enumerate(numerical_cols)
@@ -266,6 +664,36 @@ class AnalysisEngine:
             'visualizations': ['scatter', 'bar']
         }
 
+    def _randomized_pca(self, scaled_data, max_rank):
+        """Randomized SVD of at most pca_max_components components
+
+        Flat spectra may need more components for 90% variance; like the incremental
+        solver, the count is not grown, and n_components_90 is then reported as None.
+        """
+        pca = PCA(n_components=min(self.pca_max_components, max_rank), svd_solver='randomized', random_state=42)
+        pca.fit(scaled_data)
+        return pca
+
+    def _incremental_pca(self, data, numerical_cols, n_components):
+        """IncrementalPCA over row chunks; only one chunk is densified at a time"""
+        batch_size = max(self.pca_batch_size, n_components)
+
+        def chunks():
+            for start in range(0, len(data), batch_size):
+                yield data.iloc[start:start + batch_size][numerical_cols].fillna(0).to_numpy(dtype=np.float64)
+
+        # İlk geçiş ölçekleyiciyi, ikinci geçiş bileşenleri öğrenir
+        scaler = StandardScaler()
+        for chunk in chunks():
+            scaler.partial_fit(chunk)
+
+        pca = IncrementalPCA(n_components=n_components)
+        for chunk in chunks():
+            # A trailing chunk smaller than n_components cannot be fitted on its own
+            if len(chunk) >= n_components:
+                pca.partial_fit(scaler.transform(chunk))
+        return pca
+
     def _perform_trend_analysis(self, data):
         """Trend analizi"""
         numerical_cols = data.select_dtypes(include=[np.number]).columns
@@ -273,19 +701,22 @@ class AnalysisEngine:
         if len(numerical_cols) == 0:
             return {'error': 'Trend analizi için sayısal veri gerekli'}
 
-        trend_results = {}
-
-        for col in numerical_cols:
-            col_data = data[col].dropna()
+        # Tarih sütunu varsa x ekseni zamandır, yoksa satır sırası
+        time_column = self.trend_time_column or detect_time_column(data)
+        if time_column is not None and time_column not in data.columns:
+            return {'error': f'Zaman sütunu bulunamadı: {time_column}'}
+        resample = self.trend_resample if time_column is not None else None
 
-            # Basit trend hesaplama
-            x = np.arange(len(col_data))
-            slope, intercept, r_value, p_value, std_err = stats.linregress(x, col_data)
+        # Tüm sütunların regresyonu tek bir toplu en küçük kareler çözümüyle hesaplanır
+        fits = compute_trends(data, time_column=time_column, resample=resample)
 
+        trend_results = {}
+        for col, fit in fits.iterrows():
+            slope, r_value = fit['slope'], fit['r_value']
             trend_results[col] = {
                 'slope': float(slope),
                 'r_squared': float(r_value ** 2),
-                'p_value': float(p_value),
+                'p_value': float(fit['p_value']),
                 'trend_direction': 'Artan' if slope > 0 else 'Azalan' if slope < 0 else 'Sabit',
                 'trend_strength': 'Güçlü' if abs(r_value) > 0.7 else 'Orta' if abs(r_value) > 0.3 else 'Zayıf'
             }
@@ -293,6 +724,8 @@ class AnalysisEngine:
         return {
             'type': 'trend',
             'title': 'Trend Analizi',
+            'time_column': time_column,
+            'resample': resample,
             'trend_results': trend_results,
             'visualizations': ['line', 'scatter']
         }
@@ -300,45 +733,88 @@ class AnalysisEngine:
     def _perform_comparison_analysis(self, data):
         """Karşılaştırmalı analiz"""
         numerical_cols = data.select_dtypes(include=[np.number]).columns
-        categorical_cols = data.select_dtypes(include=['object']).columns
+        categorical_cols = data.select_dtypes(include=['object', 'category']).columns
 
         if len(numerical_cols) == 0 or len(categorical_cols) == 0:
             return {'error': 'Karşılaştırmalı analiz için hem sayısal hem kategorik veri gerekli'}
 
         comparison_results = {}
-
-        # Her kategorik değişken için sayısal değişkenleri karşılaştır
-        for cat_col in categorical_cols[:2]:  # İlk 2 kategorik sütun
-            for num_col in numerical_cols[:3]:  # İlk 3 sayısal sütun
-                groups = []
-                group_names = []
-
-                for category in data[cat_col].unique()[:5]:  # İlk 5 kategori
-                    group_data = data[data[cat_col] == category][num_col].dropna()
-                    if len(group_data) > 0:
-                        groups.append(group_data)
-                        group_names.append(str(category))
-
-                if len(groups) >= 2:
-                    # ANOVA testi
-                    try:
-                        f_stat, p_value = stats.f_oneway(*groups)
-
-                        comparison_results[f'{cat_col}_vs_{num_col}'] = {
-                            'f_statistic': float(f_stat),
-                            'p_value': float(p_value),
-                            'significant': p_value < 0.05,
-                            'group_means': {
-                                name: float(group.mean())
-                                for name, group in zip(group_names, groups)
-                            }
-                        }
-                    except:
-                        continue
+        skipped_columns = []
+
+        # Her kategorik değişken için tüm sayısal değişkenler tek bir gruplu toplamla karşılaştırılır
+        for cat_col in categorical_cols:
+            # Tarih, kimlik gibi çok gruplu sütunlarda grup karşılaştırması anlamsız ve pahalıdır
+            if data[cat_col].nunique() > self.comparison_max_groups:
+                skipped_columns.append(cat_col)
+                continue
+            anova = self._grouped_anova(data, cat_col, numerical_cols)
+            if anova is None:
+                continue
+
+            for num_col in numerical_cols:
+                col_stats = anova[num_col]
+                if col_stats is None:
+                    continue
+                comparison_results[f'{cat_col}_vs_{num_col}'] = col_stats
 
         return {
             'type': 'comparison',
             'title': 'Karşılaştırmalı Analiz',
             'comparison_results': comparison_results,
+            'skipped_columns': skipped_columns,
             'visualizations': ['bar', 'box', 'scatter']
         }
+
+    def _grouped_anova(self, data, cat_col, numerical_cols, max_reported_groups=10):
+        """Tek yönlü ANOVA: grup sayısı, toplam ve kareler toplamından tüm sayısal sütunlar için F ve p"""
+        keys = data[cat_col]
+        if keys.nunique() < 2:
+            return None
+
+        # Centre on the column means so the sums of squares do not cancel catastrophically
+        means = get_column_profile(data).loc['mean', numerical_cols].to_numpy()
+        centered = data[numerical_cols].to_numpy(dtype=np.float64) - means
+        combined = pd.DataFrame(np.hstack([centered, centered * centered]))
+
+        aggregated = combined.groupby(keys.to_numpy(), sort=False).agg(['count', 'sum'])
+        n_num = len(numerical_cols)
+        counts = aggregated.xs('count', axis=1, level=1).to_numpy()[:, :n_num]
+        sums = aggregated.xs('sum', axis=1, level=1).to_numpy()
+        sums, squares = sums[:, :n_num], sums[:, n_num:]
+        group_names = [str(name) for name in aggregated.index]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            present = counts > 0
+            total_n = counts.sum(axis=0)
+            n_groups = present.sum(axis=0)
+            group_means = np.where(present, sums / counts, np.nan)
+
+            grand_sum = sums.sum(axis=0)
+            ss_between = np.where(present, sums * group_means, 0.0).sum(axis=0) - grand_sum ** 2 / total_n
+            ss_within = np.clip(np.where(present, squares - sums * group_means, 0.0), 0.0, None).sum(axis=0)
+
+            df_between = n_groups - 1
+            df_within = total_n - n_groups
+            f_stats = (ss_between / df_between) / (ss_within / df_within)
+            p_values = stats.f.sf(f_stats, df_between, df_within)
+
+        results = {}
+        for col_idx, num_col in enumerate(numerical_cols):
+            if n_groups[col_idx] < 2 or df_within[col_idx] <= 0:
+                results[num_col] = None
+                continue
+
+            # Report the means of the largest groups only; the test itself uses every group
+            order = np.argsort(-counts[:, col_idx], kind='stable')[:max_reported_groups]
+            results[num_col] = {
+                'f_statistic': float(f_stats[col_idx]),
+                'p_value': float(p_values[col_idx]),
+                'significant': bool(p_values[col_idx] < 0.05),
+                'group_count': int(n_groups[col_idx]),
+                'group_means': {
+                    group_names[g]: float(group_means[g, col_idx] + means[col_idx])
+                    for g in order if present[g, col_idx]
+                }
+            }
+
+        return results
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.frame_cache import frame_memo
+from utils.sketches import HyperLogLog, MisraGries
+
+# 'exact' counts every value, 'approximate' uses sketches, 'auto' sketches out-of-core data only
+CATEGORICAL_MODES = ('exact', 'approximate', 'auto')
+
+
+def get_categorical_profile(data, columns, precision=14, capacity=1000):
+    """Memoized sketch-based profile of the given categorical columns"""
+    columns = list(columns)
+    return frame_memo(data, f'categorical_profile:{columns}:{precision}:{capacity}',
+                      lambda frame: compute_categorical_profile(frame, columns, precision, capacity))
+
+
+def compute_categorical_profile(data, columns, precision=14, capacity=1000, chunk_rows=100000):
+    """Distinct counts and heavy hitters of categorical columns in one streaming pass
+
+    Each column gets a HyperLogLog and a Misra-Gries summary, filled chunk by chunk
+    and merged, so memory is bounded by the chunk and the sketch sizes rather than by
+    the number of distinct values. Returns per column the non-null ``count``, the
+    estimated ``unique_count``, the ``top`` counters (a Series, most frequent first)
+    and the counters' maximum undercount ``count_error``.
+    """
+    distinct = {col: HyperLogLog(precision) for col in columns}
+    heavy_hitters = {col: MisraGries(capacity) for col in columns}
+
+    if isinstance(data, ChunkedDataset):
+        chunks = data.iter_chunks(columns)
+    else:
+        chunks = (data.iloc[start:start + chunk_rows][columns] for start in range(0, len(data), chunk_rows))
+
+    for chunk in chunks:
+        for col in columns:
+            hashes, counts = _hash_and_count(chunk[col])
+            distinct[col].update_hashes(hashes)
+            heavy_hitters[col].update_counts(counts)
+
+    profile = {}
+    for col in columns:
+        summary = heavy_hitters[col]
+        # The sketch cannot see fewer values than the counters still hold, nor more than the rows
+        unique_count = int(round(distinct[col].count()))
+        unique_count = min(max(unique_count, len(summary.counters)), summary.total)
+        profile[col] = {
+            'count': summary.total,
+            'unique_count': unique_count,
+            'top': summary.top(capacity),
+            'count_error': summary.error
+        }
+    return profile
+
+
+def _hash_and_count(values):
+    """64-bit hashes of the distinct non-null values of a chunk, and their counts"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash each category once and count codes instead of values
+        codes = values.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+        present = counts > 0
+        categories = values.cat.categories[present]
+        return pd.util.hash_array(categories.to_numpy(dtype=object)), pd.Series(counts[present], index=categories)
+
+    counts = values.value_counts(sort=False)
+    return pd.util.hash_array(counts.index.to_numpy(dtype=object)), counts
@@ -0,0 +1,133 @@
+import os
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# pandas holds a chunk in more memory than its Arrow form (object strings, temporaries)
+CHUNK_OVERHEAD_FACTOR = 4
+
+
+class ChunkedDataset:
+    """Out-of-core dataset backed by memory-mapped Arrow IPC files
+
+    Nothing is read until asked for: columns are projected lazily and rows are handed
+    out as pandas chunks sized so one chunk stays within the memory budget. Appended
+    rows live in further segment files with the same schema, read after the first.
+    """
+
+    def __init__(self, paths, memory_budget=512 * 1024 * 1024):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.memory_budget = memory_budget
+        self._readers = [pa.ipc.open_file(pa.memory_map(path, 'r')) for path in self.paths]
+        self.schema = self._readers[0].schema
+        self.num_rows = sum(batch.num_rows for batch in self._batches())
+        # Empty frame with the pandas dtypes, so column-type queries need no data
+        self._empty = self.schema.empty_table().to_pandas()
+
+    @property
+    def columns(self):
+        return self._empty.columns
+
+    @property
+    def dtypes(self):
+        return self._empty.dtypes
+
+    @property
+    def shape(self):
+        return self.num_rows, len(self.columns)
+
+    @property
+    def empty(self):
+        return self.num_rows == 0 or len(self.columns) == 0
+
+    def __len__(self):
+        return self.num_rows
+
+    def select_dtypes(self, include=None, exclude=None):
+        """Empty frame with the matching columns, as DataFrame.select_dtypes"""
+        return self._empty.select_dtypes(include=include, exclude=exclude)
+
+    def nbytes(self):
+        """Size of the Arrow files on disk"""
+        return sum(os.path.getsize(path) for path in self.paths)
+
+    def chunk_rows(self, columns=None):
+        """Rows per chunk that keep one pandas chunk of the given columns within budget"""
+        columns = list(self.columns) if columns is None else list(columns)
+        if not columns or self.num_rows == 0:
+            return max(self.num_rows, 1)
+
+        row_bytes = 0
+        for col in columns:
+            field_type = self.schema.field(col).type
+            try:
+                row_bytes += field_type.bit_width // 8
+            except ValueError:
+                # Variable-width values: use the average size in the file
+                row_bytes += max(self._column_nbytes(col) // self.num_rows, 8) + 50
+        rows = self.memory_budget // (row_bytes * CHUNK_OVERHEAD_FACTOR)
+        return int(max(1000, rows))
+
+    def iter_chunks(self, columns=None):
+        """Yield the dataset as pandas DataFrames of at most chunk_rows rows"""
+        columns = list(self.columns) if columns is None else list(columns)
+        step = self.chunk_rows(columns)
+        for batch in self._batches():
+            batch = batch.select(columns)
+            for start in range(0, batch.num_rows, step):
+                yield batch.slice(start, step).to_pandas()
+
+    def read(self, columns=None, max_rows=None):
+        """Materialize columns in memory; above max_rows a seeded row sample is returned"""
+        columns = list(self.columns) if columns is None else list(columns)
+        if max_rows is not None and self.num_rows > max_rows:
+            return self.sample(max_rows, columns=columns)
+        return self._read_table(columns).to_pandas()
+
+    def head(self, n=5):
+        return self._read_table(list(self.columns)).slice(0, n).to_pandas()
+
+    def sample(self, n, columns=None, random_state=42):
+        """Seeded uniform row sample in file order"""
+        columns = list(self.columns) if columns is None else list(columns)
+        if n >= self.num_rows:
+            return self._read_table(columns).to_pandas()
+
+        rows = np.sort(np.random.default_rng(random_state).choice(self.num_rows, n, replace=False))
+        return self._read_table(columns).take(pa.array(rows)).to_pandas().reset_index(drop=True)
+
+    def null_counts(self):
+        """Missing values per column (nulls, plus NaN in float columns) without converting to pandas"""
+        table = self._read_table(list(self.columns))
+        counts = {}
+        for col in self.columns:
+            column = table.column(col)
+            count = column.null_count
+            if pa.types.is_floating(column.type):
+                count += pc.sum(pc.is_nan(column)).as_py() or 0
+            counts[col] = count
+        return pd.Series(counts, dtype=np.int64)
+
+    def fingerprint(self):
+        """Content hash of the Arrow files, read in blocks"""
+        digest = hashlib.blake2b(digest_size=16)
+        for path in self.paths:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def _batches(self):
+        for reader in self._readers:
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+    def _read_table(self, columns):
+        # Memory-mapped: only the pages of the selected columns are touched
+        return pa.concat_tables([reader.read_all() for reader in self._readers]).select(columns)
+
+    def _column_nbytes(self, col):
+        return sum(batch.column(col).nbytes for batch in self._batches())
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.frame_cache import frame_memo, recall
+from utils.running_stats import RunningMoments
+
+# Statistics produced for every numeric column, in describe()-like order
+PROFILE_STATS = ['count', 'null_count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'skewness', 'kurtosis']
+PROFILE_QUANTILES = [0.25, 0.5, 0.75]
+
+
+def get_column_profile(data):
+    """Return the cached numeric column profile of a DataFrame, computing it on first use"""
+    if isinstance(data, ChunkedDataset):
+        return frame_memo(data, 'column_profile', compute_chunked_column_profile)
+    return frame_memo(data, 'column_profile', compute_column_profile)
+
+
+def get_quantile_sketches(data):
+    """Quantile sketches attached to a frame by the dataset store, if they match its numeric columns"""
+    sketches = recall(data, 'quantile_sketches')
+    if sketches is None or sketches.columns != list(data.select_dtypes(include=[np.number]).columns):
+        return None
+    return sketches
+
+
+def compute_column_profile(data):
+    """Moments, extrema, null counts and quartiles for all numeric columns in one vectorized kernel
+
+    Returns a DataFrame indexed by PROFILE_STATS with one column per numeric column, so
+    ``profile.to_dict()`` has the same shape as ``describe().to_dict()``. With quantile
+    sketches attached the quartiles come from them and the column sort is skipped.
+    """
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    if len(numerical_cols) == 0:
+        return pd.DataFrame(index=PROFILE_STATS, dtype=float)
+
+    values = data[numerical_cols].to_numpy(dtype=np.float64)
+    n_rows = values.shape[0]
+    sketches = get_quantile_sketches(data)
+
+    count = n_rows - np.isnan(values).sum(axis=0)
+    has_values = count > 0
+    last = np.maximum(count - 1, 0)
+    columns = np.arange(values.shape[1])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(values, axis=0) / count
+        deviations = values - mean
+        deviations[np.isnan(deviations)] = 0.0
+
+        squared = deviations * deviations
+        m2 = squared.sum(axis=0) / count
+        m3 = (squared * deviations).sum(axis=0) / count
+        m4 = (squared * squared).sum(axis=0) / count
+
+        std = np.sqrt(m2 * count / (count - 1))
+        # Biased estimators, matching scipy.stats.skew / kurtosis defaults
+        skewness = m3 / m2 ** 1.5
+        kurtosis = m4 / m2 ** 2 - 3.0
+
+    # Constant columns have no shape; scipy reports NaN there as well
+    flat = m2 <= (np.finfo(np.float64).eps * np.abs(mean)) ** 2
+    skewness[flat] = np.nan
+    kurtosis[flat] = np.nan
+    std[count < 2] = np.nan
+
+    if sketches is not None:
+        quantiles = dict(zip(PROFILE_QUANTILES, sketches.quantiles(PROFILE_QUANTILES)))
+        with np.errstate(invalid='ignore'):
+            minimum = np.where(has_values, np.fmin.reduce(values, axis=0) if n_rows else np.nan, np.nan)
+            maximum = np.where(has_values, np.fmax.reduce(values, axis=0) if n_rows else np.nan, np.nan)
+    else:
+        # NaNs sort to the end of each column, so the first `count` rows are the valid values
+        sorted_values = np.sort(values, axis=0)
+        quantiles = {}
+        for q in PROFILE_QUANTILES:
+            # Linear interpolation between order statistics, as in pandas' quantile()
+            position = q * last
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            weight = position - lower
+            low_values = sorted_values[lower, columns] if n_rows else np.full(len(columns), np.nan)
+            high_values = sorted_values[upper, columns] if n_rows else np.full(len(columns), np.nan)
+            quantiles[q] = np.where(has_values, low_values + (high_values - low_values) * weight, np.nan)
+
+        minimum = np.where(has_values, sorted_values[0, columns] if n_rows else np.nan, np.nan)
+        maximum = np.where(has_values, sorted_values[last, columns] if n_rows else np.nan, np.nan)
+
+    profile = pd.DataFrame(
+        [count.astype(np.float64), (n_rows - count).astype(np.float64), mean, std, minimum,
+         quantiles[0.25], quantiles[0.5], quantiles[0.75], maximum, skewness, kurtosis],
+        index=PROFILE_STATS,
+        columns=numerical_cols
+    )
+    return profile
+
+
+def compute_chunked_column_profile(dataset):
+    """Column profile of an out-of-core dataset in one pass over its chunks
+
+    Moments, extrema and null counts are exact, merged chunk by chunk. Exact quantiles
+    would need a full sort, so they come from the quantile sketches built at ingest, or
+    else from a seeded row sample that fits the dataset's memory budget.
+    """
+    numerical_cols = dataset.select_dtypes(include=[np.number]).columns
+    if len(numerical_cols) == 0:
+        return pd.DataFrame(index=PROFILE_STATS, dtype=float)
+
+    moments = RunningMoments(len(numerical_cols))
+    for chunk in dataset.iter_chunks(numerical_cols):
+        moments.update(chunk.to_numpy(dtype=np.float64))
+    summary = moments.summary()
+
+    sketches = get_quantile_sketches(dataset)
+    if sketches is not None:
+        quantiles = sketches.quantiles(PROFILE_QUANTILES)
+    else:
+        sample = dataset.sample(dataset.chunk_rows(numerical_cols), columns=numerical_cols)
+        quantiles = sample.quantile(PROFILE_QUANTILES).to_numpy()
+
+    profile = pd.DataFrame(
+        [summary['count'], summary['null_count'], summary['mean'], summary['std'], summary['min'],
+         quantiles[0], quantiles[1], quantiles[2],
+         summary['max'], summary['skewness'], summary['kurtosis']],
+        index=PROFILE_STATS,
+        columns=numerical_cols
+    )
+    return profile
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.frame_cache import frame_memo
+from utils.running_stats import RunningComoments
+
+CORRELATION_METHODS = ('pearson', 'spearman', 'kendall')
+
+
+def get_correlation_matrix(data, method='pearson', block_size=512):
+    """Return the memoized correlation matrix of a frame's numeric columns"""
+    return frame_memo(data, f'correlation:{method}',
+                      lambda frame: compute_correlation_matrix(frame, method=method, block_size=block_size))
+
+
+def compute_correlation_matrix(data, method='pearson', block_size=512):
+    """Pairwise-complete correlation matrix of the numeric columns, computed in column blocks
+
+    Pearson and Spearman are built from block matrix products. Each column block is
+    taken from the frame (and ranked, for Spearman) inside the block loop, so peak
+    working memory grows with rows x block_size rather than with the full column
+    count. Spearman ranks each column over its own non-null values. Kendall has no
+    matrix form and is delegated to pandas.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Desteklenmeyen korelasyon yöntemi: {method}")
+
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    if isinstance(data, ChunkedDataset):
+        return _compute_chunked_correlation_matrix(data, numerical_cols, method, block_size)
+
+    if method == 'kendall':
+        return data[numerical_cols].corr(method='kendall')
+
+    n_cols = len(numerical_cols)
+    matrix = np.empty((n_cols, n_cols), dtype=np.float64)
+    # Column by column, so the check does not copy the numeric frame
+    complete = all(data[col].count() == len(data) for col in numerical_cols)
+
+    for i in range(0, n_cols, block_size):
+        x_i, m_i, sq_i = _column_block(data, numerical_cols[i:i + block_size], method, complete)
+        for j in range(i, n_cols, block_size):
+            if j == i:
+                x_j, m_j, sq_j = x_i, m_i, sq_i
+            else:
+                x_j, m_j, sq_j = _column_block(data, numerical_cols[j:j + block_size], method, complete)
+
+            if complete:
+                # No missing values: blocks are standardized, so the Gram product is the correlation
+                block = x_i.T @ x_j
+            else:
+                # Pairwise-valid sums of values centred on their column means
+                count = m_i.T @ m_j
+                sum_i = x_i.T @ m_j
+                sum_j = m_i.T @ x_j
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    cov = x_i.T @ x_j - sum_i * sum_j / count
+                    var_i = sq_i.T @ m_j - sum_i * sum_i / count
+                    var_j = m_i.T @ sq_j - sum_j * sum_j / count
+                    block = cov / np.sqrt(var_i * var_j)
+                block[count < 2] = np.nan
+
+            matrix[i:i + block_size, j:j + block_size] = block
+            matrix[j:j + block_size, i:i + block_size] = block.T
+
+    np.clip(matrix, -1.0, 1.0, out=matrix)
+    # Exact ones on the diagonal wherever a column has any variance
+    diagonal = np.diag_indices(n_cols)
+    matrix[diagonal] = np.where(np.isnan(matrix[diagonal]), np.nan, 1.0)
+
+    return pd.DataFrame(matrix, index=numerical_cols, columns=numerical_cols)
+
+
+def _column_block(data, columns, method, complete):
+    """A block of columns ready for the Gram products
+
+    Complete data gives standardized values only; otherwise values centred on their
+    column means with missing ones zeroed, their validity mask and their squares.
+    """
+    numeric = data[columns]
+    if method == 'spearman':
+        numeric = numeric.rank()
+    values = numeric.to_numpy(dtype=np.float64)
+
+    if complete:
+        centered = values - values.mean(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return centered / np.sqrt((centered * centered).sum(axis=0)), None, None
+
+    valid = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+    return centered, valid.astype(np.float64), centered * centered
+
+
+def _compute_chunked_correlation_matrix(dataset, numerical_cols, method, block_size):
+    """Pearson over every chunk of an out-of-core dataset; rank methods on a seeded sample"""
+    if method != 'pearson':
+        # Ranks need the whole column at once, so use the rows that fit the memory budget
+        sample = dataset.sample(dataset.chunk_rows(numerical_cols), columns=numerical_cols)
+        return compute_correlation_matrix(sample, method=method, block_size=block_size)
+
+    comoments = RunningComoments(len(numerical_cols))
+    for chunk in dataset.iter_chunks(numerical_cols):
+        comoments.update(chunk.to_numpy(dtype=np.float64))
+    return pd.DataFrame(comoments.correlation(), index=numerical_cols, columns=numerical_cols)
+
+
+def top_correlation_pairs(correlation_matrix, threshold=0.5, strong_threshold=0.7):
+    """Variable pairs above |threshold| from the upper triangle, in row-major order"""
+    values = correlation_matrix.to_numpy()
+    upper = np.triu(np.ones(values.shape, dtype=bool), k=1)
+    with np.errstate(invalid='ignore'):
+        rows, cols = np.nonzero(upper & (np.abs(values) > threshold))
+
+    columns = correlation_matrix.columns
+    pairs = []
+    for i, j in zip(rows, cols):
+        corr_value = float(values[i, j])
+        pairs.append({
+            'var1': columns[i],
+            'var2': columns[j],
+            'correlation': corr_value,
+            'strength': 'Güçlü' if abs(corr_value) > strong_threshold else 'Orta'
+        })
+    return pairs
@@ -1,64 +1,326 @@
 import pandas as pd
 import numpy as np
 import json
+import csv
+import codecs
+import logging
+import os
+import re
 from io import StringIO
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from utils.chunked_dataset import ChunkedDataset
+from utils.column_profile import get_column_profile, get_quantile_sketches
+from utils.correlation import get_correlation_matrix
+from utils.instrumentation import span, timed
+from utils.result_cache import dataset_fingerprint, make_cache_key
+
+logger = logging.getLogger(__name__)
 
 
 class DataProcessor:
-    def __init__(self):
+    # Candidate encodings in sniffing order; latin-1 decodes any byte sequence
+    CSV_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+    CSV_DELIMITERS = ',;\t|'
+
+    def __init__(self, chunk_size=100000, sniff_bytes=64 * 1024, category_ratio=0.5, result_cache=None,
+                 memory_budget=512 * 1024 * 1024):
         self.data = None
+        self.chunk_size = chunk_size  # rows per CSV chunk
+        self.sniff_bytes = sniff_bytes  # sample size for encoding/delimiter detection
+        self.category_ratio = category_ratio  # max unique/rows ratio for category columns
+        self.compaction_report = None
+        self.result_cache = result_cache  # optional ResultCache shared across requests
+        self.memory_budget = memory_budget  # peak working memory for out-of-core conversion
 
-    def load_data(self, filepath):
+    @timed('ingest', step='load_data')
+    def load_data(self, filepath, compact=True):
         """Load data from various file formats with better error handling"""
         try:
             file_extension = filepath.split('.')[-1].lower()
-            print(f"🔍 Loading file: {filepath}")
-            print(f"📄 Extension: {file_extension}")
+            logger.info("Loading %s file: %s", file_extension, filepath)
 
             if file_extension == 'csv':
-                # Try different encodings for CSV
-                encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-                for encoding in encodings:
-                    try:
-                        print(f"🔄 Trying encoding: {encoding}")
-                        self.data = pd.read_csv(filepath, encoding=encoding)
-                        print(f"✅ CSV loaded successfully with {encoding} encoding")
-                        break
-                    except UnicodeDecodeError:
-                        print(f"❌ Failed with {encoding}, trying next...")
-                        continue
-                    except Exception as e:
-                        print(f"❌ Error with {encoding}: {str(e)}")
-                        continue
-
-                if self.data is None:
-                    raise ValueError("CSV dosyası hiçbir encoding ile okunamadı")
+                encoding, delimiter = self._sniff_csv(filepath)
+                logger.debug("Sniffed encoding: %s, delimiter: %r", encoding, delimiter)
+
+                try:
+                    self.data = self._read_csv_chunked(filepath, encoding, delimiter, compact)
+                except UnicodeDecodeError:
+                    # The sample was clean but a later byte was not; latin-1 never fails
+                    logger.warning("%s failed past the sniffed sample, retrying with latin-1", encoding)
+                    self.data = self._read_csv_chunked(filepath, 'latin-1', delimiter, compact)
 
             elif file_extension in ['xlsx', 'xls']:
-                print(f"📊 Loading Excel file...")
                 self.data = pd.read_excel(filepath)
-                print(f"✅ Excel loaded successfully")
 
             elif file_extension == 'json':
-                print(f"📋 Loading JSON file...")
                 self.data = pd.read_json(filepath)
-                print(f"✅ JSON loaded successfully")
             else:
                 raise ValueError(f"Desteklenmeyen dosya formatı: {file_extension}")
 
-            print(f"📊 Final data shape: {self.data.shape}")
-            print(f"📋 Columns: {list(self.data.columns)}")
-            print(f"🔢 Data types: {self.data.dtypes.to_dict()}")
+            logger.info("Loaded data with shape %s", self.data.shape)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Data types: %s", self.data.dtypes.to_dict())
 
             # Clean column names
             self.data.columns = self.data.columns.astype(str)
 
+            if compact:
+                if file_extension != 'csv':
+                    # CSV chunks are compacted as they are read
+                    with span('ingest', step='compact_dtypes'):
+                        self.data = self.compact_dtypes(self.data)
+                logger.info("Memory: %d -> %d bytes", self.compaction_report['memory_before'],
+                            self.compaction_report['memory_after'])
+
             return self.data
 
         except Exception as e:
-            print(f"❌ Data loading error: {str(e)}")
+            logger.error("Data loading error: %s", e)
             raise e
 
+    @timed('ingest', step='convert_to_arrow')
+    def convert_to_arrow(self, filepath, dest_path):
+        """Convert a file into an uncompressed Arrow IPC file for out-of-core use
+
+        CSV files are streamed block by block, so the whole file is never held in memory.
+        Excel and JSON cannot be streamed and are loaded once before being written.
+        """
+        file_extension = filepath.split('.')[-1].lower()
+        logger.info("Converting to Arrow: %s", filepath)
+        tmp_path = f'{dest_path}.tmp'
+
+        try:
+            if file_extension == 'csv':
+                encoding, delimiter = self._sniff_csv(filepath)
+                logger.debug("Sniffed encoding: %s, delimiter: %r", encoding, delimiter)
+                try:
+                    self._stream_csv_to_arrow(filepath, tmp_path, encoding, delimiter)
+                except UnicodeDecodeError:
+                    logger.warning("%s failed past the sniffed sample, retrying with latin-1", encoding)
+                    self._stream_csv_to_arrow(filepath, tmp_path, 'latin-1', delimiter)
+            else:
+                data = self.load_data(filepath, compact=False)
+                table = pa.Table.from_pandas(data, preserve_index=False)
+                with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table, max_chunksize=self.chunk_size)
+
+            os.replace(tmp_path, dest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.compaction_report = None
+        logger.info("Arrow file written: %d bytes", os.path.getsize(dest_path))
+
+    def _stream_csv_to_arrow(self, filepath, dest_path, encoding, delimiter):
+        """Stream CSV blocks into an Arrow IPC file, widening column types when a later block disagrees"""
+        # One parsed block and its pandas conversion must fit in the budget
+        block_size = int(min(max(self.memory_budget // 16, 1024 * 1024), 64 * 1024 * 1024))
+        read_options = pa_csv.ReadOptions(encoding='utf8' if encoding in ('utf-8', 'utf-8-sig') else encoding,
+                                          block_size=block_size)
+        parse_options = pa_csv.ParseOptions(delimiter=delimiter)
+
+        column_types = None
+        while True:
+            convert_options = pa_csv.ConvertOptions(strings_can_be_null=True, column_types=column_types)
+            reader = None
+            try:
+                reader = pa_csv.open_csv(filepath, read_options=read_options, parse_options=parse_options,
+                                         convert_options=convert_options)
+                with pa.OSFile(dest_path, 'wb') as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+                    for batch in reader:
+                        writer.write_batch(batch)
+                # Arrow reads text that is not valid UTF-8 as binary instead of failing
+                binary = [field.name for field in reader.schema if pa.types.is_binary(field.type)]
+                if binary:
+                    raise UnicodeDecodeError(encoding, b'', 0, 1, f"invalid text in CSV columns {binary}")
+                return
+            except pa.ArrowInvalid as e:
+                if 'invalid UTF8' in str(e):
+                    raise UnicodeDecodeError(encoding, b'', 0, 1, str(e)) from e
+                # Types are inferred from the first block; a later block did not fit them
+                widened = self._widen_column_types(reader.schema, str(e)) if reader else column_types
+                if widened == column_types:
+                    raise ValueError(f"CSV dosyası dönüştürülemedi: {str(e)}")
+                logger.warning("CSV type conflict, widening column types: %s", e)
+                column_types = widened
+
+    def _widen_column_types(self, schema, error_message):
+        """Widen the column named in a conversion error: integers to floats, anything else to text"""
+        column_types = {field.name: field.type for field in schema}
+        match = re.search(r'CSV column #(\d+)', error_message)
+        names = [schema[int(match.group(1))].name] if match else list(column_types)
+        for name in names:
+            column_types[name] = pa.float64() if pa.types.is_integer(column_types[name]) else pa.string()
+        return column_types
+
+    def _sniff_csv(self, filepath):
+        """Detect encoding and delimiter from a bounded sample of the file"""
+        with open(filepath, 'rb') as f:
+            sample = f.read(self.sniff_bytes)
+
+        if sample.startswith(codecs.BOM_UTF8):
+            encoding = 'utf-8-sig'
+            text = sample[len(codecs.BOM_UTF8):].decode('utf-8', errors='ignore')
+        else:
+            encoding, text = None, None
+            for candidate in self.CSV_ENCODINGS:
+                try:
+                    # Incremental decode tolerates a multi-byte character cut at the sample end
+                    text = codecs.getincrementaldecoder(candidate)().decode(sample, final=False)
+                    encoding = candidate
+                    break
+                except UnicodeDecodeError:
+                    continue
+
+        # Drop the last, possibly truncated line before sniffing
+        lines = text.splitlines()
+        if len(sample) == self.sniff_bytes and len(lines) > 1:
+            lines = lines[:-1]
+
+        try:
+            delimiter = csv.Sniffer().sniff('\n'.join(lines), delimiters=self.CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ','
+
+        return encoding, delimiter
+
+    def _read_csv_chunked(self, filepath, encoding, delimiter, compact=True):
+        """Stream a CSV in fixed-size row chunks and concatenate once
+
+        With compact, every chunk is compacted as soon as it is read, so only one raw
+        chunk is held next to the compacted ones rather than the whole raw frame.
+        """
+        chunks = []
+        raw_dtypes = {}
+        memory_before = 0
+        reader = pd.read_csv(filepath, encoding=encoding, sep=delimiter, chunksize=self.chunk_size)
+        with reader:
+            for chunk in reader:
+                if compact:
+                    memory_before += int(chunk.memory_usage(deep=True).sum())
+                    for col, dtype in chunk.dtypes.items():
+                        raw_dtypes.setdefault(col, set()).add(dtype)
+                    with span('ingest', step='compact_dtypes'):
+                        chunk = self.compact_dtypes(chunk)
+                chunks.append(chunk)
+
+        if not chunks:
+            raise ValueError("CSV dosyası boş")
+
+        mixed = self._mixed_text_columns(chunks)
+        if mixed:
+            # A single read keeps such a column as text; numbers parsed in some chunks lost
+            # theirs (e.g. '1' became 1.0 next to blanks), so read only these columns again
+            positions = [chunks[0].columns.get_loc(col) for col in mixed]
+            reader = pd.read_csv(filepath, encoding=encoding, sep=delimiter, chunksize=self.chunk_size,
+                                 usecols=positions, dtype=str)
+            with reader:
+                for i, text in enumerate(reader):
+                    chunks[i] = chunks[i].assign(**{col: text.iloc[:, j].to_numpy(dtype=object)
+                                                    for j, col in enumerate(mixed)})
+
+        data = self._concat_chunks(chunks)
+        if not compact:
+            return data
+
+        # Chunks may disagree (e.g. a column only categorical in some); settle on the whole frame
+        with span('ingest', step='compact_dtypes'):
+            data = self.compact_dtypes(data)
+        converted = {}
+        for col in data.columns:
+            original_dtype = self._common_dtype(raw_dtypes[col])
+            if str(data[col].dtype) != str(original_dtype):
+                converted[col] = f"{original_dtype} -> {data[col].dtype}"
+        self.compaction_report = {
+            'memory_before': memory_before,
+            'memory_after': self.compaction_report['memory_after'],
+            'converted_columns': converted
+        }
+        return data
+
+    def _mixed_text_columns(self, chunks):
+        """Columns read as text in some chunks and as numbers (or booleans) in others"""
+        mixed = []
+        for col in chunks[0].columns:
+            textual = [isinstance(chunk[col].dtype, pd.CategoricalDtype) or chunk[col].dtype == object
+                       for chunk in chunks]
+            if any(textual) and not all(textual):
+                mixed.append(col)
+        return mixed
+
+    def _concat_chunks(self, chunks):
+        """Concatenate compacted chunks, keeping columns categorical when every chunk made them so"""
+        if len(chunks) == 1:
+            return chunks[0]
+
+        aligned = {}
+        for col in chunks[0].columns:
+            categorical = [isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks]
+            if all(categorical):
+                # pd.concat only keeps categoricals whose categories are identical
+                categories = pd.concat([chunk[col].cat.categories.to_series() for chunk in chunks]).unique()
+                aligned[col] = pd.CategoricalDtype(pd.Index(categories))
+            elif any(categorical):
+                aligned[col] = object
+
+        if aligned:
+            # One chunk at a time, so only one extra chunk exists during the conversion
+            for i, chunk in enumerate(chunks):
+                chunks[i] = chunk.astype(aligned)
+        return pd.concat(chunks, ignore_index=True)
+
+    def _common_dtype(self, dtypes):
+        """dtype pandas infers for a column read as chunks of the given dtypes"""
+        if len(dtypes) == 1:
+            return next(iter(dtypes))
+        if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dtypes):
+            return np.result_type(*dtypes)
+        return np.dtype(object)
+
+    def compact_dtypes(self, data):
+        """Downcast numerics losslessly and turn repetitive strings into categories"""
+        memory_before = int(data.memory_usage(deep=True).sum())
+        converted = {}
+        compacted = {}
+
+        for col in data.columns:
+            series = data[col]
+            original_dtype = str(series.dtype)
+
+            if pd.api.types.is_bool_dtype(series):
+                continue
+            elif pd.api.types.is_integer_dtype(series):
+                series = pd.to_numeric(series, downcast='integer')
+                if str(series.dtype) == original_dtype:
+                    series = pd.to_numeric(series, downcast='unsigned')
+            elif pd.api.types.is_float_dtype(series):
+                downcast = series.astype(np.float32)
+                # Only keep float32 when every value survives the round trip
+                if ((downcast.astype(series.dtype) == series) | series.isna()).all():
+                    series = downcast
+            elif series.dtype == object:
+                non_null = series.count()
+                if non_null > 0 and series.nunique() / non_null <= self.category_ratio:
+                    series = series.astype('category')
+
+            if str(series.dtype) != original_dtype:
+                compacted[col] = series
+                converted[col] = f"{original_dtype} -> {series.dtype}"
+
+        if compacted:
+            data = data.assign(**compacted)
+
+        self.compaction_report = {
+            'memory_before': memory_before,
+            'memory_after': int(data.memory_usage(deep=True).sum()),
+            'converted_columns': converted
+        }
+
+        return data
+
     def parse_manual_data(self, data_text, data_format):
         """Parse manually entered data"""
         if data_format == 'csv':
@@ -71,41 +333,75 @@ class DataProcessor:
 
         return self.data
 
-    def analyze_data(self, data):
-        """Perform comprehensive data analysis"""
+    @timed('analysis', analysis='basic')
+    def analyze_data(self, data, memory_usage_before=None, statistics=None):
+        """Perform comprehensive data analysis
+
+        statistics, the dataset's stored DatasetStatistics, serves missing values and
+        correlations without another pass over the data when it still matches.
+        """
         if data is None or data.empty:
             raise ValueError("Analiz edilecek veri bulunamadı")
+        if statistics is not None and not statistics.matches(data):
+            statistics = None
+
+        cache_key = None
+        if self.result_cache is not None:
+            sketches = get_quantile_sketches(data)
+            cache_key = make_cache_key(dataset_fingerprint(data), 'basic', 'analyze_data',
+                                       {'memory_usage_before': memory_usage_before,
+                                        'quantile_error': sketches.error if sketches is not None else None})
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
         analysis = {
-            'basic_info': self._get_basic_info(data),
+            'basic_info': self._get_basic_info(data, memory_usage_before),
             'statistical_summary': self._get_statistical_summary(data),
-            'missing_values': self._get_missing_values(data),
+            'missing_values': self._get_missing_values(data, statistics),
             'data_types': self._get_data_types(data),
-            'correlations': self._get_correlations(data)
+            'correlations': self._get_correlations(data, statistics)
         }
 
+        if cache_key is not None:
+            self.result_cache.set(cache_key, analysis)
+
         return analysis
 
-    def _get_basic_info(self, data):
+    def _get_basic_info(self, data, memory_usage_before=None):
         """Get basic information about the dataset"""
-        return {
+        # Out-of-core datasets report the size of their Arrow file
+        memory_usage = data.nbytes() if isinstance(data, ChunkedDataset) else data.memory_usage(deep=True).sum()
+        basic_info = {
             'shape': data.shape,
             'columns': list(data.columns),
-            'memory_usage': data.memory_usage(deep=True).sum(),
+            'memory_usage': memory_usage,
             'total_rows': len(data),
             'total_columns': len(data.columns)
         }
 
+        # Footprint before ingest-time dtype compaction, when known
+        if memory_usage_before is not None:
+            basic_info['memory_usage_before'] = memory_usage_before
+
+        return basic_info
+
     def _get_statistical_summary(self, data):
         """Get statistical summary for numerical columns"""
-        numerical_cols = data.select_dtypes(include=[np.number]).columns
-        if len(numerical_cols) > 0:
-            return data[numerical_cols].describe().to_dict()
+        profile = get_column_profile(data)
+        if len(profile.columns) > 0:
+            # Same layout as describe().to_dict(), served from the shared column profile
+            return profile.loc[['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']].to_dict()
         return {}
 
-    def _get_missing_values(self, data):
+    def _get_missing_values(self, data, statistics=None):
         """Analyze missing values"""
-        missing_count = data.isnull().sum()
+        if statistics is not None:
+            missing_count = statistics.missing_values()
+        elif isinstance(data, ChunkedDataset):
+            missing_count = data.null_counts()
+        else:
+            missing_count = data.isnull().sum()
         missing_percentage = (missing_count / len(data)) * 100
 
         return {
@@ -119,15 +415,17 @@ class DataProcessor:
         return {
             'dtypes': data.dtypes.astype(str).to_dict(),
             'numerical_columns': list(data.select_dtypes(include=[np.number]).columns),
-            'categorical_columns': list(data.select_dtypes(include=['object']).columns),
+            'categorical_columns': list(data.select_dtypes(include=['object', 'category']).columns),
             'datetime_columns': list(data.select_dtypes(include=['datetime64']).columns)
         }
 
-    def _get_correlations(self, data):
+    def _get_correlations(self, data, statistics=None):
         """Calculate correlations for numerical columns"""
         numerical_cols = data.select_dtypes(include=[np.number]).columns
         if len(numerical_cols) > 1:
-            correlation_matrix = data[numerical_cols].corr()
+            if statistics is not None:
+                return statistics.correlation_matrix().to_dict()
+            correlation_matrix = get_correlation_matrix(data)
             return correlation_matrix.to_dict()
         return {}
 
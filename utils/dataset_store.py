@@ -0,0 +1,346 @@
+import os
+import re
+import logging
+import uuid
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.frame_cache import remember
+from utils.instrumentation import span, timed
+from utils.result_cache import dataset_fingerprint, extend_fingerprint
+from utils.running_stats import DatasetStatistics
+from utils.sketches import QUANTILE_MODES
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetStore:
+    """Server-side registry of parsed datasets keyed by an opaque dataset id.
+
+    Frames are persisted once as Feather (Arrow columnar) files and the most
+    recently used ones are kept in memory, so routes only need the id. Out-of-core
+    datasets are Arrow IPC files opened as memory-mapped ChunkedDatasets instead.
+    Each dataset can also keep running statistics that appends update incrementally.
+    Where quantile_mode calls for it, their quantile sketches are built at ingest and
+    answer the column profile's quartiles instead of a full sort.
+
+    Rows appended to a Feather dataset are written as Feather segments next to it and
+    folded into the base file only once they hold as many rows as it, or number
+    max_segments, so appends do not rewrite the whole file each time.
+    """
+
+    def __init__(self, storage_dir, max_cached=8, memory_budget=512 * 1024 * 1024, quantile_mode='auto',
+                 quantile_error=0.01, max_segments=32):
+        if quantile_mode not in QUANTILE_MODES:
+            raise ValueError(f"Desteklenmeyen kantil modu: {quantile_mode}")
+
+        self.storage_dir = storage_dir
+        self.max_cached = max_cached
+        self.memory_budget = memory_budget  # per-chunk budget of out-of-core datasets
+        self.quantile_mode = quantile_mode
+        self.quantile_error = quantile_error  # normalized rank error of the quantile sketches
+        self.max_segments = max_segments  # appended Feather segments kept before compacting
+        self._cache = OrderedDict()
+        self._base_rows = {}  # rows in the base Feather file of each loaded dataset
+        self._lock = threading.Lock()
+        self._append_lock = threading.Lock()  # appends rewrite files, one at a time
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+    @timed('ingest', step='save')
+    def save(self, data):
+        """Persist a DataFrame and return its new dataset id"""
+        dataset_id = uuid.uuid4().hex
+        data = data.reset_index(drop=True)
+        self._write_frame(dataset_id, data)
+        self._base_rows[dataset_id] = len(data)
+        self._attach_statistics(dataset_id, data)
+        self._remember(dataset_id, data)
+        return dataset_id
+
+    def save_chunked(self, write):
+        """Register an out-of-core dataset; write(path) must create its Arrow IPC file"""
+        dataset_id = uuid.uuid4().hex
+        write(self._arrow_path(dataset_id))
+        self.load(dataset_id)  # builds the quantile sketches at ingest when they are used
+        return dataset_id
+
+    def load(self, dataset_id):
+        """Return the DataFrame (or ChunkedDataset) for a dataset id, or None if it is unknown"""
+        if not self._is_valid_id(dataset_id):
+            return None
+
+        with self._lock:
+            if dataset_id in self._cache:
+                self._cache.move_to_end(dataset_id)
+                return self._cache[dataset_id]
+
+        if os.path.exists(self._arrow_path(dataset_id)):
+            data = ChunkedDataset(self._segment_paths(dataset_id), memory_budget=self.memory_budget)
+        elif os.path.exists(self._feather_path(dataset_id)):
+            data = self._read_frame(dataset_id)
+        elif os.path.exists(self._pickle_path(dataset_id)):
+            data = pd.read_pickle(self._pickle_path(dataset_id))
+        else:
+            return None
+
+        self._attach_statistics(dataset_id, data)
+        self._remember(dataset_id, data)
+        return data
+
+    def statistics(self, dataset_id):
+        """Running statistics of a dataset, built with one pass and stored on first use"""
+        data = self.load(dataset_id)
+        if data is None:
+            return None
+        return self._statistics_for(dataset_id, data)
+
+    def uses_quantile_sketches(self, data):
+        """Whether quartiles of data come from quantile sketches under the quantile mode"""
+        return self.quantile_mode == 'approximate' or (
+            self.quantile_mode == 'auto' and isinstance(data, ChunkedDataset))
+
+    @timed('ingest', step='append')
+    def append(self, dataset_id, batch):
+        """Append rows to a dataset and fold only them into its stored statistics
+
+        Returns the updated data and statistics. Raises ValueError for an unknown
+        dataset or a batch whose columns or values do not fit it.
+        """
+        with self._append_lock:
+            data = self.load(dataset_id)
+            if data is None:
+                raise ValueError('Veri bulunamadı')
+            statistics = self._statistics_for(dataset_id, data)
+
+            unknown = [col for col in batch.columns if col not in data.columns]
+            if unknown:
+                raise ValueError(f'Bilinmeyen sütunlar: {", ".join(map(str, unknown))}')
+            batch = batch.reset_index(drop=True)
+
+            if isinstance(data, ChunkedDataset):
+                # Old segments are never rewritten; the batch becomes a new segment
+                batch = self._write_segment(dataset_id, data.schema, batch)
+                updated = ChunkedDataset(self._segment_paths(dataset_id), memory_budget=self.memory_budget)
+            else:
+                updated, batch = self._concat_frames(data, batch.reindex(columns=data.columns))
+                self._append_frame(dataset_id, updated, batch)
+
+            if statistics.matches(data) and set(statistics.numerical_cols) == set(
+                    updated.select_dtypes(include=['number']).columns):
+                statistics.update(batch)
+                statistics.fingerprint = extend_fingerprint(statistics.fingerprint, batch)
+            else:
+                # A column changed type (e.g. text appended to numbers): rebuild once
+                statistics = DatasetStatistics.from_data(updated, self.quantile_error)
+                statistics.fingerprint = dataset_fingerprint(updated)
+
+            self._write_statistics(dataset_id, statistics)
+            remember(updated, 'fingerprint', statistics.fingerprint)
+            if self.uses_quantile_sketches(updated):
+                remember(updated, 'quantile_sketches', statistics.quantiles)
+            self._remember(dataset_id, updated)
+            return updated, statistics
+
+    def exists(self, dataset_id):
+        """Check whether a dataset id is known to the store"""
+        if not self._is_valid_id(dataset_id):
+            return False
+        with self._lock:
+            if dataset_id in self._cache:
+                return True
+        return any(os.path.exists(path) for path in self._paths(dataset_id))
+
+    def delete(self, dataset_id):
+        """Drop a dataset from memory and disk"""
+        if not self._is_valid_id(dataset_id):
+            return
+
+        with self._lock:
+            self._cache.pop(dataset_id, None)
+
+        for path in self._paths(dataset_id):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, dataset_id, data):
+        """Insert a frame into the LRU cache, evicting the oldest entries"""
+        with self._lock:
+            self._cache[dataset_id] = data
+            self._cache.move_to_end(dataset_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def _is_valid_id(self, dataset_id):
+        """Dataset ids come from the session, so never trust them as paths"""
+        if not isinstance(dataset_id, str) or len(dataset_id) != 32:
+            return False
+        try:
+            int(dataset_id, 16)
+        except ValueError:
+            return False
+        return True
+
+    def _statistics_for(self, dataset_id, data):
+        """Stored statistics of data, rebuilt when they no longer describe it"""
+        statistics = self._read_statistics(dataset_id)
+        if (statistics is None or not statistics.matches(data) or
+                getattr(statistics, 'quantiles', None) is None or statistics.quantiles.error != self.quantile_error):
+            with span('ingest', step='statistics'):
+                statistics = DatasetStatistics.from_data(data, self.quantile_error)
+                statistics.fingerprint = dataset_fingerprint(data)
+                self._write_statistics(dataset_id, statistics)
+        return statistics
+
+    def _attach_statistics(self, dataset_id, data):
+        """Seed a frame's memo with its stored content hash and, when used, quantile sketches"""
+        if self.uses_quantile_sketches(data):
+            statistics = self._statistics_for(dataset_id, data)
+            remember(data, 'quantile_sketches', statistics.quantiles)
+        else:
+            statistics = self._read_statistics(dataset_id)
+            if statistics is None or not statistics.matches(data):
+                return
+        # The stored statistics carry the content hash, which saves rehashing the data
+        if statistics.fingerprint:
+            remember(data, 'fingerprint', statistics.fingerprint)
+
+    def _write_frame(self, dataset_id, data):
+        """Write a frame atomically, as Feather when Arrow can represent it"""
+        try:
+            tmp_path = f'{self._feather_path(dataset_id)}.tmp'
+            data.to_feather(tmp_path)
+            os.replace(tmp_path, self._feather_path(dataset_id))
+        except Exception as e:
+            # Mixed-type object columns cannot be written as Arrow
+            logger.warning("Feather write failed, falling back to pickle: %s", e)
+            data.to_pickle(self._pickle_path(dataset_id))
+            if os.path.exists(self._feather_path(dataset_id)):
+                os.remove(self._feather_path(dataset_id))
+
+    def _read_frame(self, dataset_id):
+        """Base Feather file of a dataset followed by its appended segments"""
+        data = pd.read_feather(self._feather_path(dataset_id))
+        self._base_rows[dataset_id] = len(data)
+        segments = self._frame_segment_paths(dataset_id, len(data))
+        if segments:
+            data, _ = self._concat_frames(data, pd.concat([pd.read_feather(path) for path in segments],
+                                                          ignore_index=True))
+        return data
+
+    def _append_frame(self, dataset_id, updated, batch):
+        """Persist an appended batch as the next Feather segment, compacting when due"""
+        base_rows = self._base_rows.get(dataset_id)
+        if base_rows is not None and os.path.exists(self._feather_path(dataset_id)):
+            segments = self._frame_segment_paths(dataset_id, base_rows)
+            # Compacting once the segments outgrow the base keeps appends O(batch) amortized
+            if len(segments) < self.max_segments and len(updated) - base_rows <= base_rows:
+                path = self._frame_segment_path(dataset_id, base_rows, len(segments))
+                try:
+                    batch.to_feather(f'{path}.tmp')
+                    os.replace(f'{path}.tmp', path)
+                    return
+                except Exception as e:
+                    logger.warning("Feather segment write failed, compacting: %s", e)
+                    if os.path.exists(f'{path}.tmp'):
+                        os.remove(f'{path}.tmp')
+
+        self._write_frame(dataset_id, updated)
+        self._base_rows[dataset_id] = len(updated)
+        # Segments name the base row count they extend, so older ones are stale now
+        for path in self._frame_segment_paths(dataset_id):
+            os.remove(path)
+
+    def _concat_frames(self, data, batch):
+        """Append batch to data, keeping categorical columns categorical"""
+        aligned_data, aligned_batch = {}, {}
+        for col in data.columns:
+            if isinstance(data[col].dtype, pd.CategoricalDtype):
+                new_values = pd.Index(batch[col].dropna().unique()).difference(data[col].cat.categories)
+                column = data[col].cat.add_categories(new_values) if len(new_values) else data[col]
+                aligned_data[col] = column
+                aligned_batch[col] = batch[col].astype(column.dtype)
+        if aligned_data:
+            data = data.assign(**aligned_data)
+            batch = batch.assign(**aligned_batch)
+
+        updated = pd.concat([data, batch], ignore_index=True)
+        # The batch as stored, with the promoted dtypes of the combined frame
+        return updated, updated.iloc[len(data):].reset_index(drop=True)
+
+    def _write_segment(self, dataset_id, schema, batch):
+        """Write batch as the next Arrow segment of an out-of-core dataset
+
+        Columns the batch leaves out are written as nulls of the field's type.
+        """
+        arrays = []
+        for field in schema:
+            if field.name not in batch.columns:
+                arrays.append(pa.nulls(len(batch), field.type))
+                continue
+            try:
+                array = pa.array(batch[field.name], from_pandas=True)
+                arrays.append(array if array.type == field.type else array.cast(field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"'{field.name}' sütunu mevcut veri tipine ({field.type}) uymuyor: {str(e)}")
+        table = pa.Table.from_arrays(arrays, schema=schema)
+
+        path = os.path.join(self.storage_dir, f'{dataset_id}.{len(self._segment_paths(dataset_id))}.arrow')
+        with pa.OSFile(f'{path}.tmp', 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+        os.replace(f'{path}.tmp', path)
+        return table.to_pandas()
+
+    def _read_statistics(self, dataset_id):
+        try:
+            with open(self._statistics_path(dataset_id), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def _write_statistics(self, dataset_id, statistics):
+        path = self._statistics_path(dataset_id)
+        with open(f'{path}.tmp', 'wb') as f:
+            pickle.dump(statistics, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{path}.tmp', path)
+
+    def _paths(self, dataset_id):
+        return (self._feather_path(dataset_id), self._pickle_path(dataset_id), self._statistics_path(dataset_id),
+                *self._segment_paths(dataset_id), *self._frame_segment_paths(dataset_id))
+
+    def _frame_segment_paths(self, dataset_id, base_rows=None):
+        """Appended Feather segments in append order; only those extending base_rows rows if given"""
+        pattern = re.compile(rf'^{dataset_id}\.(\d+)\.(\d+)\.feather$')
+        segments = sorted((int(match.group(1)), int(match.group(2)), name) for name in os.listdir(self.storage_dir)
+                          if (match := pattern.match(name)) and (base_rows is None or int(match.group(1)) == base_rows))
+        return [os.path.join(self.storage_dir, name) for _, _, name in segments]
+
+    def _frame_segment_path(self, dataset_id, base_rows, index):
+        return os.path.join(self.storage_dir, f'{dataset_id}.{base_rows}.{index}.feather')
+
+    def _segment_paths(self, dataset_id):
+        """The base Arrow file followed by appended segments, in append order"""
+        if not os.path.exists(self._arrow_path(dataset_id)):
+            return []
+        pattern = re.compile(rf'^{dataset_id}\.(\d+)\.arrow$')
+        segments = sorted((int(match.group(1)), name) for name in os.listdir(self.storage_dir)
+                          if (match := pattern.match(name)))
+        return [self._arrow_path(dataset_id)] + [os.path.join(self.storage_dir, name) for _, name in segments]
+
+    def _statistics_path(self, dataset_id):
+        return os.path.join(self.storage_dir, f'{dataset_id}.stats.pkl')
+
+    def _arrow_path(self, dataset_id):
+        return os.path.join(self.storage_dir, f'{dataset_id}.arrow')
+
+    def _feather_path(self, dataset_id):
+        return os.path.join(self.storage_dir, f'{dataset_id}.feather')
+
+    def _pickle_path(self, dataset_id):
+        return os.path.join(self.storage_dir, f'{dataset_id}.pkl')
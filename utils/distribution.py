@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from utils.column_profile import get_column_profile
+from utils.frame_cache import frame_memo
+
+# Tests used for columns longer than the Shapiro-Wilk limit
+LARGE_SAMPLE_TESTS = ('dagostino', 'shapiro')
+
+
+def default_bin_count(n_rows):
+    """Histogram bin count used by both the distribution analysis and the histogram chart"""
+    return min(30, max(10, n_rows // 10))
+
+
+def get_normality_tests(data, shapiro_max_n=5000, large_sample_test='dagostino', random_state=42):
+    """Memoized normality test results for every numeric column"""
+    return frame_memo(data, f'normality:{shapiro_max_n}:{large_sample_test}:{random_state}',
+                      lambda frame: compute_normality_tests(frame, shapiro_max_n, large_sample_test, random_state))
+
+
+def get_histograms(data, bins):
+    """Memoized histograms of every numeric column with the given bin count"""
+    return frame_memo(data, f'histograms:{bins}', lambda frame: compute_histograms(frame, bins))
+
+
+def compute_normality_tests(data, shapiro_max_n=5000, large_sample_test='dagostino', random_state=42):
+    """Normality test per numeric column, deterministic for a given frame
+
+    Columns with at most shapiro_max_n values get Shapiro-Wilk on all of them. Longer
+    columns get the D'Agostino-Pearson K² test on the full data, computed for every
+    column at once from the shared profile's moments. With large_sample_test='shapiro'
+    they get Shapiro-Wilk on a seeded sample instead. Returns a DataFrame indexed by
+    numeric column with test, statistic, p_value and n.
+    """
+    if large_sample_test not in LARGE_SAMPLE_TESTS:
+        raise ValueError(f"Desteklenmeyen normallik testi: {large_sample_test}")
+
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    profile = get_column_profile(data)
+    count = profile.loc['count', numerical_cols].to_numpy()
+
+    results = pd.DataFrame({
+        'test': 'shapiro',
+        'statistic': np.nan,
+        'p_value': np.nan,
+        'n': count
+    }, index=numerical_cols)
+
+    large = count > shapiro_max_n
+    if large_sample_test == 'dagostino' and large.any():
+        statistic, p_value = _dagostino_pearson(
+            profile.loc['skewness', numerical_cols[large]].to_numpy(),
+            profile.loc['kurtosis', numerical_cols[large]].to_numpy(),
+            count[large]
+        )
+        results.loc[large, 'test'] = 'dagostino'
+        results.loc[large, 'statistic'] = statistic
+        results.loc[large, 'p_value'] = p_value
+
+    rng = np.random.default_rng(random_state)
+    for col, is_large in zip(numerical_cols, large):
+        if is_large and large_sample_test == 'dagostino':
+            continue
+
+        col_data = data[col].dropna().to_numpy(dtype=np.float64)
+        if len(col_data) < 3:
+            continue
+        if is_large:
+            col_data = rng.choice(col_data, shapiro_max_n, replace=False)
+        statistic, p_value = stats.shapiro(col_data)
+        results.loc[col, ['statistic', 'p_value']] = [statistic, p_value]
+
+    return results
+
+
+def _dagostino_pearson(skewness, excess_kurtosis, n):
+    """Vectorized scipy.stats.normaltest from biased skewness and excess kurtosis"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Skewness test (D'Agostino 1970)
+        y = skewness * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+        beta2 = (3.0 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3) /
+                 ((n - 2.0) * (n + 5) * (n + 7) * (n + 9)))
+        w2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(w2))
+        alpha = np.sqrt(2.0 / (w2 - 1))
+        y = np.where(y == 0, 1, y)
+        z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+        # Kurtosis test (Anscombe & Glynn 1983)
+        b2 = excess_kurtosis + 3.0
+        expected = 3.0 * (n - 1) / (n + 1)
+        variance = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.) * (n + 3) * (n + 5))
+        x = (b2 - expected) / np.sqrt(variance)
+        sqrt_beta1 = (6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9)) *
+                      np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3))))
+        a = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + np.sqrt(1 + 4.0 / (sqrt_beta1 ** 2)))
+        term1 = 1 - 2 / (9.0 * a)
+        denom = 1 + x * np.sqrt(2 / (a - 4.0))
+        term2 = np.sign(denom) * np.where(denom == 0.0, np.nan, ((1 - 2.0 / a) / np.abs(denom)) ** (1 / 3.0))
+        z_kurt = (term1 - term2) / np.sqrt(2 / (9.0 * a))
+
+    statistic = z_skew ** 2 + z_kurt ** 2
+    return statistic, stats.chi2.sf(statistic, 2)
+
+
+def compute_histograms(data, bins, chunk_rows=100000):
+    """Equal-width histograms of all numeric columns, binned together in row chunks
+
+    Bin edges span each column's min and max from the shared profile. Returns a dict
+    with the numeric ``columns``, ``counts`` (columns x bins) and ``edges``
+    (columns x bins + 1), plus a Gaussian ``density`` on the bin centres, smoothed
+    from the counts with Scott's bandwidth.
+    """
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    profile = get_column_profile(data)
+    n_cols = len(numerical_cols)
+
+    minimum = profile.loc['min', numerical_cols].to_numpy()
+    maximum = profile.loc['max', numerical_cols].to_numpy()
+    # Constant columns get a unit-wide range centred on their value, as numpy does
+    flat = maximum == minimum
+    minimum = np.where(flat, minimum - 0.5, minimum)
+    maximum = np.where(flat, maximum + 0.5, maximum)
+    width = (maximum - minimum) / bins
+
+    counts = np.zeros(n_cols * bins, dtype=np.int64)
+    offsets = np.arange(n_cols) * bins
+    for start in range(0, len(data), chunk_rows):
+        values = data.iloc[start:start + chunk_rows][numerical_cols].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        with np.errstate(invalid='ignore'):
+            positions = np.floor((values - minimum) / width)
+        # The maximum belongs to the last bin, as in numpy.histogram
+        positions = np.clip(np.nan_to_num(positions), 0, bins - 1).astype(np.int64)
+        counts += np.bincount((positions + offsets)[valid], minlength=n_cols * bins)
+    counts = counts.reshape(n_cols, bins)
+
+    edges = minimum[:, None] + width[:, None] * np.arange(bins + 1)
+    centres = (edges[:, :-1] + edges[:, 1:]) / 2
+
+    # Binned KDE: each bin's count spread as a Gaussian around its centre
+    total = counts.sum(axis=1)
+    std = profile.loc['std', numerical_cols].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bandwidth = 1.06 * std * total ** (-1 / 5)
+        # A kernel narrower than a bin cannot be resolved on the bin grid
+        bandwidth = np.where(np.isfinite(bandwidth), np.maximum(bandwidth, width), width)
+        distance = (centres[:, :, None] - centres[:, None, :]) / bandwidth[:, None, None]
+        kernel = np.exp(-0.5 * distance ** 2) / (np.sqrt(2 * np.pi) * bandwidth[:, None, None])
+        density = np.einsum('cij,cj->ci', kernel, counts) / total[:, None]
+
+    return {
+        'columns': numerical_cols,
+        'counts': counts,
+        'edges': edges,
+        'density': np.nan_to_num(density)
+    }
@@ -0,0 +1,48 @@
+import threading
+import weakref
+
+# Values derived from a DataFrame, keyed by id() of the frame and dropped when it is collected.
+# Frames handed out by the dataset store are never mutated in place, so derived values stay valid.
+_frame_cache = {}
+_frame_cache_lock = threading.Lock()
+
+
+def frame_memo(data, name, compute):
+    """Return compute(data), memoized per frame object under name"""
+    key = id(data)
+    with _frame_cache_lock:
+        entry = _frame_cache.get(key)
+        if entry is not None and entry[0]() is data and name in entry[1]:
+            return entry[1][name]
+
+    value = compute(data)
+    remember(data, name, value)
+    return value
+
+
+def remember(data, name, value):
+    """Store a value derived elsewhere (e.g. restored from disk) in a frame's memo"""
+    key = id(data)
+    with _frame_cache_lock:
+        entry = _frame_cache.get(key)
+        if entry is None or entry[0]() is not data:
+            entry = (weakref.ref(data), {})
+            _frame_cache[key] = entry
+            weakref.finalize(data, _forget_frame, key, entry[0])
+        entry[1][name] = value
+
+
+def recall(data, name, default=None):
+    """A value memoized for a frame under name, without computing it"""
+    with _frame_cache_lock:
+        entry = _frame_cache.get(id(data))
+        if entry is not None and entry[0]() is data:
+            return entry[1].get(name, default)
+    return default
+
+
+def _forget_frame(key, ref):
+    with _frame_cache_lock:
+        entry = _frame_cache.get(key)
+        if entry is not None and entry[0] is ref:
+            del _frame_cache[key]
@@ -0,0 +1,269 @@
+import bisect
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+
+# Span kinds and the label each is broken down by
+SPAN_KINDS = {
+    'http_request': ('endpoint', 'method', 'status'),
+    'ingest': ('step',),
+    'analysis': ('analysis',),
+    'chart': ('chart',),
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+MEMORY_BUCKETS = tuple(2 ** power for power in range(20, 35, 2))  # 1 MB to 16 GB
+
+# Whether the current root span was sampled; child spans follow their root's decision
+_sampled = contextvars.ContextVar('instrumentation_sampled', default=None)
+
+
+class Histogram:
+    """Prometheus histogram with a fixed bucket layout, one series per label set"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            # Counts are stored per bucket and made cumulative on exposition
+            if position < len(self.buckets):
+                series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            label_text = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_with_le(label_text, _format_value(bound))} {cumulative}')
+            lines.append(f'{self.name}_bucket{_with_le(label_text, "+Inf")} {values[-1]}')
+            lines.append(f'{self.name}_sum{label_text} {_format_value(values[-2])}')
+            lines.append(f'{self.name}_count{label_text} {values[-1]}')
+        return lines
+
+
+class Counter:
+    """Prometheus counter, one series per label set"""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, value in series:
+            lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}')
+        return lines
+
+
+class Instrumentation:
+    """Timing and memory spans aggregated into Prometheus metrics
+
+    A span records its wall time and the change in resident memory. Only a fraction
+    sample_rate of root spans is recorded; spans opened inside a root span share its
+    sampling decision, so a sampled request is measured completely. Histogram counts
+    are therefore counts of sampled spans.
+    """
+
+    def __init__(self, enabled=True, sample_rate=1.0, prefix='app'):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.prefix = prefix
+        self.duration = {}
+        self.memory = {}
+        for kind, label_names in SPAN_KINDS.items():
+            self.duration[kind] = Histogram(f'{prefix}_{kind}_duration_seconds',
+                                            f'Wall time of {kind.replace("_", " ")} spans', label_names,
+                                            LATENCY_BUCKETS)
+            self.memory[kind] = Histogram(f'{prefix}_{kind}_memory_bytes',
+                                          f'Resident memory growth over {kind.replace("_", " ")} spans',
+                                          label_names, MEMORY_BUCKETS)
+        self.errors = Counter(f'{prefix}_span_errors_total', 'Spans that ended with an exception',
+                              ('kind', 'name'))
+
+    def configure(self, enabled=None, sample_rate=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError(f"Geçersiz örnekleme oranı: {sample_rate}")
+            self.sample_rate = sample_rate
+
+    def span(self, kind, **labels):
+        """Context manager timing a block; labels are those of SPAN_KINDS[kind]"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, kind, labels)
+
+    def start(self, kind, **labels):
+        """Open a span explicitly, for blocks that cannot use a with statement"""
+        return self.span(kind, **labels).__enter__()
+
+    def should_sample(self):
+        """Sampling decision for a measurement outside a span: the enclosing span's, or a fresh draw"""
+        sampled = _sampled.get()
+        return sampled if sampled is not None else random.random() < self.sample_rate
+
+    def observe(self, kind, seconds, memory_bytes=None, **labels):
+        """Record a span measured elsewhere (e.g. in a worker process)"""
+        if not self.enabled:
+            return
+        key = tuple(str(labels.get(name, '')) for name in SPAN_KINDS[kind])
+        self.duration[kind].observe(key, seconds)
+        if memory_bytes is not None:
+            self.memory[kind].observe(key, max(memory_bytes, 0))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for kind in SPAN_KINDS:
+            lines += self.duration[kind].expose()
+            lines += self.memory[kind].expose()
+        lines += self.errors.expose()
+
+        rss = resident_memory_bytes()
+        if rss is not None:
+            lines += [f'# HELP {self.prefix}_process_resident_memory_bytes Resident memory of this process',
+                      f'# TYPE {self.prefix}_process_resident_memory_bytes gauge',
+                      f'{self.prefix}_process_resident_memory_bytes {rss}']
+        return '\n'.join(lines) + '\n'
+
+
+class Span:
+    def __init__(self, instrumentation, kind, labels):
+        self.instrumentation = instrumentation
+        self.kind = kind
+        self.labels = labels
+        self._token = None
+        self._recording = False
+
+    def __enter__(self):
+        sampled = _sampled.get()
+        if sampled is None:
+            # Root span: decide for everything nested inside it
+            sampled = random.random() < self.instrumentation.sample_rate
+            self._token = _sampled.set(sampled)
+        self._recording = sampled
+        if sampled:
+            self._memory = resident_memory_bytes()
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(error=exc_type is not None)
+        return False
+
+    def finish(self, error=False, **labels):
+        """Close the span; labels known only at the end (e.g. a status) can be added here"""
+        if self._recording:
+            self._recording = False
+            seconds = time.perf_counter() - self._started
+            memory = resident_memory_bytes()
+            self.labels.update(labels)
+            memory_bytes = memory - self._memory if memory is not None and self._memory is not None else None
+            self.instrumentation.observe(self.kind, seconds, memory_bytes, **self.labels)
+            if error:
+                name = next(iter(self.labels.values()), '')
+                self.instrumentation.errors.inc((self.kind, str(name)))
+        if self._token is not None:
+            try:
+                _sampled.reset(self._token)
+            except ValueError:
+                # Finished in another context than it started in (e.g. a request teardown)
+                _sampled.set(None)
+            self._token = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def finish(self, error=False, **labels):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+# Shared by the app and the utils modules; app.py configures it from its config
+instrumentation = Instrumentation()
+
+
+def span(kind, **labels):
+    """Span on the shared instrumentation"""
+    return instrumentation.span(kind, **labels)
+
+
+def timed(kind, **labels):
+    """Decorator running a function inside a span on the shared instrumentation"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with instrumentation.span(kind, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def resident_memory_bytes():
+    """Current resident memory of this process, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _with_le(label_text, bound):
+    if label_text:
+        return label_text[:-1] + f',le="{bound}"' + '}'
+    return '{le="' + bound + '"}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
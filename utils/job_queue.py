@@ -0,0 +1,180 @@
+import json
+import time
+import logging
+import uuid
+import pickle
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Job statuses: 'queued', 'running', 'done', 'failed'
+# Per-analysis progress: 'pending', 'running', 'done', 'error'
+
+
+class JobQueue:
+    """Background analysis jobs on a local thread pool, persisted in a SQLite table
+
+    The table survives restarts: jobs that were queued or running when the process
+    stopped are queued again on startup.
+    """
+
+    def __init__(self, db_path, runner, max_workers=2, max_age=24 * 60 * 60):
+        self.db_path = db_path
+        self.runner = runner  # runner(job, progress) -> result; progress(analysis_type, state)
+        self.max_age = max_age  # finished jobs older than this are purged
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._lock = threading.Lock()
+        self._idle_lock = threading.Lock()
+        self._idle_callbacks = {}  # dataset id -> callbacks waiting for its jobs to finish
+
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id VARCHAR(32) PRIMARY KEY,
+                    dataset_id VARCHAR(32) NOT NULL,
+                    analyses TEXT NOT NULL,
+                    params TEXT,
+                    status VARCHAR(10) NOT NULL,
+                    progress TEXT NOT NULL,
+                    result BLOB,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+        self._recover()
+
+    def submit(self, dataset_id, analyses, params=None):
+        """Queue a job and return its id"""
+        self.purge()
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        progress = {analysis_type: 'pending' for analysis_type in analyses}
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT INTO analysis_jobs (id, dataset_id, analyses, params, status, progress, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, dataset_id, json.dumps(list(analyses)), json.dumps(params or {}), 'queued',
+                 json.dumps(progress), now, now)
+            )
+
+        self._executor.submit(self._execute, job_id)
+        return job_id
+
+    def get(self, job_id):
+        """Job status and per-analysis progress, or None for an unknown id"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, dataset_id, analyses, params, status, progress, error, created_at, updated_at '
+                'FROM analysis_jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'job_id': row[0],
+            'dataset_id': row[1],
+            'analyses': json.loads(row[2]),
+            'params': json.loads(row[3] or '{}'),
+            'status': row[4],
+            'progress': json.loads(row[5]),
+            'error': row[6],
+            'created_at': row[7],
+            'updated_at': row[8]
+        }
+
+    def get_result(self, job_id):
+        """Result of a finished job, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM analysis_jobs WHERE id = ? AND status = 'done'",
+                               (job_id,)).fetchone()
+        return pickle.loads(row[0]) if row and row[0] is not None else None
+
+    def has_active_jobs(self, dataset_id):
+        """Whether a queued or running job still reads the dataset"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM analysis_jobs WHERE dataset_id = ? AND status IN ('queued', 'running') "
+                               "LIMIT 1", (dataset_id,)).fetchone()
+        return row is not None
+
+    def when_idle(self, dataset_id, callback):
+        """Call callback now if no job uses the dataset, otherwise once its last job finishes"""
+        with self._idle_lock:
+            if self.has_active_jobs(dataset_id):
+                self._idle_callbacks.setdefault(dataset_id, []).append(callback)
+                return
+        callback()
+
+    def purge(self):
+        """Drop finished jobs older than max_age"""
+        cutoff = time.time() - self.max_age
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM analysis_jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                         (cutoff,))
+
+    def _execute(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return
+
+        self._update(job_id, status='running')
+        try:
+            result = self.runner(job, lambda analysis_type, state: self._set_progress(job_id, analysis_type, state))
+            self._update(job_id, status='done', result=pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.exception("Analysis job %s failed: %s", job_id, e)
+            self._update(job_id, status='failed', error=str(e))
+        self._run_idle_callbacks(job['dataset_id'])
+
+    def _run_idle_callbacks(self, dataset_id):
+        with self._idle_lock:
+            if dataset_id not in self._idle_callbacks or self.has_active_jobs(dataset_id):
+                return
+            callbacks = self._idle_callbacks.pop(dataset_id)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.exception("Deferred callback for dataset %s failed: %s", dataset_id, e)
+
+    def _set_progress(self, job_id, analysis_type, state):
+        with self._lock, self._connect() as conn:
+            row = conn.execute('SELECT progress FROM analysis_jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return
+            progress = json.loads(row[0])
+            progress[analysis_type] = state
+            conn.execute('UPDATE analysis_jobs SET progress = ?, updated_at = ? WHERE id = ?',
+                         (json.dumps(progress), time.time(), job_id))
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f'UPDATE analysis_jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def _recover(self):
+        """Queue jobs again that were interrupted by a restart"""
+        with self._connect() as conn:
+            job_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM analysis_jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            )]
+        for job_id in job_ids:
+            logger.info("Re-queueing interrupted analysis job %s", job_id)
+            self._update(job_id, status='queued')
+            self._executor.submit(self._execute, job_id)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps SQLite usage thread-safe
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,231 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.ensemble import IsolationForest
+
+from utils.column_profile import get_column_profile, get_quantile_sketches
+from utils.frame_cache import frame_memo, recall
+from utils.result_cache import dataset_fingerprint
+
+UNIVARIATE_METHODS = ('iqr', 'zscore', 'mad')
+MULTIVARIATE_METHODS = ('mahalanobis', 'isolation_forest')
+
+IQR_FACTOR = 1.5
+Z_THRESHOLD = 3.0
+MAD_THRESHOLD = 3.5  # Iglewicz & Hoaglin modified z-score cut-off
+BOUND_ROWS = ['q1', 'median', 'q3', 'lower_bound', 'upper_bound', 'lower_fence', 'upper_fence', 'mad']
+
+# Per-column results keyed by (dataset fingerprint, column, rows, sketched quantiles), so
+# column projections of a dataset and results computed in worker processes are reused.
+# Flags are kept bit-packed.
+COLUMN_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_column_cache = OrderedDict()
+_column_cache_size = 0
+_column_cache_lock = threading.Lock()
+
+
+def get_outlier_report(data):
+    """Memoized per-column outlier bounds and per-row flags for every numeric column
+
+    Columns already computed for the same dataset, by another projection of it or in a
+    worker process, come from the column cache; only the rest are computed.
+    """
+    return frame_memo(data, 'outlier_report', _assemble_outlier_report)
+
+
+def export_outlier_columns(data):
+    """Cached per-column entries for data's numeric columns, to hand to another process"""
+    keys = [_column_key(data, col) for col in data.select_dtypes(include=[np.number]).columns]
+    with _column_cache_lock:
+        return [(key, _column_cache[key]) for key in keys if key in _column_cache]
+
+
+def import_outlier_columns(entries):
+    """Add entries exported by export_outlier_columns to this process's column cache"""
+    for key, entry in entries:
+        _cache_column(key, entry)
+
+
+def get_multivariate_outliers(data, method='mahalanobis', sample_size=10000, random_state=42):
+    """Memoized per-row multivariate outlier flags"""
+    return frame_memo(data, f'multivariate_outliers:{method}:{sample_size}:{random_state}',
+                      lambda frame: compute_multivariate_outliers(frame, method, sample_size, random_state))
+
+
+def get_row_outlier_flags(data, columns=None, method='iqr'):
+    """Boolean array marking rows that are outliers in any of the given numeric columns"""
+    report = get_outlier_report(data)
+    flags = report['flags'][method]
+    if columns is None:
+        return flags.any(axis=1)
+
+    positions = [report['columns'].get_loc(col) for col in columns if col in report['columns']]
+    if not positions:
+        return np.zeros(len(data), dtype=bool)
+    return flags[:, positions].any(axis=1)
+
+
+def compute_outlier_report(data, columns=None):
+    """IQR, z-score and MAD outliers for numeric columns in one pass over the value matrix
+
+    Returns a dict with the numeric ``columns`` (all of them unless given), a ``bounds``
+    DataFrame (one column per numeric column), per-method ``flags`` as rows x columns
+    boolean arrays and the per-column ``valid_counts``.
+    """
+    numerical_cols = pd.Index(columns) if columns is not None else data.select_dtypes(include=[np.number]).columns
+    profile = get_column_profile(data)
+    values = data[numerical_cols].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+
+    # Quartiles and moments come from the shared column profile
+    q1 = profile.loc['25%', numerical_cols].to_numpy()
+    q3 = profile.loc['75%', numerical_cols].to_numpy()
+    median = profile.loc['50%', numerical_cols].to_numpy()
+    mean = profile.loc['mean', numerical_cols].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # scipy.stats.zscore uses the population standard deviation
+        std_population = profile.loc['std', numerical_cols].to_numpy() * np.sqrt((count - 1) / count)
+
+    iqr = q3 - q1
+    lower_bound = q1 - IQR_FACTOR * iqr
+    upper_bound = q3 + IQR_FACTOR * iqr
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        iqr_flags = (values < lower_bound) | (values > upper_bound)
+        z_flags = np.abs(values - mean) / std_population > Z_THRESHOLD
+
+        deviations = np.abs(values - median)
+        mad = _nan_median_columns(deviations, count)
+        mad_flags = 0.6745 * deviations / mad > MAD_THRESHOLD
+
+        # Whisker ends as box plots draw them: the most extreme values inside the bounds
+        lower_fence = np.where(values >= lower_bound, values, np.inf).min(axis=0)
+        upper_fence = np.where(values <= upper_bound, values, -np.inf).max(axis=0)
+    lower_fence[~np.isfinite(lower_fence)] = np.nan
+    upper_fence[~np.isfinite(upper_fence)] = np.nan
+
+    bounds = pd.DataFrame(
+        [q1, median, q3, lower_bound, upper_bound, lower_fence, upper_fence, mad],
+        index=BOUND_ROWS,
+        columns=numerical_cols
+    )
+
+    return {
+        'columns': numerical_cols,
+        'bounds': bounds,
+        'flags': {'iqr': iqr_flags, 'zscore': z_flags, 'mad': mad_flags},
+        'valid_counts': count
+    }
+
+
+def compute_multivariate_outliers(data, method='mahalanobis', sample_size=10000, random_state=42):
+    """Flag rows that are unusual across all numeric columns jointly
+
+    The model is fitted on at most sample_size rows and then scored on every row in
+    batches. Missing values are imputed with the column median.
+    """
+    if method not in MULTIVARIATE_METHODS:
+        raise ValueError(f"Desteklenmeyen çok değişkenli yöntem: {method}")
+
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    profile = get_column_profile(data)
+    values = data[numerical_cols].to_numpy(dtype=np.float64)
+    medians = np.nan_to_num(profile.loc['50%', numerical_cols].to_numpy())
+    values = np.where(np.isnan(values), medians, values)
+
+    n_rows = len(values)
+    rng = np.random.default_rng(random_state)
+    sample_idx = rng.choice(n_rows, sample_size, replace=False) if n_rows > sample_size else np.arange(n_rows)
+    sample = values[sample_idx]
+
+    flags = np.empty(n_rows, dtype=bool)
+    batch_size = 100000
+
+    if method == 'mahalanobis':
+        center = sample.mean(axis=0)
+        precision = np.linalg.pinv(np.cov(sample, rowvar=False))
+        threshold = stats.chi2.ppf(0.975, df=values.shape[1])
+        for start in range(0, n_rows, batch_size):
+            diff = values[start:start + batch_size] - center
+            distances = np.einsum('ij,jk,ik->i', diff, precision, diff)
+            flags[start:start + batch_size] = distances > threshold
+    else:
+        model = IsolationForest(n_estimators=100, max_samples=min(256, len(sample)), random_state=random_state)
+        model.fit(sample)
+        for start in range(0, n_rows, batch_size):
+            flags[start:start + batch_size] = model.predict(values[start:start + batch_size]) == -1
+
+    return flags
+
+
+def _assemble_outlier_report(data):
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    keys = [_column_key(data, col) for col in numerical_cols]
+    with _column_cache_lock:
+        entries = {col: _column_cache.get(key) for col, key in zip(numerical_cols, keys)}
+        for key in keys:
+            if key in _column_cache:
+                _column_cache.move_to_end(key)
+
+    missing = [col for col in numerical_cols if entries[col] is None]
+    if missing:
+        report = compute_outlier_report(data, missing)
+        for i, col in enumerate(missing):
+            entries[col] = {
+                'bounds': report['bounds'][col],
+                'flags': {method: np.packbits(flags[:, i]) for method, flags in report['flags'].items()},
+                'valid_count': report['valid_counts'][i]
+            }
+            _cache_column(keys[numerical_cols.get_loc(col)], entries[col])
+        if len(missing) == len(numerical_cols):
+            return report
+
+    n_rows = len(data)
+    flags = {}
+    for method in UNIVARIATE_METHODS:
+        unpacked = [np.unpackbits(entries[col]['flags'][method], count=n_rows).astype(bool) for col in numerical_cols]
+        flags[method] = np.column_stack(unpacked) if unpacked else np.zeros((n_rows, 0), dtype=bool)
+    return {
+        'columns': numerical_cols,
+        'bounds': pd.DataFrame({col: entries[col]['bounds'] for col in numerical_cols},
+                               index=BOUND_ROWS, columns=numerical_cols),
+        'flags': flags,
+        'valid_counts': np.array([entries[col]['valid_count'] for col in numerical_cols], dtype=np.int64)
+    }
+
+
+def _column_key(data, col):
+    # A projection carries the fingerprint of the dataset it was taken from
+    fingerprint = recall(data, 'source_fingerprint') or dataset_fingerprint(data)
+    return fingerprint, str(col), len(data), get_quantile_sketches(data) is not None
+
+
+def _cache_column(key, entry):
+    global _column_cache_size
+    size = sum(flags.nbytes for flags in entry['flags'].values()) + 1024
+    with _column_cache_lock:
+        previous = _column_cache.pop(key, None)
+        if previous is not None:
+            _column_cache_size -= previous['size']
+        _column_cache[key] = dict(entry, size=size)
+        _column_cache_size += size
+        while _column_cache_size > COLUMN_CACHE_MAX_BYTES and len(_column_cache) > 1:
+            _, evicted = _column_cache.popitem(last=False)
+            _column_cache_size -= evicted['size']
+
+
+def _nan_median_columns(values, count):
+    """Column medians ignoring NaN, via one sort (NaNs sort last)"""
+    sorted_values = np.sort(values, axis=0)
+    columns = np.arange(values.shape[1])
+    last = np.maximum(count - 1, 0)
+    if len(values) == 0:
+        return np.full(values.shape[1], np.nan)
+
+    lower = sorted_values[last // 2, columns]
+    upper = sorted_values[(last + 1) // 2, columns]
+    return np.where(count > 0, (lower + upper) / 2, np.nan)
@@ -0,0 +1,152 @@
+import os
+import json
+import logging
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.frame_cache import frame_memo
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_fingerprint(data):
+    """Content hash of a DataFrame: column names, dtypes and every value"""
+    if isinstance(data, ChunkedDataset):
+        return frame_memo(data, 'fingerprint', ChunkedDataset.fingerprint)
+    return frame_memo(data, 'fingerprint', _compute_fingerprint)
+
+
+def _compute_fingerprint(data):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in data.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def extend_fingerprint(fingerprint, batch):
+    """Fingerprint of data after appending batch, from the fingerprint before"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(fingerprint.encode('utf-8'))
+    digest.update(_compute_fingerprint(batch).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def make_cache_key(fingerprint, kind, name, params=None):
+    """Cache key for one computation over one dataset"""
+    payload = json.dumps([fingerprint, kind, name, params or {}], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU of pickled results with an optional on-disk tier
+
+    Values are stored pickled, so every hit hands out an independent copy and the
+    byte budget is exact.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None, disk_max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+
+        if payload is None and self.disk_dir:
+            payload = self._read_disk(key)
+            if payload is not None:
+                self._remember(key, payload)
+
+        return pickle.loads(payload) if payload is not None else None
+
+    def set(self, key, value):
+        """Store a value under key"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, payload)
+
+        if self.disk_dir:
+            self._write_disk(key, payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, key, payload):
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = payload
+            self._size += len(payload)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.pkl')
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None
+
+        # Touch the file so disk eviction stays least-recently-used
+        try:
+            os.utime(self._disk_path(key))
+        except OSError:
+            pass
+        return payload
+
+    def _write_disk(self, key, payload):
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Result cache disk write failed: %s", e)
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop the least recently used files once the disk tier is over budget"""
+        try:
+            files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith('.pkl')]
+            stats = sorted(((os.stat(path), path) for path in files), key=lambda item: item[0].st_mtime)
+        except OSError:
+            return
+
+        total = sum(stat.st_size for stat, _ in stats)
+        for stat, path in stats:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= stat.st_size
+            except OSError:
+                pass
@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+
+from utils.chunked_dataset import ChunkedDataset
+from utils.sketches import QuantileSketches
+
+# Quartiles reported by DatasetStatistics.summary(), in describe() order
+SUMMARY_QUANTILES = [0.25, 0.5, 0.75]
+
+
+class RunningMoments:
+    """Mergeable per-column count, mean, central moments, extrema and null counts
+
+    Batches are folded in with the pairwise update of Chan et al. and Pébay, so the
+    result does not depend on how the rows were split into chunks.
+    """
+
+    def __init__(self, n_columns):
+        self.rows = 0
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+        self.minimum = np.full(n_columns, np.inf)
+        self.maximum = np.full(n_columns, -np.inf)
+
+    @property
+    def null_count(self):
+        return self.rows - self.count
+
+    def update(self, values):
+        """Fold in a rows x columns float array; NaN marks a missing value"""
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0).astype(np.float64)
+
+        batch = RunningMoments(values.shape[1])
+        batch.rows = values.shape[0]
+        batch.count = count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            batch.mean = np.where(count > 0, np.where(valid, values, 0.0).sum(axis=0) / count, 0.0)
+        deviations = np.where(valid, values - batch.mean, 0.0)
+        squared = deviations * deviations
+        batch.m2 = squared.sum(axis=0)
+        batch.m3 = (squared * deviations).sum(axis=0)
+        batch.m4 = (squared * squared).sum(axis=0)
+        batch.minimum = np.where(valid, values, np.inf).min(axis=0) if len(values) else batch.minimum
+        batch.maximum = np.where(valid, values, -np.inf).max(axis=0) if len(values) else batch.maximum
+
+        self.merge(batch)
+        return self
+
+    def merge(self, other):
+        """Combine another RunningMoments over the same columns into this one"""
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            delta_n = np.where(n > 0, delta / n, 0.0)
+            delta_n2 = delta_n * delta_n
+            term = delta * delta_n * n_a * n_b
+
+            mean = self.mean + delta_n * n_b
+            m2 = self.m2 + other.m2 + term
+            m3 = (self.m3 + other.m3 + term * delta_n * (n_a - n_b)
+                  + 3.0 * delta_n * (n_a * other.m2 - n_b * self.m2))
+            m4 = (self.m4 + other.m4 + term * delta_n2 * (n_a * n_a - n_a * n_b + n_b * n_b)
+                  + 6.0 * delta_n2 * (n_a * n_a * other.m2 + n_b * n_b * self.m2)
+                  + 4.0 * delta_n * (n_a * other.m3 - n_b * self.m3))
+
+        self.rows += other.rows
+        self.count = n
+        self.mean = np.where(n > 0, mean, 0.0)
+        self.m2 = np.where(n > 0, m2, 0.0)
+        self.m3 = np.where(n > 0, m3, 0.0)
+        self.m4 = np.where(n > 0, m4, 0.0)
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        return self
+
+    def summary(self):
+        """Sample std, biased skewness and excess kurtosis as in compute_column_profile"""
+        count = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, self.mean, np.nan)
+            m2 = self.m2 / count
+            std = np.sqrt(self.m2 / (count - 1))
+            skewness = (self.m3 / count) / m2 ** 1.5
+            kurtosis = (self.m4 / count) / m2 ** 2 - 3.0
+
+        flat = m2 <= (np.finfo(np.float64).eps * np.abs(mean)) ** 2
+        skewness[flat] = np.nan
+        kurtosis[flat] = np.nan
+        std[count < 2] = np.nan
+
+        return {
+            'count': count,
+            'null_count': self.null_count,
+            'mean': mean,
+            'std': std,
+            'min': np.where(count > 0, self.minimum, np.nan),
+            'max': np.where(count > 0, self.maximum, np.nan),
+            'skewness': skewness,
+            'kurtosis': kurtosis
+        }
+
+
+class RunningComoments:
+    """Mergeable pairwise-complete co-moment sums for a Pearson correlation matrix
+
+    Values are shifted by a fixed per-column offset (the first batch's means) before
+    summing, which keeps the raw sums well conditioned without a second pass.
+    """
+
+    def __init__(self, n_columns):
+        self.shift = None
+        self.count = np.zeros((n_columns, n_columns))
+        self.sum = np.zeros((n_columns, n_columns))  # sum of x_i over rows where j is valid too
+        self.sum_squares = np.zeros((n_columns, n_columns))  # sum of x_i² over rows where j is valid too
+        self.sum_products = np.zeros((n_columns, n_columns))
+
+    def update(self, values):
+        """Fold in a rows x columns float array; NaN marks a missing value"""
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(values.shape[1])
+
+        shifted = np.where(valid, values - self.shift, 0.0)
+        mask = valid.astype(np.float64)
+        self.count += mask.T @ mask
+        self.sum += shifted.T @ mask
+        self.sum_squares += (shifted * shifted).T @ mask
+        self.sum_products += shifted.T @ shifted
+        return self
+
+    def merge(self, other):
+        """Combine another RunningComoments over the same columns into this one"""
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+
+        # Re-express the other sums around this accumulator's shift
+        offset = other.shift - self.shift
+        other_sum = other.sum + offset[:, None] * other.count
+        self.sum_squares += (other.sum_squares + 2 * offset[:, None] * other.sum
+                             + offset[:, None] ** 2 * other.count)
+        self.sum_products += (other.sum_products + offset[:, None] * other.sum.T
+                              + offset[None, :] * other.sum + np.outer(offset, offset) * other.count)
+        self.sum += other_sum
+        self.count += other.count
+        return self
+
+    def correlation(self):
+        """Pairwise-complete Pearson correlation matrix"""
+        count = self.count
+        sum_i, sum_j = self.sum, self.sum.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = self.sum_products - sum_i * sum_j / count
+            var_i = self.sum_squares - sum_i * sum_i / count
+            var_j = self.sum_squares.T - sum_j * sum_j / count
+            matrix = cov / np.sqrt(var_i * var_j)
+
+        matrix[count < 2] = np.nan
+        np.clip(matrix, -1.0, 1.0, out=matrix)
+        diagonal = np.diag_indices(len(matrix))
+        matrix[diagonal] = np.where(np.isnan(matrix[diagonal]), np.nan, 1.0)
+        return matrix
+
+
+class DatasetStatistics:
+    """Running statistics of a whole dataset, updated batch by batch
+
+    Holds per-column null counts, moments of the numeric columns, their co-moments and
+    quantile sketches, so appending rows costs time proportional to the new rows only.
+    """
+
+    def __init__(self, columns, numerical_cols, quantile_error=0.01):
+        self.columns = list(columns)
+        self.numerical_cols = list(numerical_cols)
+        self.rows = 0
+        self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.moments = RunningMoments(len(self.numerical_cols))
+        self.comoments = RunningComoments(len(self.numerical_cols))
+        self.quantiles = QuantileSketches(self.numerical_cols, error=quantile_error)
+        self.fingerprint = None  # content hash of the data the statistics describe
+
+    @classmethod
+    def from_data(cls, data, quantile_error=0.01):
+        """Build statistics with one pass over a DataFrame or a ChunkedDataset"""
+        statistics = cls(data.columns, data.select_dtypes(include=[np.number]).columns, quantile_error)
+        chunks = data.iter_chunks() if isinstance(data, ChunkedDataset) else [data]
+        for chunk in chunks:
+            statistics.update(chunk)
+        return statistics
+
+    def matches(self, data):
+        """Whether these statistics still describe the layout of data"""
+        return (self.rows == len(data) and self.columns == list(data.columns) and
+                self.numerical_cols == list(data.select_dtypes(include=[np.number]).columns))
+
+    def update(self, batch):
+        """Fold a batch of rows with the same columns into the statistics"""
+        self.rows += len(batch)
+        self.null_counts += batch[self.columns].isnull().sum().to_numpy(dtype=np.int64)
+        if self.numerical_cols:
+            values = batch[self.numerical_cols].to_numpy(dtype=np.float64)
+            self.moments.update(values)
+            self.comoments.update(values)
+            self.quantiles.update(values)
+        return self
+
+    def missing_values(self):
+        return pd.Series(self.null_counts, index=self.columns)
+
+    def summary(self):
+        """Moments, extrema and approximate quartiles as a DataFrame indexed by statistic"""
+        summary = self.moments.summary()
+        quartiles = self.quantiles.quantiles(SUMMARY_QUANTILES)
+        rows = {
+            'count': summary['count'], 'null_count': summary['null_count'], 'mean': summary['mean'],
+            'std': summary['std'], 'min': summary['min'], '25%': quartiles[0], '50%': quartiles[1],
+            '75%': quartiles[2], 'max': summary['max'], 'skewness': summary['skewness'],
+            'kurtosis': summary['kurtosis']
+        }
+        return pd.DataFrame(list(rows.values()), index=list(rows), columns=self.numerical_cols)
+
+    def correlation_matrix(self):
+        """Pairwise-complete Pearson correlation matrix of the numeric columns"""
+        return pd.DataFrame(self.comoments.correlation(), index=self.numerical_cols, columns=self.numerical_cols)
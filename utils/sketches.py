@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+# Quantile error modes: 'exact' sorts, 'approximate' answers from sketches, 'auto' uses
+# sketches for out-of-core datasets only
+QUANTILE_MODES = ('exact', 'approximate', 'auto')
+
+# Sketch size per unit of rank error; with k = KLL_ERROR_CONSTANT / error the worst
+# normalized rank error measured over many quantiles and seeds stays below error
+KLL_ERROR_CONSTANT = 2.5
+
+
+def kll_size_for_error(error):
+    """Sketch size k that keeps the normalized rank error within error"""
+    if not 0 < error < 1:
+        raise ValueError(f"Geçersiz kantil hata sınırı: {error}")
+    return max(8, int(np.ceil(KLL_ERROR_CONSTANT / error)))
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of one column (Karnin, Lang & Liberty's KLL)
+
+    Items live in compactors; an item at level h stands for 2^h input values. A full
+    compactor is sorted and every other item moves up a level, so memory stays around
+    3k items whatever the input size. Until the first compaction answers are exact.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Fold in a 1-d float array; NaN values are skipped"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Combine another KLLSketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Values at the given quantiles, NaN for an empty sketch"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            # Nothing compacted yet: interpolate exactly, as pandas' quantile() does
+            return np.quantile(self.levels[0], qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        values = items[np.clip(positions, 0, len(items) - 1)]
+        # The extremes are tracked exactly
+        values = np.where(qs <= 0, self.minimum, np.where(qs >= 1, self.maximum, values))
+        return np.clip(values, self.minimum, self.maximum)
+
+    def _capacity(self, level):
+        # Lower levels get geometrically smaller compactors
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _compress(self):
+        while True:
+            full = [h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind, so weights remain exact
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            pairs = items[:len(items) - len(keep)]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[self._rng.integers(2)::2]])
+
+
+class QuantileSketches:
+    """One KLLSketch per numeric column, updated and merged together"""
+
+    def __init__(self, columns, error=0.01, seed=0):
+        self.columns = list(columns)
+        self.error = error
+        k = kll_size_for_error(error)
+        self.sketches = [KLLSketch(k, seed=seed + i) for i in range(len(self.columns))]
+
+    def update(self, values):
+        """Fold in a rows x columns float array; NaN marks a missing value"""
+        values = np.asarray(values, dtype=np.float64)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(values[:, i])
+        return self
+
+    def merge(self, other):
+        """Combine sketches of the same columns into these"""
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def quantiles(self, qs):
+        """len(qs) x columns array of approximate quantiles"""
+        if not self.sketches:
+            return np.empty((len(qs), 0))
+        return np.column_stack([sketch.quantiles(qs) for sketch in self.sketches])
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch (Flajolet et al.) with 2^precision registers
+
+    The relative error is about 1.04 / sqrt(2^precision); precision 14 gives ~0.8%
+    with 16 KB of registers, whatever the number of distinct values.
+    """
+
+    def __init__(self, precision=14):
+        # 64-bit hashes leave 64 - precision bits for the rank, exact in a float64 below 2^53
+        if not 11 <= precision <= 16:
+            raise ValueError(f"Geçersiz HyperLogLog hassasiyeti: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        """Fold in 64-bit hashes of the values"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return self
+
+        rest_bits = 64 - self.precision
+        index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = (hashes & np.uint64((1 << rest_bits) - 1)).astype(np.float64)
+        # Rank: position of the first set bit of the remaining bits, counted from the top
+        _, exponent = np.frexp(rest)
+        rank = np.where(rest > 0, rest_bits - exponent + 1, rest_bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """Combine another HyperLogLog of the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+
+class MisraGries:
+    """Mergeable heavy-hitters summary keeping at most capacity counters
+
+    Counts are lower bounds; each undercounts by at most ``error`` (total count over
+    capacity + 1), so any value more frequent than that is guaranteed to be kept.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counters = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.error = 0  # amount subtracted from every counter so far
+
+    def update_counts(self, counts):
+        """Fold in exact counts of a batch, a Series indexed by value"""
+        self.total += int(counts.sum())
+        self._absorb(counts, 0)
+        return self
+
+    def merge(self, other):
+        """Combine another MisraGries summary into this one"""
+        self.total += other.total
+        self._absorb(other.counters, other.error)
+        return self
+
+    def top(self, n=10):
+        """The n largest counters, most frequent first"""
+        return self.counters.sort_values(ascending=False, kind='stable').head(n)
+
+    def _absorb(self, counts, error):
+        combined = self.counters.add(counts, fill_value=0) if len(self.counters) else counts.astype(np.int64)
+        self.error += error
+        if len(combined) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from all and drop what reaches zero
+            threshold = int(combined.nlargest(self.capacity + 1).iloc[-1])
+            combined = combined[combined > threshold] - threshold
+            self.error += threshold
+        self.counters = combined[combined > 0].astype(np.int64)
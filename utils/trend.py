@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from utils.frame_cache import frame_memo
+
+# Bucket sizes accepted for resampling before the fit: daily, weekly, monthly
+RESAMPLE_FREQUENCIES = ('D', 'W', 'M')
+
+SECONDS_PER_DAY = 86400.0
+
+
+def detect_time_column(data, sample_size=200, min_parsed_ratio=0.95):
+    """Memoized name of the column to use as the time axis, or None"""
+    return frame_memo(data, f'time_column:{sample_size}:{min_parsed_ratio}',
+                      lambda frame: _detect_time_column(frame, sample_size, min_parsed_ratio))
+
+
+def _detect_time_column(data, sample_size, min_parsed_ratio):
+    datetime_cols = data.select_dtypes(include=['datetime64', 'datetimetz']).columns
+    if len(datetime_cols) > 0:
+        return datetime_cols[0]
+
+    # Dates read from CSV arrive as text; probe a few values of each text column
+    for col in data.select_dtypes(include=['object', 'category']).columns:
+        sample = data[col].dropna().head(sample_size).astype(str)
+        if sample.empty or not sample.str.contains(r'\d').all():
+            continue
+        parsed = pd.to_datetime(sample, errors='coerce', format='mixed')
+        if parsed.notna().mean() >= min_parsed_ratio:
+            return col
+    return None
+
+
+def compute_trends(data, time_column=None, resample=None):
+    """Linear trend of every numeric column against a shared x-axis, solved as one batched least-squares problem
+
+    The x-axis is ``time_column`` in days when given, otherwise the row position. With
+    ``resample`` ('D', 'W' or 'M') the columns are first averaged into time buckets.
+    Missing values are masked per column, so each column is fitted on its own valid rows.
+    Returns a DataFrame indexed by numeric column with slope, intercept, r_value,
+    p_value, std_err and n.
+    """
+    if resample is not None and resample not in RESAMPLE_FREQUENCIES:
+        raise ValueError(f"Desteklenmeyen yeniden örnekleme sıklığı: {resample}")
+
+    numerical_cols = data.select_dtypes(include=[np.number]).columns
+    values = data[numerical_cols]
+
+    if time_column is None:
+        x = np.arange(len(data), dtype=np.float64)
+    else:
+        timestamps = pd.to_datetime(data[time_column], errors='coerce', format='mixed')
+        if resample is not None:
+            buckets = timestamps.dt.to_period(resample).dt.start_time
+            values = values.groupby(buckets).mean()
+            timestamps = values.index.to_series()
+        # Days since the first timestamp keeps the slope readable as change per day
+        elapsed = (timestamps - timestamps.min()).dt.total_seconds().to_numpy(dtype=np.float64)
+        x = elapsed / SECONDS_PER_DAY
+
+    y = values.to_numpy(dtype=np.float64)
+    # Rows without a usable x value take part in no fit
+    mask = ~np.isnan(y) & ~np.isnan(x)[:, None]
+    weights = mask.astype(np.float64)
+    x = np.nan_to_num(x)
+    y = np.where(mask, y, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n = weights.sum(axis=0)
+        # Centre on the per-column means before forming the normal equations
+        x_mean = (x @ weights) / n
+        y_mean = y.sum(axis=0) / n
+        dx = (x[:, None] - x_mean) * weights
+        dy = (y - y_mean) * weights
+
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        r_value = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        r_value[(syy == 0) & (sxx > 0)] = 0.0
+
+        df = n - 2
+        t_stat = r_value * np.sqrt(df / ((1.0 - r_value) * (1.0 + r_value)))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), df)
+        std_err = np.sqrt((1 - r_value ** 2) * syy / df / sxx)
+
+    p_value[df < 1] = np.nan
+    std_err[df < 1] = np.nan
+
+    return pd.DataFrame({
+        'slope': slope,
+        'intercept': intercept,
+        'r_value': r_value,
+        'p_value': p_value,
+        'std_err': std_err,
+        'n': n
+    }, index=numerical_cols)
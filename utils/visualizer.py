@@ -3,20 +3,48 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 import json
+import logging
+from utils.correlation import get_correlation_matrix
+from utils.distribution import default_bin_count, get_histograms
+from utils.instrumentation import span
+from utils.outliers import get_outlier_report, get_row_outlier_flags
+from utils.result_cache import dataset_fingerprint, make_cache_key
+
+logger = logging.getLogger(__name__)
 
 
 class Visualizer:
-    def __init__(self):
+    # 'html' returns standalone chart HTML, 'figure' returns a Plotly figure spec
+    OUTPUT_FORMATS = ('html', 'figure')
+
+    def __init__(self, output_format='html', include_plotlyjs='cdn', max_points=5000, random_state=42, cache=None):
+        if output_format not in self.OUTPUT_FORMATS:
+            raise ValueError(f"Desteklenmeyen çıktı formatı: {output_format}")
+
+        self.output_format = output_format
+        self.include_plotlyjs = include_plotlyjs  # only used for 'html' output
+        self.max_points = max_points  # point budget for line and scatter charts
+        self.random_state = random_state
+        self.cache = cache  # optional ResultCache of rendered charts, shared between requests
+        self.downsample_info = None  # set by the last line/scatter chart
+        self.cache_key = None  # key of the last chart, None when it was not cached
+        self._render_failed = False  # set by a chart builder that caught an exception
+
         # Neon color palette for dark theme
         self.neon_colors = ['#00FFFF', '#FF00FF', '#00FF00', '#FFFF00', '#8000FF', '#FF8000', '#0080FF', '#FF0040']
 
-    def create_chart(self, chart_type, data, analysis_context=None, selected_columns=None):
-        """Create different types of charts with analysis context and column selection"""
+    def create_chart(self, chart_type, data, analysis_context=None, selected_columns=None, fingerprint=None):
+        """Create different types of charts with analysis context and column selection
+
+        With a cache, rendered charts are reused across calls. fingerprint identifies the
+        dataset data was taken from (e.g. when data is a sample of it); by default it is
+        the content hash of data itself.
+        """
         try:
-            print(f"=== CREATING CHART ===")
-            print(f"Chart type: {chart_type}")
-            print(f"Data shape: {data.shape if hasattr(data, 'shape') else 'No shape'}")
-            print(f"Selected columns: {selected_columns}")
+            self.downsample_info = None
+            self.cache_key = None
+            self._render_failed = False
+            logger.debug("Creating %s chart, selected columns: %s", chart_type, selected_columns)
 
             if data is None or len(data) == 0:
                 return "<div class='alert alert-warning'><i class='fas fa-exclamation-triangle me-2'></i>Görselleştirme için veri bulunamadı.</div>"
@@ -40,19 +68,137 @@ class Visualizer:
             }
 
             if chart_type in chart_methods:
-                result = chart_methods[chart_type](data, analysis_context, selected_columns)
-                print(f"Chart created successfully, HTML length: {len(result)}")
+                cache_key = None
+                if self.cache is not None:
+                    cache_key = self.chart_cache_key(fingerprint or dataset_fingerprint(data), chart_type,
+                                                     analysis_context, selected_columns, list(data.columns))
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        result, self.downsample_info = cached
+                        self.cache_key = cache_key
+                        logger.debug("%s chart served from cache", chart_type)
+                        return result
+
+                with span('chart', chart=chart_type):
+                    result = chart_methods[chart_type](data, analysis_context, selected_columns)
+                logger.debug("%s chart created, output length: %d", chart_type, len(result))
+                # Failed renders may be transient (e.g. a MemoryError) and are not cached
+                if cache_key is not None and not self._render_failed:
+                    self.cache.set(cache_key, (result, self.downsample_info))
+                    self.cache_key = cache_key
                 return result
             else:
                 return f"<div class='alert alert-danger'><i class='fas fa-exclamation-triangle me-2'></i>Desteklenmeyen grafik türü: {chart_type}</div>"
 
         except Exception as e:
-            print(f"=== CHART CREATION ERROR ===")
-            print(f"Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Chart creation error: %s", e)
             return f"<div class='alert alert-danger'><i class='fas fa-exclamation-triangle me-2'></i>Grafik oluşturulurken hata: {str(e)}</div>"
 
+    def _render_error(self, message):
+        """Alert for a chart builder's exception; keeps the chart out of the cache"""
+        self._render_failed = True
+        return f"<div class='alert alert-danger'>{message}</div>"
+
+    def chart_cache_key(self, fingerprint, chart_type, analysis_context=None, selected_columns=None, columns=None):
+        """Key of a rendered chart; also its ETag, as it changes whenever the output would"""
+        params = {
+            'analysis_context': analysis_context or {},
+            'selected_columns': selected_columns or {},
+            'columns': [str(col) for col in columns] if columns is not None else None,
+            'output_format': self.output_format,
+            'include_plotlyjs': self.include_plotlyjs,
+            'max_points': self.max_points,
+            'random_state': self.random_state
+        }
+        return make_cache_key(fingerprint, 'chart', chart_type, params)
+
+    def _render_figure(self, fig, config, div_id):
+        """Serialize a figure in the configured output format"""
+        if self.output_format == 'figure':
+            # Rendered client-side by the page's single Plotly instance
+            return {
+                'figure': fig.to_plotly_json(),
+                'config': config
+            }
+
+        return fig.to_html(
+            include_plotlyjs=self.include_plotlyjs,
+            div_id=div_id,
+            config=config
+        )
+
+    def _downsample_line(self, data, x_col, y_col):
+        """Reduce a line series to the point budget with Largest-Triangle-Three-Buckets"""
+        original_points = len(data)
+        if original_points <= self.max_points:
+            self._set_downsample_info(False, None, original_points, original_points)
+            return data
+
+        valid = data[[x_col, y_col]].dropna()
+        indices = self._lttb_indices(valid[x_col].to_numpy(dtype=float), valid[y_col].to_numpy(dtype=float),
+                                     self.max_points)
+        sampled = valid.iloc[indices]
+
+        self._set_downsample_info(True, 'lttb', original_points, len(sampled))
+        return sampled
+
+    def _downsample_scatter(self, data, x_col, y_col):
+        """Uniformly sample scatter rows, keeping the extreme points so the axis ranges survive"""
+        original_points = len(data)
+        if original_points <= self.max_points:
+            self._set_downsample_info(False, None, original_points, original_points)
+            return data
+
+        # A seeded uniform sample keeps the point density proportional to the original
+        rng = np.random.default_rng(self.random_state)
+        indices = [rng.choice(original_points, self.max_points, replace=False)]
+
+        for col in (x_col, y_col):
+            values = data[col].to_numpy(dtype=float)
+            if not np.isnan(values).all():
+                indices.append([np.nanargmin(values), np.nanargmax(values)])
+
+        sampled = data.iloc[np.unique(np.concatenate(indices))]
+
+        self._set_downsample_info(True, 'uniform_sample', original_points, len(sampled))
+        return sampled
+
+    def _lttb_indices(self, x, y, threshold):
+        """Row positions chosen by Largest-Triangle-Three-Buckets, first and last always kept"""
+        n = len(x)
+        if threshold >= n or threshold < 3:
+            return np.arange(n)
+
+        # threshold - 2 buckets between the fixed first and last points
+        edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+        selected = np.empty(threshold, dtype=np.int64)
+        selected[0] = 0
+        selected[-1] = n - 1
+
+        previous = 0
+        for i in range(threshold - 2):
+            start, end = edges[i], edges[i + 1]
+            next_end = edges[i + 2] if i + 2 < len(edges) else n
+
+            # Triangle between the previous pick, a candidate and the next bucket's average
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+            areas = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous]) -
+                           (x[previous] - x[start:end]) * (avg_y - y[previous]))
+
+            previous = start + int(np.argmax(areas))
+            selected[i + 1] = previous
+
+        return selected
+
+    def _set_downsample_info(self, downsampled, method, original_points, rendered_points):
+        self.downsample_info = {
+            'downsampled': downsampled,
+            'method': method,
+            'original_points': int(original_points),
+            'rendered_points': int(rendered_points)
+        }
+
     def _apply_dark_theme(self, fig, title=None):
         """Apply professional dark theme with neon colors to plotly figure"""
         fig.update_layout(
@@ -98,9 +244,9 @@ class Visualizer:
     def _create_histogram(self, data, analysis_context=None, selected_columns=None):
         """Create histogram using Plotly"""
         try:
-            print("Creating histogram...")
+            logger.debug("Creating histogram")
             numerical_cols = data.select_dtypes(include=[np.number]).columns
-            print(f"Numerical columns: {list(numerical_cols)}")
+            logger.debug("Numerical columns: %s", numerical_cols)
 
             if len(numerical_cols) == 0:
                 return "<div class='alert alert-warning'><i class='fas fa-chart-bar me-2'></i>Histogram için sayısal veri bulunamadı.</div>"
@@ -108,7 +254,7 @@ class Visualizer:
             # Use selected column or first numerical column
             col = selected_columns.get('x_column') if selected_columns and selected_columns.get('x_column') else \
             numerical_cols[0]
-            print(f"Using column: {col}")
+            logger.debug("Using column: %s", col)
 
             # Analysis context based title
             title = f'{col} - Histogram Dağılımı'
@@ -119,14 +265,29 @@ class Visualizer:
                 elif analysis_type == 'descriptive':
                     title = f'{col} - Tanımlayıcı İstatistik (Histogram)'
 
-            # Create figure
-            fig = px.histogram(
-                data,
-                x=col,
-                title=title,
-                nbins=min(30, max(10, len(data) // 10)),
-                color_discrete_sequence=['#00FFFF']
-            )
+            histograms = get_histograms(data, default_bin_count(len(data)))
+            if col in histograms['columns']:
+                # Bins come from the shared batch histograms, so raw values are not shipped
+                position = histograms['columns'].get_loc(col)
+                edges = histograms['edges'][position]
+
+                # Create figure
+                fig = go.Figure(go.Bar(
+                    x=(edges[:-1] + edges[1:]) / 2,
+                    y=histograms['counts'][position],
+                    width=np.diff(edges),
+                    name=col,
+                    marker_color='#00FFFF'
+                ))
+                fig.update_layout(title=title, xaxis_title=col, yaxis_title='count', bargap=0)
+            else:
+                # Categorical columns are counted per value
+                fig = px.histogram(
+                    data,
+                    x=col,
+                    title=title,
+                    color_discrete_sequence=['#00FFFF']
+                )
 
             # Apply theme
             fig = self._apply_dark_theme(fig)
@@ -149,27 +310,21 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id=f"histogram-{col.replace(' ', '_').replace('/', '_')}",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id=f"histogram-{col.replace(' ', '_').replace('/', '_')}")
 
-            print(f"Histogram HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Histogram generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Histogram error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Histogram hatası: {str(e)}</div>"
+            logger.exception("Histogram error: %s", e)
+            return self._render_error(f"Histogram hatası: {str(e)}")
 
     def _create_scatter_plot(self, data, analysis_context=None, selected_columns=None):
         """Create scatter plot using Plotly"""
         try:
-            print("Creating scatter plot...")
+            logger.debug("Creating scatter plot")
             numerical_cols = data.select_dtypes(include=[np.number]).columns
-            print(f"Numerical columns: {list(numerical_cols)}")
+            logger.debug("Numerical columns: %s", numerical_cols)
 
             if len(numerical_cols) < 2:
                 return "<div class='alert alert-warning'><i class='fas fa-braille me-2'></i>Scatter plot için en az 2 sayısal sütun gerekli.</div>"
@@ -182,7 +337,13 @@ class Visualizer:
             color_col = selected_columns.get('color_column') if selected_columns and selected_columns.get(
                 'color_column') else None
 
-            print(f"Using columns: {x_col} vs {y_col}, color: {color_col}")
+            logger.debug("Using columns: %s vs %s, color: %s", x_col, y_col, color_col)
+
+            # Outlier context without a chosen colour: colour by the cached IQR outlier flags
+            if not color_col and analysis_context and analysis_context.get('analysis_type') == 'outlier':
+                row_flags = get_row_outlier_flags(data, [x_col, y_col])
+                color_col = 'Aykırı Değer'
+                data = data[[x_col, y_col]].assign(**{color_col: np.where(row_flags, 'Aykırı', 'Normal')})
 
             # Analysis context based title
             title = f'{x_col} vs {y_col} - Scatter Plot'
@@ -195,6 +356,10 @@ class Visualizer:
                 elif analysis_type == 'outlier':
                     title = f'{x_col} vs {y_col} - Aykırı Değer Analizi'
 
+            data = self._downsample_scatter(data, x_col, y_col)
+            if self.downsample_info['downsampled']:
+                title = f"{title} ({self.downsample_info['rendered_points']}/{self.downsample_info['original_points']} nokta)"
+
             # Create figure
             fig = px.scatter(
                 data,
@@ -228,25 +393,19 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id=f"scatter-{x_col.replace(' ', '_')}-{y_col.replace(' ', '_')}",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id=f"scatter-{x_col.replace(' ', '_')}-{y_col.replace(' ', '_')}")
 
-            print(f"Scatter plot HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Scatter plot generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Scatter plot error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Scatter plot hatası: {str(e)}</div>"
+            logger.exception("Scatter plot error: %s", e)
+            return self._render_error(f"Scatter plot hatası: {str(e)}")
 
     def _create_line_plot(self, data, analysis_context=None, selected_columns=None):
         """Create line plot using Plotly"""
         try:
-            print("Creating line plot...")
+            logger.debug("Creating line plot")
             numerical_cols = data.select_dtypes(include=[np.number]).columns
 
             if len(numerical_cols) == 0:
@@ -255,7 +414,7 @@ class Visualizer:
             # Use selected column or first numerical column
             col = selected_columns.get('y_column') if selected_columns and selected_columns.get('y_column') else \
             numerical_cols[0]
-            print(f"Using column: {col}")
+            logger.debug("Using column: %s", col)
 
             # Analysis context based title
             title = f'{col} - Zaman Serisi'
@@ -268,6 +427,9 @@ class Visualizer:
 
             # Create index for x-axis
             data_with_index = data.reset_index()
+            data_with_index = self._downsample_line(data_with_index, 'index', col)
+            if self.downsample_info['downsampled']:
+                title = f"{title} ({self.downsample_info['rendered_points']}/{self.downsample_info['original_points']} nokta)"
 
             # Create figure
             fig = px.line(
@@ -299,27 +461,21 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id=f"line-{col.replace(' ', '_')}",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id=f"line-{col.replace(' ', '_')}")
 
-            print(f"Line plot HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Line plot generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Line plot error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Line plot hatası: {str(e)}</div>"
+            logger.exception("Line plot error: %s", e)
+            return self._render_error(f"Line plot hatası: {str(e)}")
 
     def _create_bar_chart(self, data, analysis_context=None, selected_columns=None):
         """Create bar chart using Plotly"""
         try:
-            print("Creating bar chart...")
-            categorical_cols = data.select_dtypes(include=['object']).columns
-            print(f"Categorical columns: {list(categorical_cols)}")
+            logger.debug("Creating bar chart")
+            categorical_cols = data.select_dtypes(include=['object', 'category']).columns
+            logger.debug("Categorical columns: %s", categorical_cols)
 
             if len(categorical_cols) == 0:
                 return "<div class='alert alert-warning'><i class='fas fa-chart-bar me-2'></i>Bar chart için kategorik veri bulunamadı.</div>"
@@ -328,7 +484,7 @@ class Visualizer:
             col = selected_columns.get('x_column') if selected_columns and selected_columns.get('x_column') else \
             categorical_cols[0]
             value_counts = data[col].value_counts().head(10)
-            print(f"Using column: {col}, unique values: {len(value_counts)}")
+            logger.debug("Using column: %s, unique values: %d", col, len(value_counts))
 
             # Analysis context based title
             title = f'{col} - Kategori Dağılımı'
@@ -370,26 +526,20 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id=f"bar-{col.replace(' ', '_')}",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id=f"bar-{col.replace(' ', '_')}")
 
-            print(f"Bar chart HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Bar chart generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Bar chart error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Bar chart hatası: {str(e)}</div>"
+            logger.exception("Bar chart error: %s", e)
+            return self._render_error(f"Bar chart hatası: {str(e)}")
 
     def _create_pie_chart(self, data, analysis_context=None, selected_columns=None):
         """Create pie chart using Plotly"""
         try:
-            print("Creating pie chart...")
-            categorical_cols = data.select_dtypes(include=['object']).columns
+            logger.debug("Creating pie chart")
+            categorical_cols = data.select_dtypes(include=['object', 'category']).columns
 
             if len(categorical_cols) == 0:
                 return "<div class='alert alert-warning'><i class='fas fa-chart-pie me-2'></i>Pie chart için kategorik veri bulunamadı.</div>"
@@ -398,7 +548,7 @@ class Visualizer:
             col = selected_columns.get('x_column') if selected_columns and selected_columns.get('x_column') else \
             categorical_cols[0]
             value_counts = data[col].value_counts().head(8)
-            print(f"Using column: {col}, unique values: {len(value_counts)}")
+            logger.debug("Using column: %s, unique values: %d", col, len(value_counts))
 
             # Analysis context based title
             title = f'{col} - Oransal Dağılım'
@@ -437,31 +587,25 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id=f"pie-{col.replace(' ', '_')}",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id=f"pie-{col.replace(' ', '_')}")
 
-            print(f"Pie chart HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Pie chart generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Pie chart error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Pie chart hatası: {str(e)}</div>"
+            logger.exception("Pie chart error: %s", e)
+            return self._render_error(f"Pie chart hatası: {str(e)}")
 
     def _create_box_plot(self, data, analysis_context=None, selected_columns=None):
         """Create box plot using Plotly"""
         try:
-            print("Creating box plot...")
+            logger.debug("Creating box plot")
             numerical_cols = data.select_dtypes(include=[np.number]).columns
 
             if len(numerical_cols) == 0:
                 return "<div class='alert alert-warning'><i class='fas fa-square me-2'></i>Box plot için sayısal veri bulunamadı.</div>"
 
-            print(f"Using columns: {list(numerical_cols[:5])}")
+            logger.debug("Using columns: %s", numerical_cols[:5])
 
             # Analysis context based title
             title = 'Sayısal Değişkenler - Box Plot Analizi'
@@ -472,17 +616,41 @@ class Visualizer:
                 elif analysis_type == 'distribution':
                     title = 'Dağılım Analizi - Box Plot'
 
-            # Create box plot for multiple numerical columns
+            # Create box plot for multiple numerical columns from the cached outlier report:
+            # boxes are drawn from precomputed quartiles and only the outlier points are sent
             fig = go.Figure()
+            report = get_outlier_report(data)
+            points_per_box = max(1, self.max_points // 5)
+            rng = np.random.default_rng(self.random_state)
 
             for i, col in enumerate(numerical_cols[:5]):  # Max 5 columns
+                color = self.neon_colors[i % len(self.neon_colors)]
+                bounds = report['bounds'][col]
                 fig.add_trace(go.Box(
-                    y=data[col],
+                    x=[col],
+                    q1=[bounds['q1']],
+                    median=[bounds['median']],
+                    q3=[bounds['q3']],
+                    lowerfence=[bounds['lower_fence']],
+                    upperfence=[bounds['upper_fence']],
                     name=col,
-                    marker_color=self.neon_colors[i % len(self.neon_colors)],
-                    line=dict(color=self.neon_colors[i % len(self.neon_colors)], width=2)
+                    marker_color=color,
+                    line=dict(color=color, width=2)
                 ))
 
+                outlier_values = data[col].to_numpy(dtype=np.float64)[report['flags']['iqr'][:, report['columns'].get_loc(col)]]
+                if len(outlier_values) > points_per_box:
+                    outlier_values = rng.choice(outlier_values, points_per_box, replace=False)
+                if len(outlier_values) > 0:
+                    fig.add_trace(go.Scatter(
+                        x=[col] * len(outlier_values),
+                        y=outlier_values,
+                        mode='markers',
+                        name=f'{col} aykırı',
+                        showlegend=False,
+                        marker=dict(color=color, size=6, opacity=0.8)
+                    ))
+
             fig.update_layout(title=title)
             fig = self._apply_dark_theme(fig)
 
@@ -499,32 +667,26 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id="boxplot",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id="boxplot")
 
-            print(f"Box plot HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Box plot generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Box plot error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Box plot hatası: {str(e)}</div>"
+            logger.exception("Box plot error: %s", e)
+            return self._render_error(f"Box plot hatası: {str(e)}")
 
     def _create_heatmap(self, data, analysis_context=None, selected_columns=None):
         """Create heatmap using Plotly"""
         try:
-            print("Creating heatmap...")
+            logger.debug("Creating heatmap")
             numerical_cols = data.select_dtypes(include=[np.number]).columns
 
             if len(numerical_cols) < 2:
                 return "<div class='alert alert-warning'><i class='fas fa-th me-2'></i>Heatmap için en az 2 sayısal sütun gerekli.</div>"
 
-            correlation_matrix = data[numerical_cols].corr()
-            print(f"Correlation matrix shape: {correlation_matrix.shape}")
+            correlation_matrix = get_correlation_matrix(data)
+            logger.debug("Correlation matrix shape: %s", correlation_matrix.shape)
 
             # Analysis context based title
             title = 'Korelasyon Heatmap - Değişkenler Arası İlişki'
@@ -564,20 +726,14 @@ class Visualizer:
                 }
             }
 
-            html = fig.to_html(
-                include_plotlyjs='cdn',
-                div_id="heatmap",
-                config=config
-            )
+            chart = self._render_figure(fig, config, div_id="heatmap")
 
-            print(f"Heatmap HTML generated successfully: {len(html)} chars")
-            return html
+            logger.debug("Heatmap generated (%s): %d", self.output_format, len(chart))
+            return chart
 
         except Exception as e:
-            print(f"Heatmap error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"<div class='alert alert-danger'>Heatmap hatası: {str(e)}</div>"
+            logger.exception("Heatmap error: %s", e)
+            return self._render_error(f"Heatmap hatası: {str(e)}")
 
     def _create_correlation_matrix(self, data, analysis_context=None, selected_columns=None):
         """Create correlation matrix visualization"""